@@ -76,40 +76,37 @@ Candidate::Candidate( const std::string &text )
   text_( text ),
   word_boundary_chars_( GetWordBoundaryChars( text ) ),
   text_is_lowercase_( all( text, is_lower() ) ),
-  letters_present_( LetterBitsetFromString( text ) ),
-  root_node_( new LetterNode( text ) ) {
+  letters_present_( LetterBitsetFromString( text ) ) {
 }
 
 
 Result Candidate::QueryMatchResult( const std::string &query,
                                     bool case_sensitive ) const {
-  LetterNode *node = root_node_.get();
+  // Each query letter is matched to its nearest occurrence in the text after
+  // the previously matched letter. Candidates are short so scanning the text is
+  // faster than looking up a precomputed table, and doesn't need any memory.
+  size_t text_index = 0;
   int index_sum = 0;
 
   foreach ( char letter, query ) {
-    const NearestLetterNodeIndices *nearest =
-      node->NearestLetterNodesForLetter( letter );
-
-    if ( !nearest )
-      return Result( false );
-
     // When the query letter is uppercase, then we force an uppercase match
     // but when the query letter is lowercase, then it can match both an
     // uppercase and a lowercase letter. This is by design and it's much
     // better than forcing lowercase letter matches.
-    node = NULL;
-    if ( case_sensitive && IsUppercase( letter ) ) {
-      if ( nearest->indexOfFirstUppercaseOccurrence >= 0 )
-        node = ( *root_node_ )[ nearest->indexOfFirstUppercaseOccurrence ];
-    } else {
-      if ( nearest->indexOfFirstOccurrence >= 0 )
-        node = ( *root_node_ )[ nearest->indexOfFirstOccurrence ];
+    bool uppercase_match = case_sensitive && IsUppercase( letter );
+    int letter_index = IndexForLetter( letter );
+
+    while ( text_index < text_.size() &&
+            ( IndexForLetter( text_[ text_index ] ) != letter_index ||
+              ( uppercase_match && !IsUppercase( text_[ text_index ] ) ) ) ) {
+      ++text_index;
     }
 
-    if ( !node )
+    if ( text_index == text_.size() )
       return Result( false );
 
-    index_sum += node->Index();
+    index_sum += text_index;
+    ++text_index;
   }
 
   return Result( true, &text_, text_is_lowercase_, index_sum,
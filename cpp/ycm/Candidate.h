@@ -19,9 +19,8 @@
 #define CANDIDATE_H_R5LZH6AC
 
 #include "DLLDefines.h"
-#include "LetterNode.h"
+#include "Utils.h"
 
-#include <boost/scoped_ptr.hpp>
 #include <boost/utility.hpp>
 
 #include <string>
@@ -51,6 +50,10 @@ public:
     return text_;
   }
 
+  inline const Bitset &LettersPresent() const {
+    return letters_present_;
+  }
+
   // Returns true if the candidate contains the bits from the query (it may also
   // contain other bits)
   inline bool MatchesQueryBitset( const Bitset &query_bitset ) const {
@@ -65,7 +68,6 @@ private:
   std::string word_boundary_chars_;
   bool text_is_lowercase_;
   Bitset letters_present_;
-  boost::scoped_ptr< LetterNode > root_node_;
 };
 
 } // namespace YouCompleteMe
@@ -0,0 +1,77 @@
+// Copyright (C) 2016 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "CandidateIndex.h"
+
+namespace YouCompleteMe {
+
+void CandidateIndex::AddCandidate( const Candidate *candidate ) {
+  Entry &entry = entries_[ candidate ];
+
+  if ( entry.num_references_++ > 0 )
+    return;
+
+  entry.position_ = candidates_.size();
+  candidates_.push_back( candidate );
+  letters_present_.push_back( candidate->LettersPresent() );
+  lengths_.push_back(
+    static_cast< unsigned char >( candidate->Text().size() ) );
+}
+
+
+void CandidateIndex::RemoveCandidate( const Candidate *candidate ) {
+  boost::unordered_map< const Candidate *, Entry >::iterator it =
+    entries_.find( candidate );
+
+  if ( it == entries_.end() || --it->second.num_references_ > 0 )
+    return;
+
+  // Move the last candidate into the freed position to keep the arrays
+  // contiguous.
+  size_t position = it->second.position_;
+  size_t last_position = candidates_.size() - 1;
+
+  if ( position != last_position ) {
+    candidates_[ position ] = candidates_[ last_position ];
+    letters_present_[ position ] = letters_present_[ last_position ];
+    lengths_[ position ] = lengths_[ last_position ];
+    entries_[ candidates_[ position ] ].position_ = position;
+  }
+
+  candidates_.pop_back();
+  letters_present_.pop_back();
+  lengths_.pop_back();
+  entries_.erase( it );
+}
+
+
+void CandidateIndex::CandidatesPassingPrefilter(
+  const Bitset &query_bitset,
+  size_t query_length,
+  std::vector< const Candidate * > &candidates ) const {
+  size_t num_candidates = candidates_.size();
+
+  // Only the bitsets and lengths are read in this loop; candidates are
+  // accessed when they pass.
+  for ( size_t i = 0; i < num_candidates; ++i ) {
+    if ( lengths_[ i ] >= query_length &&
+         ( letters_present_[ i ] & query_bitset ) == query_bitset )
+      candidates.push_back( candidates_[ i ] );
+  }
+}
+
+} // namespace YouCompleteMe
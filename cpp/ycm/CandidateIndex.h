@@ -0,0 +1,75 @@
+// Copyright (C) 2016 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#ifndef CANDIDATEINDEX_H_QM4TXN8D
+#define CANDIDATEINDEX_H_QM4TXN8D
+
+#include "Candidate.h"
+
+#include <boost/utility.hpp>
+#include <boost/unordered_map.hpp>
+
+#include <vector>
+
+namespace YouCompleteMe {
+
+// Stores candidates in contiguous arrays so that filtering them with a query
+// bitset is a linear scan over memory instead of a pointer chase through the
+// candidates themselves. A candidate can be added several times (e.g. once per
+// file it appears in) but is only stored once; it is removed when it has been
+// removed as many times as it was added.
+class CandidateIndex : boost::noncopyable {
+public:
+  void AddCandidate( const Candidate *candidate );
+
+  void RemoveCandidate( const Candidate *candidate );
+
+  inline size_t Size() const {
+    return candidates_.size();
+  }
+
+  // Appends to |candidates| the candidates that can match the query, i.e. the
+  // ones containing all the query letters and at least as long as the query.
+  void CandidatesPassingPrefilter(
+    const Bitset &query_bitset,
+    size_t query_length,
+    std::vector< const Candidate * > &candidates ) const;
+
+private:
+  struct Entry {
+    Entry()
+      : position_( 0 ),
+        num_references_( 0 )
+    {}
+
+    size_t position_;
+    int num_references_;
+  };
+
+  boost::unordered_map< const Candidate *, Entry > entries_;
+
+  // These three arrays are parallel.
+  std::vector< const Candidate * > candidates_;
+  std::vector< Bitset > letters_present_;
+
+  // Candidates are at most 80 characters long.
+  std::vector< unsigned char > lengths_;
+};
+
+} // namespace YouCompleteMe
+
+#endif /* end of include guard: CANDIDATEINDEX_H_QM4TXN8D */
@@ -20,9 +20,13 @@
 #include "standard.h"
 #include "Utils.h"
 
+#include <boost/bind.hpp>
 #include <boost/thread/locks.hpp>
+#include <boost/thread/thread.hpp>
 #include <boost/algorithm/string.hpp>
 
+#include <algorithm>
+
 #ifdef USE_CLANG_COMPLETER
 #  include "ClangCompleter/CompletionData.h"
 #endif // USE_CLANG_COMPLETER
@@ -31,13 +35,86 @@ namespace YouCompleteMe {
 
 namespace {
 
-// We set a reasonable max limit to prevent issues with huge candidate strings
-// entering the database. Such large candidates are almost never desirable.
 const int MAX_CANDIDATE_SIZE = 80;
 
+// Unreferenced candidates are deleted once they take more memory than this.
+const size_t MAX_UNREFERENCED_BYTES = 64 * 1024 * 1024;
+
+
+// Spawning a thread isn't free; building the candidates of a shard should take
+// much longer.
+const size_t MIN_NUM_CANDIDATES_PER_SHARD = 10000;
+
+typedef std::vector< const std::string * >::const_iterator TextIterator;
+typedef std::vector< const Candidate * >::iterator CandidateIterator;
+
+typedef boost::unordered_map < const std::string *,
+        size_t,
+        TextPointerHash,
+        TextPointerEqual > TextToIndex;
+
+
+size_t EstimatedCandidateSize( const std::string &text ) {
+  return sizeof( CandidateHolder::value_type ) + sizeof( Candidate ) +
+         text.size();
+}
+
+
+void BuildCandidates( TextIterator begin,
+                      TextIterator end,
+                      CandidateIterator output ) {
+  for ( TextIterator it = begin; it != end; ++it, ++output ) {
+    *output = new Candidate( **it );
+  }
+}
+
+
+std::vector< const Candidate * > CreateCandidates(
+  const std::vector< const std::string * > &texts ) {
+  std::vector< const Candidate * > candidates( texts.size() );
+  size_t num_shards = std::min(
+    static_cast< size_t >( boost::thread::hardware_concurrency() ),
+    texts.size() / MIN_NUM_CANDIDATES_PER_SHARD );
+
+  if ( num_shards <= 1 ) {
+    BuildCandidates( texts.begin(), texts.end(), candidates.begin() );
+    return candidates;
+  }
+
+  size_t shard_size = ( texts.size() + num_shards - 1 ) / num_shards;
+  boost::thread_group threads;
+
+  for ( size_t shard = 0; shard < num_shards; ++shard ) {
+    TextIterator begin = texts.begin() + shard * shard_size;
+    TextIterator end = shard + 1 == num_shards ?
+                       texts.end() :
+                       begin + shard_size;
+
+    threads.create_thread( boost::bind( &BuildCandidates,
+                                        begin,
+                                        end,
+                                        candidates.begin() +
+                                        shard * shard_size ) );
+  }
+
+  threads.join_all();
+  return candidates;
+}
+
 }  // unnamed namespace
 
 
+CandidateRepository::Pin::Pin()
+  : lock_( CandidateRepository::Instance().eviction_mutex_ ) {
+}
+
+
+CandidateRepository::Pin::~Pin() {
+  lock_.unlock();
+  CandidateRepository::Instance().EvictUnreferencedCandidatesIfNeeded();
+}
+
+
 boost::mutex CandidateRepository::singleton_mutex_;
 CandidateRepository *CandidateRepository::instance_ = NULL;
 
@@ -59,73 +136,227 @@ int CandidateRepository::NumStoredCandidates() {
 }
 
 
+size_t CandidateRepository::NumStoredBytes() {
+  boost::lock_guard< boost::mutex > locker( holder_mutex_ );
+  return num_stored_bytes_;
+}
+
+
 std::vector< const Candidate * > CandidateRepository::GetCandidatesForStrings(
   const std::vector< std::string > &strings ) {
-  std::vector< const Candidate * > candidates;
-  candidates.reserve( strings.size() );
+  std::vector< const std::string * > texts;
+  texts.reserve( strings.size() );
 
-  {
-    boost::lock_guard< boost::mutex > locker( holder_mutex_ );
+  foreach ( const std::string & candidate_text, strings ) {
+    texts.push_back( &candidate_text );
+  }
+
+  return CandidatesForTexts( texts, false );
+}
+
+#ifdef USE_CLANG_COMPLETER
 
-    foreach ( const std::string & candidate_text, strings ) {
-      const std::string &validated_candidate_text =
-        ValidatedCandidateText( candidate_text );
+std::vector< const Candidate * > CandidateRepository::GetCandidatesForStrings(
+  const std::vector< CompletionData > &datas ) {
+  std::vector< const std::string * > texts;
+  texts.reserve( datas.size() );
 
-      const Candidate *&candidate = GetValueElseInsert(
-                                      candidate_holder_,
-                                      validated_candidate_text,
-                                      NULL );
+  foreach ( const CompletionData & data, datas ) {
+    texts.push_back( &data.original_string_ );
+  }
 
-      if ( !candidate )
-        candidate = new Candidate( validated_candidate_text );
+  return CandidatesForTexts( texts, false );
+}
+
+#endif // USE_CLANG_COMPLETER
 
-      candidates.push_back( candidate );
+
+std::vector< const Candidate * >
+CandidateRepository::AcquireCandidatesForStrings(
+  const std::vector< std::string > &strings ) {
+  std::vector< const std::string * > texts;
+  texts.reserve( strings.size() );
+
+  foreach ( const std::string & candidate_text, strings ) {
+    texts.push_back( &candidate_text );
+  }
+
+  return CandidatesForTexts( texts, true );
+}
+
+
+void CandidateRepository::ReleaseCandidates(
+  const std::vector< const Candidate * > &candidates ) {
+  {
+    boost::lock_guard< boost::mutex > locker( holder_mutex_ );
+
+    foreach ( const Candidate * candidate, candidates ) {
+      CandidateEntry &entry =
+        candidate_holder_.find( &candidate->Text() )->second;
+
+      if ( --entry.num_references_ == 0 )
+        num_unreferenced_bytes_ += EstimatedCandidateSize( candidate->Text() );
     }
   }
 
-  return candidates;
+  EvictUnreferencedCandidatesIfNeeded();
 }
 
-#ifdef USE_CLANG_COMPLETER
 
-std::vector< const Candidate * > CandidateRepository::GetCandidatesForStrings(
-  const std::vector< CompletionData > &datas ) {
-  std::vector< const Candidate * > candidates;
-  candidates.reserve( datas.size() );
+bool CandidateRepository::EvictUnreferencedCandidates() {
+  boost::unique_lock< boost::shared_mutex > eviction_locker(
+    eviction_mutex_, boost::try_to_lock );
+
+  if ( !eviction_locker.owns_lock() )
+    return false;
+
+  boost::lock_guard< boost::mutex > locker( holder_mutex_ );
+  EvictUnreferencedCandidatesNoLock();
+  return true;
+}
+
+
+CandidateRepository::CandidateRepository()
+  : num_stored_bytes_( 0 ),
+    num_unreferenced_bytes_( 0 ) {
+}
+
+
+CandidateRepository::~CandidateRepository() {
+  foreach ( const CandidateHolder::value_type & pair,
+            candidate_holder_ ) {
+    delete pair.second.candidate_;
+  }
+}
+
+
+std::vector< const Candidate * > CandidateRepository::CandidatesForTexts(
+  const std::vector< const std::string * > &texts,
+  bool acquire ) {
+  std::vector< const Candidate * > candidates( texts.size() );
+
+  // Texts that have no candidate yet, without duplicates.
+  TextToIndex missing_texts;
+  std::vector< const std::string * > new_texts;
 
   {
     boost::lock_guard< boost::mutex > locker( holder_mutex_ );
 
-    foreach ( const CompletionData & data, datas ) {
-      const std::string &validated_candidate_text =
-        ValidatedCandidateText( data.original_string_ );
+    for ( size_t i = 0; i < texts.size(); ++i ) {
+      const std::string &text = ValidatedCandidateText( *texts[ i ] );
+      CandidateHolder::iterator it = candidate_holder_.find( &text );
+
+      if ( it == candidate_holder_.end() ) {
+        if ( missing_texts.insert(
+               std::make_pair( &text, new_texts.size() ) ).second ) {
+          new_texts.push_back( &text );
+        }
 
-      const Candidate *&candidate = GetValueElseInsert(
-                                      candidate_holder_,
-                                      validated_candidate_text,
-                                      NULL );
+        continue;
+      }
 
-      if ( !candidate )
-        candidate = new Candidate( validated_candidate_text );
+      if ( acquire )
+        AddReferenceNoLock( it->second );
+
+      candidates[ i ] = it->second.candidate_;
+    }
+  }
+
+  if ( !new_texts.empty() ) {
+    // Building the candidates is the expensive part so it's done without
+    // holding the lock. They are inserted afterwards, unless another thread
+    // inserted a candidate for the same text in the meantime.
+    std::vector< const Candidate * > new_candidates = CreateCandidates(
+      new_texts );
+    std::vector< const Candidate * > duplicate_candidates;
+
+    {
+      boost::lock_guard< boost::mutex > locker( holder_mutex_ );
+
+      for ( size_t i = 0; i < new_candidates.size(); ++i ) {
+        const Candidate *candidate = new_candidates[ i ];
+        CandidateEntry &entry = candidate_holder_[ &candidate->Text() ];
+
+        if ( entry.candidate_ ) {
+          duplicate_candidates.push_back( candidate );
+          new_candidates[ i ] = entry.candidate_;
+        } else {
+          entry.candidate_ = candidate;
+
+          size_t size = EstimatedCandidateSize( candidate->Text() );
+          num_stored_bytes_ += size;
+          num_unreferenced_bytes_ += size;
+        }
+      }
+
+      for ( size_t i = 0; i < texts.size(); ++i ) {
+        if ( candidates[ i ] )
+          continue;
+
+        const std::string &text = ValidatedCandidateText( *texts[ i ] );
+        candidates[ i ] = new_candidates[ missing_texts[ &text ] ];
+
+        if ( acquire )
+          AddReferenceNoLock(
+            candidate_holder_.find( &candidates[ i ]->Text() )->second );
+      }
+    }
 
-      candidates.push_back( candidate );
+    foreach ( const Candidate * candidate, duplicate_candidates ) {
+      delete candidate;
     }
   }
 
+  EvictUnreferencedCandidatesIfNeeded();
   return candidates;
 }
 
-#endif // USE_CLANG_COMPLETER
 
-CandidateRepository::~CandidateRepository() {
-  foreach ( const CandidateHolder::value_type & pair,
-            candidate_holder_ ) {
-    delete pair.second;
+void CandidateRepository::AddReferenceNoLock( CandidateEntry &entry ) {
+  if ( entry.num_references_++ == 0 ) {
+    num_unreferenced_bytes_ -=
+      EstimatedCandidateSize( entry.candidate_->Text() );
+  }
+}
+
+
+void CandidateRepository::EvictUnreferencedCandidatesIfNeeded() {
+  // We never wait for pins to be released; the candidates will be evicted on a
+  // later call.
+  boost::unique_lock< boost::shared_mutex > eviction_locker(
+    eviction_mutex_, boost::try_to_lock );
+
+  if ( !eviction_locker.owns_lock() )
+    return;
+
+  boost::lock_guard< boost::mutex > locker( holder_mutex_ );
+
+  if ( num_unreferenced_bytes_ > MAX_UNREFERENCED_BYTES )
+    EvictUnreferencedCandidatesNoLock();
+}
+
+
+void CandidateRepository::EvictUnreferencedCandidatesNoLock() {
+  CandidateHolder::iterator it = candidate_holder_.begin();
+
+  while ( it != candidate_holder_.end() ) {
+    if ( it->second.num_references_ > 0 ) {
+      ++it;
+      continue;
+    }
+
+    // The key points to the text of the candidate so the candidate is only
+    // deleted once it's removed from the holder.
+    const Candidate *candidate = it->second.candidate_;
+    num_stored_bytes_ -= EstimatedCandidateSize( candidate->Text() );
+    it = candidate_holder_.erase( it );
+    delete candidate;
   }
+
+  num_unreferenced_bytes_ = 0;
 }
 
 
-// Returns a ref to empty_ if candidate not valid.
 const std::string &CandidateRepository::ValidatedCandidateText(
   const std::string &candidate_text ) {
   if ( candidate_text.size() <= MAX_CANDIDATE_SIZE &&
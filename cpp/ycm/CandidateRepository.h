@@ -21,8 +21,11 @@
 #include "DLLDefines.h"
 
 #include <boost/utility.hpp>
+#include <boost/functional/hash.hpp>
 #include <boost/unordered_map.hpp>
 #include <boost/thread/mutex.hpp>
+#include <boost/thread/shared_mutex.hpp>
+#include <boost/thread/locks.hpp>
 
 #include <vector>
 #include <string>
@@ -32,8 +35,36 @@ namespace YouCompleteMe {
 class Candidate;
 struct CompletionData;
 
-typedef boost::unordered_map< std::string, const Candidate * >
-CandidateHolder;
+struct CandidateEntry {
+  CandidateEntry()
+    : candidate_( NULL ),
+      num_references_( 0 )
+  {}
+
+  const Candidate *candidate_;
+  int num_references_;
+};
+
+// The holder is keyed by pointers to the text of its candidates so that the
+// text is only stored once, by the candidate. The pointers are hashed and
+// compared by the text they point to, so looking up a string doesn't need a
+// copy of it.
+struct TextPointerHash {
+  size_t operator()( const std::string *text ) const {
+    return boost::hash< std::string >()( *text );
+  }
+};
+
+struct TextPointerEqual {
+  bool operator()( const std::string *first, const std::string *second ) const {
+    return *first == *second;
+  }
+};
+
+typedef boost::unordered_map < const std::string *,
+        CandidateEntry,
+        TextPointerHash,
+        TextPointerEqual > CandidateHolder;
 
 
 // This singleton stores already built Candidate objects for candidate strings
@@ -44,11 +75,30 @@ CandidateHolder;
 // work is not repeated.
 //
 // This class is thread-safe.
+//
+// Candidates are kept alive as long as they are referenced. Unreferenced
+// candidates are kept around as a cache until they take too much memory, at
+// which point they are all deleted. The candidates returned by
+// GetCandidatesForStrings are not referenced so they must only be used while a
+// Pin is held.
 class CandidateRepository : boost::noncopyable {
 public:
+  // Unreferenced candidates are never deleted while a Pin exists.
+  class Pin : boost::noncopyable {
+  public:
+    YCM_DLL_EXPORT Pin();
+    YCM_DLL_EXPORT ~Pin();
+
+  private:
+    boost::shared_lock< boost::shared_mutex > lock_;
+  };
+
   YCM_DLL_EXPORT static CandidateRepository &Instance();
 
-  int NumStoredCandidates();
+  YCM_DLL_EXPORT int NumStoredCandidates();
+
+  // Estimated memory used by all the stored candidates.
+  YCM_DLL_EXPORT size_t NumStoredBytes();
 
   YCM_DLL_EXPORT std::vector< const Candidate * > GetCandidatesForStrings(
     const std::vector< std::string > &strings );
@@ -58,14 +108,44 @@ public:
     const std::vector< CompletionData > &datas );
 #endif // USE_CLANG_COMPLETER
 
+  // Same as GetCandidatesForStrings, but adds a reference to each returned
+  // candidate so that they stay alive until released.
+  YCM_DLL_EXPORT std::vector< const Candidate * > AcquireCandidatesForStrings(
+    const std::vector< std::string > &strings );
+
+  // Removes one reference to each candidate.
+  YCM_DLL_EXPORT void ReleaseCandidates(
+    const std::vector< const Candidate * > &candidates );
+
+  // Deletes all unreferenced candidates, unless a Pin exists. Returns false in
+  // that case.
+  YCM_DLL_EXPORT bool EvictUnreferencedCandidates();
+
 private:
-  CandidateRepository() {};
+  CandidateRepository();
   ~CandidateRepository();
 
+  // Returns the candidates for |texts|, adding a reference to each of them if
+  // |acquire| is true. The missing candidates are built without holding
+  // holder_mutex_.
+  std::vector< const Candidate * > CandidatesForTexts(
+    const std::vector< const std::string * > &texts,
+    bool acquire );
+
+  void AddReferenceNoLock( CandidateEntry &entry );
+
+  void EvictUnreferencedCandidatesIfNeeded();
+
+  void EvictUnreferencedCandidatesNoLock();
+
   const std::string &ValidatedCandidateText( const std::string &text );
 
   boost::mutex holder_mutex_;
 
+  // Held shared by pins and exclusively when deleting candidates. This mutex
+  // is always locked before holder_mutex_.
+  boost::shared_mutex eviction_mutex_;
+
   static boost::mutex singleton_mutex_;
   static CandidateRepository *instance_;
 
@@ -73,6 +153,9 @@ private:
 
   // This data structure owns all the Candidate pointers
   CandidateHolder candidate_holder_;
+
+  size_t num_stored_bytes_;
+  size_t num_unreferenced_bytes_;
 };
 
 } // namespace YouCompleteMe
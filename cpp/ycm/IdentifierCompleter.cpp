@@ -19,6 +19,7 @@
 #include "standard.h"
 
 #include "Candidate.h"
+#include "CandidateRepository.h"
 #include "IdentifierUtils.h"
 #include "Result.h"
 #include "Utils.h"
@@ -26,14 +27,35 @@
 
 #include <algorithm>
 
+
 namespace YouCompleteMe {
 
+namespace fs = boost::filesystem;
+
+namespace {
+
+// The identifiers of a tag file are stored apart from the ones of the buffers,
+// so that reloading the tag file doesn't remove identifiers from the buffers
+// and vice versa.
+std::string TagFileIdentifiersPath( const std::string &path_to_tag_file,
+                                    const std::string &filepath ) {
+  return "YCM_PLACEHOLDER_FOR_TAGS" + path_to_tag_file + ":" + filepath;
+}
+
+}  // unnamed namespace
+
 
-IdentifierCompleter::IdentifierCompleter() {}
+
+IdentifierCompleter::IdentifierCompleter()
+  : snapshot_generation_( 0 ),
+    has_snapshot_( false ) {
+}
 
 
 IdentifierCompleter::IdentifierCompleter(
-  const std::vector< std::string > &candidates ) {
+  const std::vector< std::string > &candidates )
+  : snapshot_generation_( 0 ),
+    has_snapshot_( false ) {
   identifier_database_.AddIdentifiers( candidates, "", "" );
 }
 
@@ -41,7 +63,9 @@ IdentifierCompleter::IdentifierCompleter(
 IdentifierCompleter::IdentifierCompleter(
   const std::vector< std::string > &candidates,
   const std::string &filetype,
-  const std::string &filepath ) {
+  const std::string &filepath )
+  : snapshot_generation_( 0 ),
+    has_snapshot_( false ) {
   identifier_database_.AddIdentifiers( candidates, filetype, filepath );
 }
 
@@ -61,18 +85,94 @@ void IdentifierCompleter::ClearForFileAndAddIdentifiersToDatabase(
   const std::vector< std::string > &new_candidates,
   const std::string &filetype,
   const std::string &filepath ) {
-  identifier_database_.ClearCandidatesStoredForFile( filetype, filepath );
-  AddIdentifiersToDatabase( new_candidates, filetype, filepath );
+  ReleaseGil unlock;
+  identifier_database_.ReplaceCandidatesStoredForFile( new_candidates,
+                                                       filetype,
+                                                       filepath );
+}
+
+
+void IdentifierCompleter::SetIdentifierOccurrencesInDatabase(
+  const std::vector< std::string > &identifiers,
+  const std::vector< int > &occurrences,
+  const std::string &filetype,
+  const std::string &filepath ) {
+  ReleaseGil unlock;
+  identifier_database_.SetOccurrencesForFile( identifiers,
+                                              occurrences,
+                                              filetype,
+                                              filepath );
+}
+
+
+void IdentifierCompleter::UpdateIdentifiersInDatabase(
+  const std::vector< std::string > &added_candidates,
+  const std::vector< std::string > &removed_candidates,
+  const std::string &filetype,
+  const std::string &filepath ) {
+  ReleaseGil unlock;
+  identifier_database_.UpdateCandidatesStoredForFile( added_candidates,
+                                                      removed_candidates,
+                                                      filetype,
+                                                      filepath );
 }
 
 
 void IdentifierCompleter::AddIdentifiersToDatabaseFromTagFiles(
   const std::vector< std::string > &absolute_paths_to_tag_files ) {
   ReleaseGil unlock;
-  foreach( const std::string & path, absolute_paths_to_tag_files ) {
-    identifier_database_.AddIdentifiers(
-      ExtractIdentifiersFromTagsFile( path ) );
+  LoadTagFiles( absolute_paths_to_tag_files );
+}
+
+
+bool IdentifierCompleter::SaveSnapshot( const std::string &path ) {
+  ReleaseGil unlock;
+  boost::lock_guard< boost::mutex > snapshot_lock( snapshot_mutex_ );
+  size_t generation = identifier_database_.Generation();
+
+  if ( has_snapshot_ && generation == snapshot_generation_ )
+    return true;
+
+  // The states are copied before the candidates so that the snapshot never
+  // has a tag file state without the identifiers that go with it.
+  TagFileStateMap tag_file_states;
+  {
+    boost::lock_guard< boost::mutex > lock( tag_file_states_mutex_ );
+    tag_file_states = tag_file_states_;
   }
+
+  CandidateRepository::Pin pin;
+  FiletypeStoredCandidateMap stored_candidates;
+  identifier_database_.GetStoredCandidates( stored_candidates );
+
+  if ( !WriteIdentifierSnapshot( path, tag_file_states, stored_candidates ) )
+    return false;
+
+  snapshot_generation_ = generation;
+  has_snapshot_ = true;
+  return true;
+}
+
+
+bool IdentifierCompleter::LoadSnapshot( const std::string &path ) {
+  ReleaseGil unlock;
+  boost::lock_guard< boost::mutex > snapshot_lock( snapshot_mutex_ );
+  TagFileStateMap tag_file_states;
+  FiletypeIdentifierMap identifiers;
+
+  if ( !ReadIdentifierSnapshot( path, tag_file_states, identifiers ) )
+    return false;
+
+  identifier_database_.AddIdentifiers( identifiers );
+
+  {
+    boost::lock_guard< boost::mutex > lock( tag_file_states_mutex_ );
+    tag_file_states_.swap( tag_file_states );
+  }
+
+  snapshot_generation_ = identifier_database_.Generation();
+  has_snapshot_ = true;
+  return true;
 }
 
 
@@ -84,14 +184,33 @@ std::vector< std::string > IdentifierCompleter::CandidatesForQuery(
 
 std::vector< std::string > IdentifierCompleter::CandidatesForQueryAndType(
   const std::string &query,
-  const std::string &filetype ) const {
+  const std::string &filetype,
+  size_t max_candidates ) const {
+  return CandidatesForQueryAndTypeNearFiles( query,
+                                             filetype,
+                                             std::vector< std::string >(),
+                                             max_candidates );
+}
+
+
+std::vector< std::string >
+IdentifierCompleter::CandidatesForQueryAndTypeNearFiles(
+  const std::string &query,
+  const std::string &filetype,
+  const std::vector< std::string > &filepaths,
+  size_t max_candidates ) const {
   ReleaseGil unlock;
 
   if ( !IsPrintable( query ) )
     return std::vector< std::string >();
 
+  CandidateRepository::Pin pin;
   std::vector< Result > results;
-  identifier_database_.ResultsForQueryAndType( query, filetype, results );
+  identifier_database_.ResultsForQueryAndType( query,
+                                               filetype,
+                                               filepaths,
+                                               results,
+                                               max_candidates );
 
   std::vector< std::string > candidates;
   candidates.reserve( results.size() );
@@ -103,4 +222,55 @@ std::vector< std::string > IdentifierCompleter::CandidatesForQueryAndType(
 }
 
 
+void IdentifierCompleter::LoadTagFiles(
+  const std::vector< std::string > &paths_to_tag_files ) {
+  boost::lock_guard< boost::mutex > lock( tag_files_mutex_ );
+
+  foreach ( const std::string & path, paths_to_tag_files ) {
+    TagFileState state;
+    {
+      boost::lock_guard< boost::mutex > states_lock( tag_file_states_mutex_ );
+      TagFileStateMap::const_iterator it = tag_file_states_.find( path );
+
+      if ( it != tag_file_states_.end() )
+        state = it->second;
+    }
+
+    std::time_t last_write_time;
+    boost::uintmax_t size;
+
+    try {
+      last_write_time = fs::last_write_time( path );
+      size = fs::file_size( path );
+    } catch ( const fs::filesystem_error & ) {
+      continue;
+    }
+
+    // Happens when the tag file was loaded from a snapshot.
+    if ( last_write_time == state.last_write_time_ && size == state.size_ )
+      continue;
+
+    state.last_write_time_ = last_write_time;
+    state.size_ = size;
+
+    FiletypeIdentifierMap filetype_identifier_map =
+      ExtractChangedIdentifiersFromTagsFile( path, state.fingerprints_ );
+
+    foreach ( const FiletypeIdentifierMap::value_type & filetype_and_map,
+              filetype_identifier_map ) {
+      foreach ( const FilepathToIdentifiers::value_type & path_and_identifiers,
+                filetype_and_map.second ) {
+        identifier_database_.ReplaceCandidatesStoredForFile(
+          path_and_identifiers.second,
+          filetype_and_map.first,
+          TagFileIdentifiersPath( path, path_and_identifiers.first ) );
+      }
+    }
+
+    boost::lock_guard< boost::mutex > states_lock( tag_file_states_mutex_ );
+    tag_file_states_[ path ] = state;
+  }
+}
+
+
 } // namespace YouCompleteMe
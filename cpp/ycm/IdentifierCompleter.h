@@ -20,11 +20,14 @@
 
 #include "DLLDefines.h"
 #include "IdentifierDatabase.h"
+#include "IdentifierSnapshot.h"
+#include "IdentifierUtils.h"
 
 #include <boost/utility.hpp>
 #include <boost/unordered_map.hpp>
 #include <boost/shared_ptr.hpp>
 #include <boost/scoped_ptr.hpp>
+#include <boost/thread.hpp>
 
 #include <vector>
 #include <string>
@@ -56,9 +59,37 @@ public:
     const std::string &filetype,
     const std::string &filepath );
 
+  // Only applies the changes to the identifiers stored for the file: removes
+  // |removed_candidates| and adds |added_candidates|.
+  void UpdateIdentifiersInDatabase(
+    const std::vector< std::string > &added_candidates,
+    const std::vector< std::string > &removed_candidates,
+    const std::string &filetype,
+    const std::string &filepath );
+
+  // Sets the number of times each of |identifiers| occurs in the file, which
+  // is used to rank the identifiers near the files being edited.
+  void SetIdentifierOccurrencesInDatabase(
+    const std::vector< std::string > &identifiers,
+    const std::vector< int > &occurrences,
+    const std::string &filetype,
+    const std::string &filepath );
+
+  // When a tag file is loaded again, only the identifiers of the files whose
+  // tags changed are updated.
   YCM_DLL_EXPORT void AddIdentifiersToDatabaseFromTagFiles(
     const std::vector< std::string > &absolute_paths_to_tag_files );
 
+  // Writes the identifiers and what is known about the loaded tag files to
+  // |path|, unless nothing changed since the last snapshot. Returns false if
+  // the snapshot can't be written.
+  YCM_DLL_EXPORT bool SaveSnapshot( const std::string &path );
+
+  // Restores the identifiers from the snapshot at |path|. Tag files that
+  // didn't change since the snapshot won't be read again, and the others are
+  // reloaded incrementally. Returns false if there is no valid snapshot.
+  YCM_DLL_EXPORT bool LoadSnapshot( const std::string &path );
+
   void AddIdentifiersToDatabaseFromBuffer(
     const std::string &buffer_contents,
     const std::string &filetype,
@@ -69,17 +100,44 @@ public:
   YCM_DLL_EXPORT std::vector< std::string > CandidatesForQuery(
     const std::string &query ) const;
 
+  // Only the best |max_candidates| candidates are returned, unless
+  // |max_candidates| is 0.
   YCM_DLL_EXPORT std::vector< std::string > CandidatesForQueryAndType(
     const std::string &query,
-    const std::string &filetype ) const;
+    const std::string &filetype,
+    size_t max_candidates = 0 ) const;
+
+  // Same as above, but among the candidates that match the query equally
+  // well, the ones from |filepaths| are ranked first. The files should be
+  // ordered from the nearest one, e.g. the current file, to the farthest one.
+  YCM_DLL_EXPORT std::vector< std::string > CandidatesForQueryAndTypeNearFiles(
+    const std::string &query,
+    const std::string &filetype,
+    const std::vector< std::string > &filepaths,
+    size_t max_candidates = 0 ) const;
 
 private:
+  void LoadTagFiles( const std::vector< std::string > &paths_to_tag_files );
+
 
   /////////////////////////////
   // PRIVATE MEMBER VARIABLES
   /////////////////////////////
 
   IdentifierDatabase identifier_database_;
+
+  // Serializes the loading of the tag files.
+  boost::mutex tag_files_mutex_;
+
+  // The state of a tag file is only updated once its identifiers are in the
+  // database.
+  TagFileStateMap tag_file_states_;
+  boost::mutex tag_file_states_mutex_;
+
+  // Generation of the database when the last snapshot was saved or loaded.
+  size_t snapshot_generation_;
+  bool has_snapshot_;
+  boost::mutex snapshot_mutex_;
 };
 
 } // namespace YouCompleteMe
@@ -19,38 +19,117 @@
 #include "standard.h"
 
 #include "Candidate.h"
+#include "CandidateIndex.h"
 #include "CandidateRepository.h"
 #include "IdentifierUtils.h"
 #include "Result.h"
 #include "Utils.h"
 
+#include <boost/bind.hpp>
 #include <boost/thread/locks.hpp>
-#include <boost/unordered_set.hpp>
+#include <boost/thread/thread.hpp>
 #include <boost/algorithm/string.hpp>
 #include <boost/algorithm/cxx11/any_of.hpp>
 
+#include <algorithm>
+#include <iterator>
+
 using boost::algorithm::any_of;
 using boost::algorithm::is_upper;
 
 
 namespace YouCompleteMe {
 
+namespace {
+
+// Spawning a thread isn't free; scoring a shard should take much longer.
+const size_t MIN_NUM_CANDIDATES_PER_SHARD = 10000;
+
+// Beyond that, an identifier occurring more often in a file isn't ranked
+// higher.
+const int MAX_COUNTED_OCCURRENCES = 100;
+
+typedef std::vector< const Candidate * >::const_iterator CandidateIterator;
+
+
+// The proximity of the result of |candidate|, given by the nearest of
+// |near_files| it is stored for.
+int Proximity( const Candidate *candidate,
+               const std::vector< NearFile > &near_files ) {
+  foreach ( const NearFile & near_file, near_files ) {
+    if ( !near_file.candidates_->count( candidate ) )
+      continue;
+
+    int occurrences = 0;
+
+    if ( near_file.occurrences_ ) {
+      boost::unordered_map< const Candidate *, int >::const_iterator it =
+        near_file.occurrences_->find( candidate );
+
+      if ( it != near_file.occurrences_->end() )
+        occurrences = std::min( it->second, MAX_COUNTED_OCCURRENCES );
+    }
+
+    return near_file.proximity_ + occurrences;
+  }
+
+  return 0;
+}
+
+
+void ScoreCandidates( CandidateIterator begin,
+                      CandidateIterator end,
+                      const std::string &query,
+                      bool query_has_uppercase_letters,
+                      const std::vector< NearFile > &near_files,
+                      size_t max_results,
+                      std::vector< Result > *results ) {
+  for ( CandidateIterator it = begin; it != end; ++it ) {
+    Result result = ( *it )->QueryMatchResult( query,
+                                               query_has_uppercase_letters );
+
+    if ( !result.IsSubsequence() )
+      continue;
+
+    // Only the matching candidates are looked up in the near files.
+    if ( !near_files.empty() )
+      result.SetProximity( Proximity( *it, near_files ) );
+
+    results->push_back( result );
+  }
+
+  PartialSort( *results, max_results );
+}
+
+} // unnamed namespace
+
+
 IdentifierDatabase::IdentifierDatabase()
-  : candidate_repository_( CandidateRepository::Instance() ) {
+  : candidate_repository_( CandidateRepository::Instance() ),
+    generation_( 0 ) {
+}
+
+
+IdentifierDatabase::~IdentifierDatabase() {
+  foreach ( const FiletypeCandidateMap::value_type & filetype_and_map,
+            filetype_candidate_map_ ) {
+    foreach ( const FilepathToCandidates::value_type & path_and_candidates,
+              *filetype_and_map.second ) {
+      ReleaseCandidates( *path_and_candidates.second );
+    }
+  }
 }
 
 
 void IdentifierDatabase::AddIdentifiers(
   const FiletypeIdentifierMap &filetype_identifier_map ) {
-  boost::lock_guard< boost::mutex > locker( filetype_candidate_map_mutex_ );
-
   foreach ( const FiletypeIdentifierMap::value_type & filetype_and_map,
             filetype_identifier_map ) {
     foreach( const FilepathToIdentifiers::value_type & filepath_and_identifiers,
              filetype_and_map.second ) {
-      AddIdentifiersNoLock( filepath_and_identifiers.second,
-                            filetype_and_map.first,
-                            filepath_and_identifiers.first );
+      AddIdentifiers( filepath_and_identifiers.second,
+                      filetype_and_map.first,
+                      filepath_and_identifiers.first );
     }
   }
 }
@@ -60,68 +139,333 @@ void IdentifierDatabase::AddIdentifiers(
   const std::vector< std::string > &new_candidates,
   const std::string &filetype,
   const std::string &filepath ) {
-  boost::lock_guard< boost::mutex > locker( filetype_candidate_map_mutex_ );
-  AddIdentifiersNoLock( new_candidates, filetype, filepath );
+  // Getting the candidates from the repository is the expensive part so it's
+  // done before locking the database.
+  std::vector< const Candidate * > repository_candidates =
+    candidate_repository_.AcquireCandidatesForStrings( new_candidates );
+
+  // The set holds a single reference to each of its candidates, and the index
+  // one per set containing the candidate.
+  std::vector< const Candidate * > duplicate_candidates;
+
+  {
+    boost::unique_lock< boost::shared_mutex > locker(
+      filetype_candidate_map_mutex_ );
+    std::set< const Candidate * > &candidates =
+      *GetCandidateSet( filetype, filepath );
+    CandidateIndex &candidate_index = GetCandidateIndex( filetype );
+    ++generation_;
+
+    foreach ( const Candidate * candidate, repository_candidates ) {
+      if ( candidates.insert( candidate ).second )
+        candidate_index.AddCandidate( candidate );
+      else
+        duplicate_candidates.push_back( candidate );
+    }
+  }
+
+  candidate_repository_.ReleaseCandidates( duplicate_candidates );
+}
+
+
+void IdentifierDatabase::ReplaceCandidatesStoredForFile(
+  const std::vector< std::string > &new_candidates,
+  const std::string &filetype,
+  const std::string &filepath ) {
+  std::vector< const Candidate * > repository_candidates =
+    candidate_repository_.AcquireCandidatesForStrings( new_candidates );
+
+  // The new set is built before locking the database so that queries are only
+  // blocked while it's swapped in.
+  boost::shared_ptr< std::set< const Candidate * > > new_candidate_set(
+    new std::set< const Candidate * >() );
+  std::vector< const Candidate * > released_candidates;
+
+  foreach ( const Candidate * candidate, repository_candidates ) {
+    if ( !new_candidate_set->insert( candidate ).second )
+      released_candidates.push_back( candidate );
+  }
+
+  {
+    boost::unique_lock< boost::shared_mutex > locker(
+      filetype_candidate_map_mutex_ );
+    boost::shared_ptr< std::set< const Candidate * > > &candidate_set =
+      GetCandidateSet( filetype, filepath );
+    CandidateIndex &candidate_index = GetCandidateIndex( filetype );
+    ++generation_;
+
+    // Files are usually reparsed with few changes so only the differences
+    // between the old and new sets are applied to the index.
+    std::vector< const Candidate * > removed_candidates;
+    std::set_difference( candidate_set->begin(),
+                         candidate_set->end(),
+                         new_candidate_set->begin(),
+                         new_candidate_set->end(),
+                         std::back_inserter( removed_candidates ) );
+
+    std::vector< const Candidate * > added_candidates;
+    std::set_difference( new_candidate_set->begin(),
+                         new_candidate_set->end(),
+                         candidate_set->begin(),
+                         candidate_set->end(),
+                         std::back_inserter( added_candidates ) );
+
+    foreach ( const Candidate * candidate, removed_candidates ) {
+      candidate_index.RemoveCandidate( candidate );
+    }
+
+    ForgetOccurrences( removed_candidates, filetype, filepath );
+
+    foreach ( const Candidate * candidate, added_candidates ) {
+      candidate_index.AddCandidate( candidate );
+    }
+
+    released_candidates.insert( released_candidates.end(),
+                                candidate_set->begin(),
+                                candidate_set->end() );
+    candidate_set.swap( new_candidate_set );
+  }
+
+  candidate_repository_.ReleaseCandidates( released_candidates );
+}
+
+
+void IdentifierDatabase::UpdateCandidatesStoredForFile(
+  const std::vector< std::string > &added_candidates,
+  const std::vector< std::string > &removed_candidates,
+  const std::string &filetype,
+  const std::string &filepath ) {
+  std::vector< const Candidate * > added_repository_candidates =
+    candidate_repository_.AcquireCandidatesForStrings( added_candidates );
+
+  // The removed candidates are only looked up; the pin keeps them alive until
+  // they are removed from the database.
+  CandidateRepository::Pin pin;
+  std::vector< const Candidate * > removed_repository_candidates =
+    candidate_repository_.GetCandidatesForStrings( removed_candidates );
+  std::vector< const Candidate * > released_candidates;
+
+  {
+    boost::unique_lock< boost::shared_mutex > locker(
+      filetype_candidate_map_mutex_ );
+    std::set< const Candidate * > &candidates =
+      *GetCandidateSet( filetype, filepath );
+    CandidateIndex &candidate_index = GetCandidateIndex( filetype );
+    ++generation_;
+
+    foreach ( const Candidate * candidate, removed_repository_candidates ) {
+      if ( candidates.erase( candidate ) ) {
+        candidate_index.RemoveCandidate( candidate );
+        released_candidates.push_back( candidate );
+      }
+    }
+
+    ForgetOccurrences( removed_repository_candidates, filetype, filepath );
+
+    foreach ( const Candidate * candidate, added_repository_candidates ) {
+      if ( candidates.insert( candidate ).second )
+        candidate_index.AddCandidate( candidate );
+      else
+        released_candidates.push_back( candidate );
+    }
+  }
+
+  candidate_repository_.ReleaseCandidates( released_candidates );
 }
 
 
 void IdentifierDatabase::ClearCandidatesStoredForFile(
   const std::string &filetype,
   const std::string &filepath ) {
-  boost::lock_guard< boost::mutex > locker( filetype_candidate_map_mutex_ );
-  GetCandidateSet( filetype, filepath ).clear();
+  ReplaceCandidatesStoredForFile( std::vector< std::string >(),
+                                  filetype,
+                                  filepath );
+}
+
+
+void IdentifierDatabase::SetOccurrencesForFile(
+  const std::vector< std::string > &candidates,
+  const std::vector< int > &occurrences,
+  const std::string &filetype,
+  const std::string &filepath ) {
+  CandidateRepository::Pin pin;
+  std::vector< const Candidate * > repository_candidates =
+    candidate_repository_.GetCandidatesForStrings( candidates );
+
+  boost::unique_lock< boost::shared_mutex > locker(
+    filetype_candidate_map_mutex_ );
+  FiletypeCandidateMap::const_iterator path_to_candidates =
+    filetype_candidate_map_.find( filetype );
+
+  if ( path_to_candidates == filetype_candidate_map_.end() )
+    return;
+
+  FilepathToCandidates::const_iterator stored_candidates =
+    path_to_candidates->second->find( filepath );
+
+  if ( stored_candidates == path_to_candidates->second->end() )
+    return;
+
+  boost::unordered_map< const Candidate *, int > &file_occurrences =
+    filetype_occurrence_map_[ filetype ][ filepath ];
+
+  for ( size_t i = 0;
+        i < repository_candidates.size() && i < occurrences.size(); ++i ) {
+    const Candidate *candidate = repository_candidates[ i ];
+
+    // The occurrences of a candidate that isn't stored for the file could
+    // outlive it.
+    if ( !stored_candidates->second->count( candidate ) )
+      continue;
+
+    if ( occurrences[ i ] > 0 )
+      file_occurrences[ candidate ] = occurrences[ i ];
+    else
+      file_occurrences.erase( candidate );
+  }
 }
 
 
 void IdentifierDatabase::ResultsForQueryAndType(
   const std::string &query,
   const std::string &filetype,
-  std::vector< Result > &results ) const {
-  FiletypeCandidateMap::const_iterator it;
-  {
-    boost::lock_guard< boost::mutex > locker( filetype_candidate_map_mutex_ );
-    it = filetype_candidate_map_.find( filetype );
+  std::vector< Result > &results,
+  size_t max_results ) const {
+  ResultsForQueryAndType( query,
+                          filetype,
+                          std::vector< std::string >(),
+                          results,
+                          max_results );
+}
+
+
+void IdentifierDatabase::ResultsForQueryAndType(
+  const std::string &query,
+  const std::string &filetype,
+  const std::vector< std::string > &filepaths,
+  std::vector< Result > &results,
+  size_t max_results ) const {
+  if ( query.empty() )
+    return;
 
-    if ( it == filetype_candidate_map_.end() || query.empty() )
-      return;
-  }
   Bitset query_bitset = LetterBitsetFromString( query );
   bool query_has_uppercase_letters = any_of( query, is_upper() );
 
-  boost::unordered_set< const Candidate * > seen_candidates;
-  seen_candidates.reserve( candidate_repository_.NumStoredCandidates() );
+  std::vector< const Candidate * > candidates;
+  std::vector< NearFile > near_files;
+  boost::shared_lock< boost::shared_mutex > locker(
+    filetype_candidate_map_mutex_ );
+  FiletypeCandidateIndexMap::const_iterator it =
+    filetype_candidate_index_map_.find( filetype );
+
+  if ( it == filetype_candidate_index_map_.end() )
+    return;
+
+  it->second->CandidatesPassingPrefilter( query_bitset,
+                                          query.size(),
+                                          candidates );
+  GetNearFiles( filetype, filepaths, near_files );
+
+  // The pin of the caller keeps the candidates alive, so scoring them doesn't
+  // need the database, except to look them up in the near files. Readers don't
+  // block each other, so holding the lock while scoring only delays writers.
+  if ( near_files.empty() )
+    locker.unlock();
+
+  size_t num_shards = std::min(
+    static_cast< size_t >( boost::thread::hardware_concurrency() ),
+    candidates.size() / MIN_NUM_CANDIDATES_PER_SHARD );
+
+  if ( num_shards <= 1 ) {
+    ScoreCandidates( candidates.begin(),
+                     candidates.end(),
+                     query,
+                     query_has_uppercase_letters,
+                     near_files,
+                     max_results,
+                     &results );
+    return;
+  }
 
-  {
-    boost::lock_guard< boost::mutex > locker( filetype_candidate_map_mutex_ );
-    foreach ( const FilepathToCandidates::value_type & path_and_candidates,
-              *it->second ) {
-      foreach ( const Candidate * candidate, *path_and_candidates.second ) {
-        if ( ContainsKey( seen_candidates, candidate ) )
-          continue;
-        else
-          seen_candidates.insert( candidate );
+  std::vector< std::vector< Result > > shard_results( num_shards );
+  size_t shard_size = ( candidates.size() + num_shards - 1 ) / num_shards;
+  boost::thread_group threads;
+
+  for ( size_t shard = 0; shard < num_shards; ++shard ) {
+    CandidateIterator begin = candidates.begin() + shard * shard_size;
+    CandidateIterator end = shard + 1 == num_shards ?
+                            candidates.end() :
+                            begin + shard_size;
+
+    threads.create_thread( boost::bind( &ScoreCandidates,
+                                        begin,
+                                        end,
+                                        boost::cref( query ),
+                                        query_has_uppercase_letters,
+                                        boost::cref( near_files ),
+                                        max_results,
+                                        &shard_results[ shard ] ) );
+  }
+
+  threads.join_all();
 
-        if ( !candidate->MatchesQueryBitset( query_bitset ) )
-          continue;
+  foreach ( const std::vector< Result > &shard, shard_results ) {
+    results.insert( results.end(), shard.begin(), shard.end() );
+  }
+
+  PartialSort( results, max_results );
+}
 
-        Result result = candidate->QueryMatchResult(
-                          query, query_has_uppercase_letters );
 
-        if ( result.IsSubsequence() )
-          results.push_back( result );
-      }
+size_t IdentifierDatabase::Generation() const {
+  boost::shared_lock< boost::shared_mutex > locker(
+    filetype_candidate_map_mutex_ );
+  return generation_;
+}
+
+
+void IdentifierDatabase::GetStoredCandidates(
+  FiletypeStoredCandidateMap &stored_candidates ) const {
+  boost::shared_lock< boost::shared_mutex > locker(
+    filetype_candidate_map_mutex_ );
+
+  foreach ( const FiletypeCandidateMap::value_type & filetype_and_map,
+            filetype_candidate_map_ ) {
+    foreach ( const FilepathToCandidates::value_type & path_and_candidates,
+              *filetype_and_map.second ) {
+      if ( path_and_candidates.second->empty() )
+        continue;
+
+      stored_candidates[ filetype_and_map.first ][ path_and_candidates.first ]
+      .assign( path_and_candidates.second->begin(),
+               path_and_candidates.second->end() );
     }
   }
+}
 
-  std::sort( results.begin(), results.end() );
+
+void IdentifierDatabase::ReleaseCandidates(
+  const std::set< const Candidate * > &candidates ) {
+  candidate_repository_.ReleaseCandidates(
+    std::vector< const Candidate * >( candidates.begin(), candidates.end() ) );
 }
 
 
-// WARNING: You need to hold the filetype_candidate_map_mutex_ before calling
-// this function and while using the returned set.
-std::set< const Candidate * > &IdentifierDatabase::GetCandidateSet(
-  const std::string &filetype,
-  const std::string &filepath ) {
+CandidateIndex &IdentifierDatabase::GetCandidateIndex(
+  const std::string &filetype ) {
+  boost::shared_ptr< CandidateIndex > &candidate_index =
+    filetype_candidate_index_map_[ filetype ];
+
+  if ( !candidate_index )
+    candidate_index.reset( new CandidateIndex() );
+
+  return *candidate_index;
+}
+
+
+boost::shared_ptr< std::set< const Candidate * > > &
+IdentifierDatabase::GetCandidateSet( const std::string &filetype,
+                                     const std::string &filepath ) {
   boost::shared_ptr< FilepathToCandidates > &path_to_candidates =
     filetype_candidate_map_[ filetype ];
 
@@ -134,24 +478,69 @@ std::set< const Candidate * > &IdentifierDatabase::GetCandidateSet(
   if ( !candidates )
     candidates.reset( new std::set< const Candidate * >() );
 
-  return *candidates;
+  return candidates;
 }
 
 
-// WARNING: You need to hold the filetype_candidate_map_mutex_ before calling
-// this function and while using the returned set.
-void IdentifierDatabase::AddIdentifiersNoLock(
-  const std::vector< std::string > &new_candidates,
+void IdentifierDatabase::ForgetOccurrences(
+  const std::vector< const Candidate * > &candidates,
   const std::string &filetype,
   const std::string &filepath ) {
-  std::set< const Candidate *> &candidates =
-    GetCandidateSet( filetype, filepath );
+  FiletypeOccurrenceMap::iterator path_to_occurrences =
+    filetype_occurrence_map_.find( filetype );
 
-  std::vector< const Candidate * > repository_candidates =
-    candidate_repository_.GetCandidatesForStrings( new_candidates );
+  if ( path_to_occurrences == filetype_occurrence_map_.end() )
+    return;
 
-  candidates.insert( repository_candidates.begin(),
-                     repository_candidates.end() );
+  FilepathToOccurrences::iterator file_occurrences =
+    path_to_occurrences->second.find( filepath );
+
+  if ( file_occurrences == path_to_occurrences->second.end() )
+    return;
+
+  foreach ( const Candidate * candidate, candidates ) {
+    file_occurrences->second.erase( candidate );
+  }
+}
+
+
+void IdentifierDatabase::GetNearFiles(
+  const std::string &filetype,
+  const std::vector< std::string > &filepaths,
+  std::vector< NearFile > &near_files ) const {
+  FiletypeCandidateMap::const_iterator path_to_candidates =
+    filetype_candidate_map_.find( filetype );
+
+  if ( path_to_candidates == filetype_candidate_map_.end() )
+    return;
+
+  FiletypeOccurrenceMap::const_iterator path_to_occurrences =
+    filetype_occurrence_map_.find( filetype );
+
+  // The nearest files come first and get the highest proximity.
+  for ( size_t i = 0; i < filepaths.size(); ++i ) {
+    FilepathToCandidates::const_iterator stored_candidates =
+      path_to_candidates->second->find( filepaths[ i ] );
+
+    if ( stored_candidates == path_to_candidates->second->end() ||
+         stored_candidates->second->empty() )
+      continue;
+
+    NearFile near_file;
+    near_file.candidates_ = stored_candidates->second.get();
+    near_file.proximity_ = ( filepaths.size() - i ) *
+                           ( MAX_COUNTED_OCCURRENCES + 1 );
+
+    if ( path_to_occurrences != filetype_occurrence_map_.end() ) {
+      FilepathToOccurrences::const_iterator it =
+        path_to_occurrences->second.find( filepaths[ i ] );
+
+      if ( it != path_to_occurrences->second.end() )
+        near_file.occurrences_ = &it->second;
+    }
+
+    near_files.push_back( near_file );
+  }
 }
 
 
@@ -20,7 +20,7 @@
 
 #include <boost/utility.hpp>
 #include <boost/unordered_map.hpp>
-#include <boost/thread/mutex.hpp>
+#include <boost/thread/shared_mutex.hpp>
 #include <boost/shared_ptr.hpp>
 
 #include <vector>
@@ -31,6 +31,7 @@
 namespace YouCompleteMe {
 
 class Candidate;
+class CandidateIndex;
 class Result;
 class CandidateRepository;
 
@@ -43,6 +44,34 @@ FilepathToIdentifiers;
 typedef std::map< std::string, FilepathToIdentifiers >
 FiletypeIdentifierMap;
 
+// filepath -> candidates
+typedef std::map< std::string, std::vector< const Candidate * > >
+FilepathToStoredCandidates;
+
+// filetype -> (filepath -> candidates)
+typedef std::map< std::string, FilepathToStoredCandidates >
+FiletypeStoredCandidateMap;
+
+
+// The candidates stored for one of the files whose results are ranked first,
+// see IdentifierDatabase::ResultsForQueryAndType.
+struct NearFile {
+  NearFile()
+    : candidates_( NULL ),
+      occurrences_( NULL ),
+      proximity_( 0 ) {
+  }
+
+  const std::set< const Candidate * > *candidates_;
+
+  // *candidate -> number of occurrences in the file; NULL if none were set.
+  const boost::unordered_map< const Candidate *, int > *occurrences_;
+
+  // The proximity of the results of the file before counting occurrences, see
+  // Result::SetProximity.
+  int proximity_;
+};
+
 
 // This class stores the database of identifiers the identifier completer has
 // seen. It stores them in a data structure that makes it easy to tell which
@@ -56,6 +85,7 @@ FiletypeIdentifierMap;
 class IdentifierDatabase : boost::noncopyable {
 public:
   IdentifierDatabase();
+  ~IdentifierDatabase();
 
   void AddIdentifiers( const FiletypeIdentifierMap &filetype_identifier_map );
 
@@ -64,23 +94,81 @@ public:
     const std::string &filetype,
     const std::string &filepath );
 
+  // Replaces all the candidates stored for the file. Queries are only blocked
+  // while the new candidates are swapped in.
+  void ReplaceCandidatesStoredForFile(
+    const std::vector< std::string > &new_candidates,
+    const std::string &filetype,
+    const std::string &filepath );
+
+  // Removes |removed_candidates| from the candidates stored for the file and
+  // adds |added_candidates| to them.
+  void UpdateCandidatesStoredForFile(
+    const std::vector< std::string > &added_candidates,
+    const std::vector< std::string > &removed_candidates,
+    const std::string &filetype,
+    const std::string &filepath );
+
   void ClearCandidatesStoredForFile( const std::string &filetype,
                                      const std::string &filepath );
 
+  // Sets the number of times each of |candidates| occurs in the file. A
+  // candidate that doesn't occur in the file anymore is given 0 occurrences.
+  // Only the candidates stored for the file are taken into account.
+  void SetOccurrencesForFile(
+    const std::vector< std::string > &candidates,
+    const std::vector< int > &occurrences,
+    const std::string &filetype,
+    const std::string &filepath );
+
+  // Only the best |max_results| results are returned, unless |max_results| is
+  // 0. When a filetype has many candidates, they are scored in parallel shards.
+  // The results refer to candidates that may be deleted once they are removed
+  // from the database, so the caller must hold a CandidateRepository::Pin while
+  // using them.
+  void ResultsForQueryAndType( const std::string &query,
+                               const std::string &filetype,
+                               std::vector< Result > &results,
+                               size_t max_results = 0 ) const;
+
+  // Same as above, but among the results that match the query equally well,
+  // the ones stored for |filepaths| are ranked first: those of the first file
+  // before those of the second one and so on, and then by their number of
+  // occurrences in that file.
   void ResultsForQueryAndType( const std::string &query,
                                const std::string &filetype,
-                               std::vector< Result > &results ) const;
+                               const std::vector< std::string > &filepaths,
+                               std::vector< Result > &results,
+                               size_t max_results = 0 ) const;
+
+  // Incremented every time the stored candidates are modified.
+  size_t Generation() const;
+
+  // Fills |stored_candidates| with the candidates stored for each file. The
+  // candidates may be deleted once they are removed from the database, so the
+  // caller must hold a CandidateRepository::Pin while using them.
+  void GetStoredCandidates(
+    FiletypeStoredCandidateMap &stored_candidates ) const;
 
 private:
-  std::set< const Candidate * > &GetCandidateSet(
-    const std::string &filetype,
-    const std::string &filepath );
+  void ReleaseCandidates( const std::set< const Candidate * > &candidates );
 
-  void AddIdentifiersNoLock(
-    const std::vector< std::string > &new_candidates,
+  CandidateIndex &GetCandidateIndex( const std::string &filetype );
+
+  boost::shared_ptr< std::set< const Candidate * > > &GetCandidateSet(
     const std::string &filetype,
     const std::string &filepath );
 
+  void ForgetOccurrences( const std::vector< const Candidate * > &candidates,
+                          const std::string &filetype,
+                          const std::string &filepath );
+
+  // WARNING: The near files point into the database, so the caller must hold
+  // the filetype_candidate_map_mutex_ for as long as it uses them.
+  void GetNearFiles( const std::string &filetype,
+                     const std::vector< std::string > &filepaths,
+                     std::vector< NearFile > &near_files ) const;
+
 
   // filepath -> *( *candidate )
   typedef boost::unordered_map < std::string,
@@ -91,11 +179,34 @@ private:
   typedef boost::unordered_map < std::string,
           boost::shared_ptr< FilepathToCandidates > > FiletypeCandidateMap;
 
+  // filepath -> ( *candidate -> number of occurrences in the file )
+  typedef boost::unordered_map < std::string,
+          boost::unordered_map< const Candidate *, int > >
+          FilepathToOccurrences;
+
+  // filetype -> ( filepath -> ( *candidate -> number of occurrences ) )
+  typedef boost::unordered_map < std::string, FilepathToOccurrences >
+  FiletypeOccurrenceMap;
+
+  // filetype -> deduplicated candidates of all the filepaths
+  typedef boost::unordered_map < std::string,
+          boost::shared_ptr< CandidateIndex > > FiletypeCandidateIndexMap;
+
 
   CandidateRepository &candidate_repository_;
 
   FiletypeCandidateMap filetype_candidate_map_;
-  mutable boost::mutex filetype_candidate_map_mutex_;
+
+  // Updated along with the candidate sets of the filetype.
+  FiletypeCandidateIndexMap filetype_candidate_index_map_;
+
+  // Only holds candidates that are stored for the file.
+  FiletypeOccurrenceMap filetype_occurrence_map_;
+
+  size_t generation_;
+
+  // Queries only need a shared lock.
+  mutable boost::shared_mutex filetype_candidate_map_mutex_;
 };
 
 } // namespace YouCompleteMe
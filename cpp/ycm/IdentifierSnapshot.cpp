@@ -0,0 +1,437 @@
+// Copyright (C) 2016 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+
+#include "IdentifierSnapshot.h"
+#include "Candidate.h"
+#include "standard.h"
+
+#include <cstring>
+#include <limits>
+
+#include <boost/filesystem/fstream.hpp>
+#include <boost/interprocess/file_mapping.hpp>
+#include <boost/interprocess/mapped_region.hpp>
+
+namespace YouCompleteMe {
+
+namespace fs = boost::filesystem;
+namespace bi = boost::interprocess;
+
+namespace {
+
+const char SNAPSHOT_MAGIC[] = "YCMIDSNP";
+const size_t SNAPSHOT_MAGIC_LENGTH = sizeof( SNAPSHOT_MAGIC ) - 1;
+
+// Bump this when the format changes; older snapshots are then ignored.
+const boost::uint32_t SNAPSHOT_VERSION = 1;
+
+const boost::uint32_t BYTE_ORDER_MARK = 0x01020304;
+
+// Strings are stored once and referred to by their index.
+const size_t STRING_SIZE = sizeof( boost::uint32_t );
+
+// The smallest number of bytes taken by each of the items that follow a count
+// in the snapshot, used to reject counts that can't fit in it.
+const size_t TAG_FILE_STATE_SIZE = STRING_SIZE + sizeof( boost::int64_t ) +
+                                   sizeof( boost::uint64_t ) +
+                                   sizeof( boost::uint32_t );
+const size_t FINGERPRINT_SIZE = 2 * STRING_SIZE + sizeof( boost::uint64_t );
+const size_t FILETYPE_SIZE = STRING_SIZE + sizeof( boost::uint32_t );
+const size_t FILE_SIZE = STRING_SIZE + sizeof( boost::uint32_t );
+const size_t CANDIDATE_SIZE = STRING_SIZE;
+
+
+template < typename T >
+void AppendInteger( std::string &buffer, T value ) {
+  buffer.append( reinterpret_cast< const char * >( &value ), sizeof( value ) );
+}
+
+
+class SnapshotWriter {
+public:
+  SnapshotWriter() {
+    string_offsets_.push_back( 0 );
+  }
+
+  boost::uint32_t AddString( const std::string &text ) {
+    boost::unordered_map< std::string, boost::uint32_t >::iterator it =
+      string_indices_.find( text );
+
+    if ( it != string_indices_.end() )
+      return it->second;
+
+    boost::uint32_t index = AppendString( text );
+    string_indices_[ text ] = index;
+    return index;
+  }
+
+  // Candidates are unique per text so they are deduplicated by address, which
+  // doesn't require copying their text.
+  boost::uint32_t AddCandidate( const Candidate *candidate ) {
+    boost::unordered_map< const Candidate *, boost::uint32_t >::iterator it =
+      candidate_indices_.find( candidate );
+
+    if ( it != candidate_indices_.end() )
+      return it->second;
+
+    boost::uint32_t index = AppendString( candidate->Text() );
+    candidate_indices_[ candidate ] = index;
+    return index;
+  }
+
+  std::string &Body() {
+    return body_;
+  }
+
+  bool WriteTo( const fs::path &path ) const {
+    if ( strings_.size() > std::numeric_limits< boost::uint32_t >::max() )
+      return false;
+
+    std::string header( SNAPSHOT_MAGIC, SNAPSHOT_MAGIC_LENGTH );
+    AppendInteger( header, SNAPSHOT_VERSION );
+    AppendInteger( header, BYTE_ORDER_MARK );
+    AppendInteger( header, static_cast< boost::uint32_t >(
+                     string_offsets_.size() - 1 ) );
+
+    fs::ofstream file( path, std::ios::out | std::ios::binary );
+    file.write( header.data(), header.size() );
+    file.write( reinterpret_cast< const char * >( &string_offsets_[ 0 ] ),
+                string_offsets_.size() * sizeof( boost::uint32_t ) );
+    file.write( strings_.data(), strings_.size() );
+    file.write( body_.data(), body_.size() );
+    file.close();
+    return !file.fail();
+  }
+
+private:
+  boost::uint32_t AppendString( const std::string &text ) {
+    strings_.append( text );
+    string_offsets_.push_back( static_cast< boost::uint32_t >(
+                                 strings_.size() ) );
+    return static_cast< boost::uint32_t >( string_offsets_.size() - 2 );
+  }
+
+  std::string strings_;
+  std::vector< boost::uint32_t > string_offsets_;
+  boost::unordered_map< std::string, boost::uint32_t > string_indices_;
+  boost::unordered_map< const Candidate *, boost::uint32_t > candidate_indices_;
+  std::string body_;
+};
+
+
+// Reads a snapshot mapped in memory. Every read is bounds-checked so that a
+// truncated or corrupted snapshot is rejected instead of crashing.
+class SnapshotReader {
+public:
+  SnapshotReader( const char *begin, const char *end )
+    : position_( begin ),
+      end_( end ),
+      num_strings_( 0 ),
+      string_offsets_( NULL ),
+      strings_( NULL ) {
+  }
+
+  bool ReadHeader() {
+    boost::uint32_t version;
+    boost::uint32_t byte_order_mark;
+
+    if ( static_cast< size_t >( end_ - position_ ) < SNAPSHOT_MAGIC_LENGTH ||
+         std::memcmp( position_, SNAPSHOT_MAGIC, SNAPSHOT_MAGIC_LENGTH ) != 0 )
+      return false;
+
+    position_ += SNAPSHOT_MAGIC_LENGTH;
+
+    if ( !ReadInteger( &version ) || version != SNAPSHOT_VERSION ||
+         !ReadInteger( &byte_order_mark ) ||
+         byte_order_mark != BYTE_ORDER_MARK ||
+         !ReadInteger( &num_strings_ ) )
+      return false;
+
+    size_t offsets_size = ( static_cast< size_t >( num_strings_ ) + 1 ) *
+                          sizeof( boost::uint32_t );
+
+    if ( static_cast< size_t >( end_ - position_ ) < offsets_size )
+      return false;
+
+    string_offsets_ = position_;
+    position_ += offsets_size;
+
+    boost::uint32_t strings_size = StringOffset( num_strings_ );
+
+    if ( static_cast< size_t >( end_ - position_ ) < strings_size )
+      return false;
+
+    strings_ = position_;
+    position_ += strings_size;
+    return true;
+  }
+
+  template < typename T >
+  bool ReadInteger( T *value ) {
+    if ( static_cast< size_t >( end_ - position_ ) < sizeof( T ) )
+      return false;
+
+    // The snapshot is mapped in memory, so the integers may not be aligned.
+    std::memcpy( value, position_, sizeof( T ) );
+    position_ += sizeof( T );
+    return true;
+  }
+
+  // Reads the number of items that follow, each taking at least
+  // |min_item_size| bytes. A count that can't fit in the rest of the snapshot
+  // is rejected before anything is allocated for it, so that a corrupted count
+  // can't exhaust memory.
+  bool ReadCount( boost::uint32_t *count, size_t min_item_size ) {
+    return ReadInteger( count ) &&
+           *count <= static_cast< size_t >( end_ - position_ ) / min_item_size;
+  }
+
+  bool ReadString( std::string *text ) {
+    boost::uint32_t index;
+
+    if ( !ReadInteger( &index ) || index >= num_strings_ )
+      return false;
+
+    boost::uint32_t begin = StringOffset( index );
+    boost::uint32_t end = StringOffset( index + 1 );
+
+    if ( begin > end || end > StringOffset( num_strings_ ) )
+      return false;
+
+    text->assign( strings_ + begin, strings_ + end );
+    return true;
+  }
+
+  bool AtEnd() const {
+    return position_ == end_;
+  }
+
+private:
+  boost::uint32_t StringOffset( boost::uint32_t index ) const {
+    boost::uint32_t offset;
+    std::memcpy( &offset,
+                 string_offsets_ + index * sizeof( boost::uint32_t ),
+                 sizeof( offset ) );
+    return offset;
+  }
+
+  const char *position_;
+  const char *end_;
+  boost::uint32_t num_strings_;
+  const char *string_offsets_;
+  const char *strings_;
+};
+
+
+bool ReadTagFileStates( SnapshotReader &reader,
+                        TagFileStateMap &tag_file_states ) {
+  boost::uint32_t num_tag_files;
+
+  if ( !reader.ReadCount( &num_tag_files, TAG_FILE_STATE_SIZE ) )
+    return false;
+
+  for ( boost::uint32_t i = 0; i < num_tag_files; ++i ) {
+    std::string path;
+    boost::int64_t last_write_time;
+    boost::uint64_t size;
+    boost::uint32_t num_fingerprints;
+
+    if ( !reader.ReadString( &path ) ||
+         !reader.ReadInteger( &last_write_time ) ||
+         !reader.ReadInteger( &size ) ||
+         !reader.ReadCount( &num_fingerprints, FINGERPRINT_SIZE ) )
+      return false;
+
+    TagFileState &state = tag_file_states[ path ];
+    state.last_write_time_ = static_cast< std::time_t >( last_write_time );
+    state.size_ = static_cast< boost::uintmax_t >( size );
+
+    for ( boost::uint32_t j = 0; j < num_fingerprints; ++j ) {
+      std::string filetype;
+      std::string filepath;
+      boost::uint64_t fingerprint;
+
+      if ( !reader.ReadString( &filetype ) ||
+           !reader.ReadString( &filepath ) ||
+           !reader.ReadInteger( &fingerprint ) )
+        return false;
+
+      state.fingerprints_[ filetype ][ filepath ] =
+        static_cast< size_t >( fingerprint );
+    }
+  }
+
+  return true;
+}
+
+
+bool ReadIdentifiers( SnapshotReader &reader,
+                      FiletypeIdentifierMap &identifiers ) {
+  boost::uint32_t num_filetypes;
+
+  if ( !reader.ReadCount( &num_filetypes, FILETYPE_SIZE ) )
+    return false;
+
+  for ( boost::uint32_t i = 0; i < num_filetypes; ++i ) {
+    std::string filetype;
+    boost::uint32_t num_files;
+
+    if ( !reader.ReadString( &filetype ) ||
+         !reader.ReadCount( &num_files, FILE_SIZE ) )
+      return false;
+
+    FilepathToIdentifiers &filepath_to_identifiers = identifiers[ filetype ];
+
+    for ( boost::uint32_t j = 0; j < num_files; ++j ) {
+      std::string filepath;
+      boost::uint32_t num_candidates;
+
+      if ( !reader.ReadString( &filepath ) ||
+           !reader.ReadCount( &num_candidates, CANDIDATE_SIZE ) )
+        return false;
+
+      std::vector< std::string > &file_identifiers =
+        filepath_to_identifiers[ filepath ];
+      file_identifiers.resize( num_candidates );
+
+      for ( boost::uint32_t k = 0; k < num_candidates; ++k ) {
+        if ( !reader.ReadString( &file_identifiers[ k ] ) )
+          return false;
+      }
+    }
+  }
+
+  return true;
+}
+
+} // unnamed namespace
+
+
+bool WriteIdentifierSnapshot(
+  const fs::path &path,
+  const TagFileStateMap &tag_file_states,
+  const FiletypeStoredCandidateMap &stored_candidates ) {
+  SnapshotWriter writer;
+  std::string &body = writer.Body();
+
+  AppendInteger( body, static_cast< boost::uint32_t >(
+                   tag_file_states.size() ) );
+
+  foreach ( const TagFileStateMap::value_type & path_and_state,
+            tag_file_states ) {
+    const TagFileState &state = path_and_state.second;
+    size_t num_fingerprints = 0;
+
+    foreach ( const FiletypeFingerprintMap::value_type & filetype_and_map,
+              state.fingerprints_ ) {
+      num_fingerprints += filetype_and_map.second.size();
+    }
+
+    AppendInteger( body, writer.AddString( path_and_state.first ) );
+    AppendInteger( body, static_cast< boost::int64_t >(
+                     state.last_write_time_ ) );
+    AppendInteger( body, static_cast< boost::uint64_t >( state.size_ ) );
+    AppendInteger( body, static_cast< boost::uint32_t >( num_fingerprints ) );
+
+    foreach ( const FiletypeFingerprintMap::value_type & filetype_and_map,
+              state.fingerprints_ ) {
+      foreach ( const FilepathToFingerprint::value_type & path_and_fingerprint,
+                filetype_and_map.second ) {
+        AppendInteger( body, writer.AddString( filetype_and_map.first ) );
+        AppendInteger( body, writer.AddString( path_and_fingerprint.first ) );
+        AppendInteger( body, static_cast< boost::uint64_t >(
+                         path_and_fingerprint.second ) );
+      }
+    }
+  }
+
+  AppendInteger( body, static_cast< boost::uint32_t >(
+                   stored_candidates.size() ) );
+
+  foreach ( const FiletypeStoredCandidateMap::value_type & filetype_and_map,
+            stored_candidates ) {
+    AppendInteger( body, writer.AddString( filetype_and_map.first ) );
+    AppendInteger( body, static_cast< boost::uint32_t >(
+                     filetype_and_map.second.size() ) );
+
+    foreach ( const FilepathToStoredCandidates::value_type &
+              path_and_candidates,
+              filetype_and_map.second ) {
+      AppendInteger( body, writer.AddString( path_and_candidates.first ) );
+      AppendInteger( body, static_cast< boost::uint32_t >(
+                       path_and_candidates.second.size() ) );
+
+      foreach ( const Candidate * candidate, path_and_candidates.second ) {
+        AppendInteger( body, writer.AddCandidate( candidate ) );
+      }
+    }
+  }
+
+  // The snapshot is written next to its final location and renamed so that a
+  // concurrent reader never sees a partial snapshot. The temporary file has a
+  // unique name so that several servers sharing a snapshot don't write to the
+  // same one.
+  boost::system::error_code error;
+  fs::path temporary_path = path;
+  temporary_path += fs::unique_path( ".%%%%-%%%%-%%%%-%%%%.tmp", error );
+
+  if ( error )
+    return false;
+
+  try {
+    if ( writer.WriteTo( temporary_path ) ) {
+      fs::rename( temporary_path, path );
+      return true;
+    }
+  } catch ( const fs::filesystem_error & ) {
+  }
+
+  fs::remove( temporary_path, error );
+  return false;
+}
+
+
+bool ReadIdentifierSnapshot( const fs::path &path,
+                             TagFileStateMap &tag_file_states,
+                             FiletypeIdentifierMap &identifiers ) {
+  bi::mapped_region region;
+
+  try {
+    bi::file_mapping mapping( path.string().c_str(), bi::read_only );
+    bi::mapped_region( mapping, bi::read_only ).swap( region );
+  } catch ( ... ) {
+    return false;
+  }
+
+  const char *begin = static_cast< const char * >( region.get_address() );
+  SnapshotReader reader( begin, begin + region.get_size() );
+  TagFileStateMap snapshot_tag_file_states;
+  FiletypeIdentifierMap snapshot_identifiers;
+
+  if ( !reader.ReadHeader() ||
+       !ReadTagFileStates( reader, snapshot_tag_file_states ) ||
+       !ReadIdentifiers( reader, snapshot_identifiers ) ||
+       !reader.AtEnd() )
+    return false;
+
+  tag_file_states.swap( snapshot_tag_file_states );
+  identifiers.swap( snapshot_identifiers );
+  return true;
+}
+
+} // namespace YouCompleteMe
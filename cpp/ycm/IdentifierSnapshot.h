@@ -0,0 +1,75 @@
+// Copyright (C) 2016 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+
+#ifndef IDENTIFIERSNAPSHOT_H_R7WQK2LC
+#define IDENTIFIERSNAPSHOT_H_R7WQK2LC
+
+#include "DLLDefines.h"
+#include "IdentifierDatabase.h"
+#include "IdentifierUtils.h"
+
+#include <boost/cstdint.hpp>
+#include <boost/filesystem.hpp>
+#include <boost/unordered_map.hpp>
+
+#include <ctime>
+#include <string>
+
+namespace YouCompleteMe {
+
+// What is known about a tag file whose identifiers are in the database.
+struct TagFileState {
+  TagFileState()
+    : last_write_time_( 0 ),
+      size_( 0 ) {
+  }
+
+  // When the tag file was read.
+  std::time_t last_write_time_;
+  boost::uintmax_t size_;
+
+  FiletypeFingerprintMap fingerprints_;
+};
+
+// tag file -> state
+typedef boost::unordered_map< std::string, TagFileState > TagFileStateMap;
+
+
+// A snapshot is a binary file made of a header, a table of all the strings it
+// contains, then arrays of 32-bit indices into that table: the states of the
+// tag files and the candidates of each file for each filetype. Integers are
+// stored in the byte order of the machine, so a snapshot written by a machine
+// with another byte order is ignored like one from another format version.
+
+// Writes a snapshot to |path|, atomically replacing the existing one. Returns
+// false if it can't be written.
+YCM_DLL_EXPORT bool WriteIdentifierSnapshot(
+  const boost::filesystem::path &path,
+  const TagFileStateMap &tag_file_states,
+  const FiletypeStoredCandidateMap &stored_candidates );
+
+// Returns false, leaving |tag_file_states| and |identifiers| untouched, if
+// there is no valid snapshot at |path|.
+YCM_DLL_EXPORT bool ReadIdentifierSnapshot(
+  const boost::filesystem::path &path,
+  TagFileStateMap &tag_file_states,
+  FiletypeIdentifierMap &identifiers );
+
+} // namespace YouCompleteMe
+
+#endif /* end of include guard: IDENTIFIERSNAPSHOT_H_R7WQK2LC */
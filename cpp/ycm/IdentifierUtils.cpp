@@ -19,30 +19,22 @@
 #include "Utils.h"
 #include "standard.h"
 
+#include <algorithm>
+#include <cstring>
+
 #include <boost/unordered_map.hpp>
 #include <boost/assign/list_of.hpp>
-#include <boost/regex.hpp>
-#include <boost/algorithm/string/regex.hpp>
+#include <boost/functional/hash.hpp>
+#include <boost/interprocess/file_mapping.hpp>
+#include <boost/interprocess/mapped_region.hpp>
 
 namespace YouCompleteMe {
 
 namespace fs = boost::filesystem;
+namespace bi = boost::interprocess;
 
 namespace {
 
-// For details on the tag format supported, see here for details:
-// http://ctags.sourceforge.net/FORMAT
-// TL;DR: The only supported format is the one Exuberant Ctags emits.
-const char *const TAG_REGEX =
-  "^([^\\t\\n\\r]+)"  // The first field is the identifier
-  "\\t"  // A TAB char is the field separator
-  // The second field is the path to the file that has the identifier; either
-  // absolute or relative to the tags file.
-  "([^\\t\\n\\r]+)"
-  "\\t.*?"  // Non-greedy everything
-  "language:([^\\t\\n\\r]+)"  // We want to capture the language of the file
-  ".*?$";
-
 // Only used as the equality comparer for the below unordered_map which stores
 // const char* pointers and not std::string but needs to hash based on string
 // values and not pointer values.
@@ -109,47 +101,788 @@ const boost::unordered_map < const char *,
 
 const char *const NOT_FOUND = "YCMFOOBAR_NOT_FOUND";
 
+
+// For details on the tag format supported, see here for details:
+// http://ctags.sourceforge.net/FORMAT
+// TL;DR: The only supported format is the one Exuberant Ctags emits.
+// The first field is the identifier and the second one the path to the file
+// that has the identifier; either absolute or relative to the tags file. The
+// fields are separated by a TAB char. We want the language of the file, which
+// comes after the first "language:" with a value in the rest of the line.
+struct TagLine {
+  const char *identifier;
+  const char *identifier_end;
+  const char *path;
+  const char *path_end;
+  const char *language;
+  const char *language_end;
+};
+
+const char LANGUAGE_FIELD[] = "language:";
+const size_t LANGUAGE_FIELD_LENGTH = sizeof( LANGUAGE_FIELD ) - 1;
+
+
+// |begin| and |end| delimit a line without its line break.
+bool ParseTagLine( const char *begin, const char *end, TagLine *tag ) {
+  if ( begin != end && *( end - 1 ) == '\r' )
+    --end;
+
+  const char *first_tab = std::find( begin, end, '\t' );
+
+  if ( first_tab == begin || first_tab == end )
+    return false;
+
+  const char *second_tab = std::find( first_tab + 1, end, '\t' );
+
+  if ( second_tab == first_tab + 1 || second_tab == end )
+    return false;
+
+  const char *position = second_tab + 1;
+
+  while ( true ) {
+    const char *language = std::search( position,
+                                        end,
+                                        LANGUAGE_FIELD,
+                                        LANGUAGE_FIELD +
+                                        LANGUAGE_FIELD_LENGTH );
+
+    if ( language == end )
+      return false;
+
+    language += LANGUAGE_FIELD_LENGTH;
+    const char *language_end = std::find( language, end, '\t' );
+
+    if ( language_end != language ) {
+      tag->identifier = begin;
+      tag->identifier_end = first_tab;
+      tag->path = first_tab + 1;
+      tag->path_end = second_tab;
+      tag->language = language;
+      tag->language_end = language_end;
+      return true;
+    }
+
+    position = language;
+  }
+}
+
+
+// Tags files usually reference a small number of files compared to the number
+// of tags, so the paths are only made absolute once.
+class TagPathNormalizer {
+public:
+  explicit TagPathNormalizer( const fs::path &path_to_tag_file )
+    : tag_file_directory_( path_to_tag_file.parent_path() ) {
+  }
+
+  const std::string &Normalize( const char *begin, const char *end ) {
+    std::string path( begin, end );
+    boost::unordered_map< std::string, std::string >::iterator it =
+      normalized_paths_.find( path );
+
+    if ( it != normalized_paths_.end() )
+      return it->second;
+
+    std::string normalized_path =
+      fs::absolute( fs::path( path ), tag_file_directory_ )
+      .make_preferred().string();
+    return normalized_paths_.insert(
+             std::make_pair( path, normalized_path ) ).first->second;
+  }
+
+private:
+  fs::path tag_file_directory_;
+  boost::unordered_map< std::string, std::string > normalized_paths_;
+};
+
+
+// Calls |visitor| with the filetype, the normalized path and the identifier of
+// every tag of a supported language in the mapped tags file.
+template < class Visitor >
+void VisitTags( const bi::mapped_region &region,
+                const fs::path &path_to_tag_file,
+                Visitor &visitor ) {
+  TagPathNormalizer normalizer( path_to_tag_file );
+  const char *position = static_cast< const char * >( region.get_address() );
+  const char *end = position + region.get_size();
+
+  while ( position < end ) {
+    const char *line_end = static_cast< const char * >(
+                             std::memchr( position, '\n', end - position ) );
+
+    if ( !line_end )
+      line_end = end;
+
+    TagLine tag;
+
+    if ( ParseTagLine( position, line_end, &tag ) ) {
+      std::string language( tag.language, tag.language_end );
+      const char *filetype = FindWithDefault( LANG_TO_FILETYPE,
+                                              language.c_str(),
+                                              NOT_FOUND );
+
+      if ( filetype != NOT_FOUND ) {
+        visitor( filetype,
+                 normalizer.Normalize( tag.path, tag.path_end ),
+                 tag.identifier,
+                 tag.identifier_end );
+      }
+    }
+
+    position = line_end + 1;
+  }
+}
+
+
+void AddToFingerprint( size_t &fingerprint,
+                       const char *identifier,
+                       const char *identifier_end ) {
+  boost::hash_combine( fingerprint,
+                       boost::hash_range( identifier, identifier_end ) );
+}
+
+
+class FingerprintVisitor {
+public:
+  explicit FingerprintVisitor( FiletypeFingerprintMap &fingerprints )
+    : fingerprints_( fingerprints ) {
+  }
+
+  void operator()( const char *filetype,
+                   const std::string &path,
+                   const char *identifier,
+                   const char *identifier_end ) {
+    AddToFingerprint( fingerprints_[ filetype ][ path ],
+                      identifier,
+                      identifier_end );
+  }
+
+private:
+  FiletypeFingerprintMap &fingerprints_;
+};
+
+
+// Collects the identifiers of the files in |paths_to_collect|, or of all the
+// files if it's NULL.
+class IdentifierVisitor {
+public:
+  IdentifierVisitor( FiletypeIdentifierMap &filetype_identifier_map,
+                     const FiletypeFingerprintMap *paths_to_collect )
+    : filetype_identifier_map_( filetype_identifier_map ),
+      paths_to_collect_( paths_to_collect ) {
+  }
+
+  void operator()( const char *filetype,
+                   const std::string &path,
+                   const char *identifier,
+                   const char *identifier_end ) {
+    if ( paths_to_collect_ ) {
+      FiletypeFingerprintMap::const_iterator it =
+        paths_to_collect_->find( filetype );
+
+      if ( it == paths_to_collect_->end() ||
+           it->second.find( path ) == it->second.end() )
+        return;
+    }
+
+    filetype_identifier_map_[ filetype ][ path ].push_back(
+      std::string( identifier, identifier_end ) );
+  }
+
+private:
+  FiletypeIdentifierMap &filetype_identifier_map_;
+  const FiletypeFingerprintMap *paths_to_collect_;
+};
+
+// Families of filetypes sharing the same identifier syntax. See
+// FILETYPE_TO_IDENTIFIER_REGEX in ycmd/identifier_utils.py for the regexes
+// these are matching.
+enum IdentifierFamily {
+  DEFAULT_IDENTIFIER,
+  JAVASCRIPT_IDENTIFIER,
+  CSS_IDENTIFIER,
+  HTML_IDENTIFIER,
+  R_IDENTIFIER,
+  CLOJURE_IDENTIFIER,
+  HASKELL_IDENTIFIER,
+  TEX_IDENTIFIER,
+  PERL6_IDENTIFIER
+};
+
+const boost::unordered_map < const char *,
+      IdentifierFamily,
+      boost::hash< std::string >,
+      StringEqualityComparer > FILETYPE_TO_IDENTIFIER_FAMILY =
+        boost::assign::map_list_of
+        ( "javascript" , JAVASCRIPT_IDENTIFIER )
+        ( "typescript" , JAVASCRIPT_IDENTIFIER )
+        ( "css"        , CSS_IDENTIFIER        )
+        ( "scss"       , CSS_IDENTIFIER        )
+        ( "sass"       , CSS_IDENTIFIER        )
+        ( "less"       , CSS_IDENTIFIER        )
+        ( "html"       , HTML_IDENTIFIER       )
+        ( "r"          , R_IDENTIFIER          )
+        ( "clojure"    , CLOJURE_IDENTIFIER    )
+        ( "elisp"      , CLOJURE_IDENTIFIER    )
+        ( "lisp"       , CLOJURE_IDENTIFIER    )
+        ( "haskell"    , HASKELL_IDENTIFIER    )
+        ( "tex"        , TEX_IDENTIFIER        )
+        ( "perl6"      , PERL6_IDENTIFIER      );
+
+const unsigned INVALID_CODE_POINT = 0xFFFFFFFF;
+
+struct CodePointRange {
+  unsigned first;
+  unsigned last;
+};
+
+// Generated from Python's Unicode database so that the below character
+// classes match exactly what \w, \d and \s match in the identifier regexes of
+// ycmd/identifier_utils.py.
+#include "UnicodeTables.inc"
+
+
+bool CodePointRangeEndsBefore( const CodePointRange &range,
+                               unsigned code_point ) {
+  return range.last < code_point;
+}
+
+
+// The ranges are sorted and disjoint.
+template < size_t N >
+bool IsInRanges( unsigned code_point, const CodePointRange ( &ranges )[ N ] ) {
+  const CodePointRange *range = std::lower_bound( ranges, ranges + N,
+                                                  code_point,
+                                                  CodePointRangeEndsBefore );
+  return range != ranges + N && range->first <= code_point;
+}
+
+
+bool IsAsciiLetter( unsigned code_point ) {
+  return ( code_point >= 'a' && code_point <= 'z' ) ||
+         ( code_point >= 'A' && code_point <= 'Z' );
+}
+
+
+// Equivalent of Python's \d.
+bool IsDigit( unsigned code_point ) {
+  if ( code_point < 128 )
+    return code_point >= '0' && code_point <= '9';
+
+  return IsInRanges( code_point, NON_ASCII_DIGIT_RANGES );
+}
+
+
+bool IsOneOf( unsigned code_point, const char *characters ) {
+  return code_point < 128 && code_point != 0 &&
+         std::strchr( characters, static_cast< int >( code_point ) ) != NULL;
+}
+
+
+// Equivalent of Python's \w.
+bool IsWordCharacter( unsigned code_point ) {
+  if ( code_point < 128 )
+    return IsAsciiLetter( code_point ) || IsDigit( code_point ) ||
+           code_point == '_';
+
+  return IsInRanges( code_point, NON_ASCII_WORD_RANGES );
+}
+
+
+// Equivalent of Python's \s.
+bool IsSpace( unsigned code_point ) {
+  if ( code_point < 128 )
+    return ( code_point >= '\t' && code_point <= '\r' ) ||
+           ( code_point >= 0x1C && code_point <= ' ' );
+
+  return IsInRanges( code_point, NON_ASCII_SPACE_RANGES );
+}
+
+
+bool IsIdentifierStart( unsigned code_point ) {
+  return IsWordCharacter( code_point ) && !IsDigit( code_point );
+}
+
+
+bool IsJavascriptIdentifierStart( unsigned code_point ) {
+  return IsIdentifierStart( code_point ) || code_point == '$';
+}
+
+
+bool IsJavascriptIdentifierPart( unsigned code_point ) {
+  return IsWordCharacter( code_point ) || code_point == '$';
+}
+
+
+bool IsUnderscoreOrAsciiLetter( unsigned code_point ) {
+  return IsAsciiLetter( code_point ) || code_point == '_';
+}
+
+
+bool IsCssIdentifierPart( unsigned code_point ) {
+  return IsWordCharacter( code_point ) || code_point == '-';
+}
+
+
+bool IsHtmlIdentifierPart( unsigned code_point ) {
+  return code_point != INVALID_CODE_POINT &&
+         !IsSpace( code_point ) &&
+         !IsOneOf( code_point, "/>='\"}{." );
+}
+
+
+bool IsRIdentifierPart( unsigned code_point ) {
+  return IsWordCharacter( code_point ) || code_point == '.';
+}
+
+
+bool IsClojureIdentifierStart( unsigned code_point ) {
+  return IsAsciiLetter( code_point ) || IsOneOf( code_point, "-*+!_?:." );
+}
+
+
+bool IsClojureIdentifierPart( unsigned code_point ) {
+  return IsWordCharacter( code_point ) || IsOneOf( code_point, "-*+!_?:." );
+}
+
+
+bool IsHaskellIdentifierPart( unsigned code_point ) {
+  return IsWordCharacter( code_point ) || code_point == '\'';
+}
+
+
+bool IsTexIdentifierPart( unsigned code_point ) {
+  return IsAsciiLetter( code_point ) || IsOneOf( code_point, "_:-" );
+}
+
+
+// Finds the identifiers of a UTF-8 encoded text in a single pass, matching at
+// each position what the identifier regex of the filetype would match there.
+class IdentifierLexer {
+public:
+  IdentifierLexer( const std::string &text, IdentifierFamily family )
+    : text_( text ),
+      family_( family ) {
+  }
+
+  std::vector< std::string > ExtractIdentifiers() const {
+    std::vector< std::string > identifiers;
+    size_t position = 0;
+
+    while ( position < text_.size() ) {
+      size_t end = IdentifierEnd( position );
+
+      if ( end > position ) {
+        identifiers.push_back( text_.substr( position, end - position ) );
+        position = end;
+      } else {
+        CodePointAt( position, &position );
+      }
+    }
+
+    return identifiers;
+  }
+
+private:
+  // Returns the code point starting at |position| and sets |next| to the
+  // position of the following one. Invalid UTF-8 sequences are returned
+  // byte by byte as INVALID_CODE_POINT.
+  unsigned CodePointAt( size_t position, size_t *next ) const {
+    if ( position >= text_.size() ) {
+      *next = position;
+      return INVALID_CODE_POINT;
+    }
+
+    unsigned char lead = text_[ position ];
+    size_t length;
+    unsigned code_point;
+
+    if ( lead < 0x80 ) {
+      *next = position + 1;
+      return lead;
+    } else if ( ( lead & 0xE0 ) == 0xC0 ) {
+      length = 2;
+      code_point = lead & 0x1F;
+    } else if ( ( lead & 0xF0 ) == 0xE0 ) {
+      length = 3;
+      code_point = lead & 0x0F;
+    } else if ( ( lead & 0xF8 ) == 0xF0 ) {
+      length = 4;
+      code_point = lead & 0x07;
+    } else {
+      *next = position + 1;
+      return INVALID_CODE_POINT;
+    }
+
+    if ( position + length > text_.size() ) {
+      *next = position + 1;
+      return INVALID_CODE_POINT;
+    }
+
+    for ( size_t i = 1; i < length; ++i ) {
+      unsigned char byte = text_[ position + i ];
+
+      if ( ( byte & 0xC0 ) != 0x80 ) {
+        *next = position + 1;
+        return INVALID_CODE_POINT;
+      }
+
+      code_point = ( code_point << 6 ) | ( byte & 0x3F );
+    }
+
+    *next = position + length;
+    return code_point;
+  }
+
+
+  size_t SkipWhile( size_t position, bool ( *predicate )( unsigned ) ) const {
+    size_t next;
+
+    while ( position < text_.size() &&
+            predicate( CodePointAt( position, &next ) ) ) {
+      position = next;
+    }
+
+    return position;
+  }
+
+
+  // Returns the end of the identifier starting at |position|, or |position|
+  // if there is none.
+  size_t IdentifierEnd( size_t position ) const {
+    size_t next;
+    unsigned code_point = CodePointAt( position, &next );
+
+    switch ( family_ ) {
+      case JAVASCRIPT_IDENTIFIER:
+        // ([^\W\d]|\$)[\w$]*
+        if ( !IsJavascriptIdentifierStart( code_point ) )
+          return position;
+
+        return SkipWhile( next, IsJavascriptIdentifierPart );
+
+      case CSS_IDENTIFIER:
+        // -?[_a-zA-Z]+[\w-]+
+        if ( code_point == '-' )
+          code_point = CodePointAt( next, &next );
+
+        if ( !IsUnderscoreOrAsciiLetter( code_point ) ||
+             !IsCssIdentifierPart( CodePointAt( next, &next ) ) )
+          return position;
+
+        return SkipWhile( next, IsCssIdentifierPart );
+
+      case HTML_IDENTIFIER:
+        // [a-zA-Z][^\s/>='\"}{\.]*
+        if ( !IsAsciiLetter( code_point ) )
+          return position;
+
+        return SkipWhile( next, IsHtmlIdentifierPart );
+
+      case R_IDENTIFIER: {
+        // (?!(?:\.\d|\d|_))[\.\w]+
+        size_t after_next;
+
+        if ( code_point == '_' || IsDigit( code_point ) ||
+             ( code_point == '.' &&
+               IsDigit( CodePointAt( next, &after_next ) ) ) )
+          return position;
+
+        return SkipWhile( position, IsRIdentifierPart );
+      }
+
+      case CLOJURE_IDENTIFIER: {
+        // [-\*\+!_\?:\.a-zA-Z][-\*\+!_\?:\.\w]*/?[-\*\+!_\?:\.\w]*
+        if ( !IsClojureIdentifierStart( code_point ) )
+          return position;
+
+        size_t end = SkipWhile( next, IsClojureIdentifierPart );
+
+        if ( end < text_.size() && text_[ end ] == '/' )
+          end = SkipWhile( end + 1, IsClojureIdentifierPart );
+
+        return end;
+      }
+
+      case HASKELL_IDENTIFIER:
+        // [_a-zA-Z][\w']+
+        if ( !IsUnderscoreOrAsciiLetter( code_point ) ||
+             !IsHaskellIdentifierPart( CodePointAt( next, &next ) ) )
+          return position;
+
+        return SkipWhile( next, IsHaskellIdentifierPart );
+
+      case TEX_IDENTIFIER:
+        // [_a-zA-Z:-]+
+        return SkipWhile( position, IsTexIdentifierPart );
+
+      case PERL6_IDENTIFIER: {
+        // [_a-zA-Z](?:\w|[-'](?=[_a-zA-Z]))*
+        if ( !IsUnderscoreOrAsciiLetter( code_point ) )
+          return position;
+
+        size_t end = next;
+
+        while ( end < text_.size() ) {
+          size_t after_next;
+          code_point = CodePointAt( end, &next );
+
+          if ( !IsWordCharacter( code_point ) &&
+               !( IsOneOf( code_point, "-'" ) &&
+                  IsUnderscoreOrAsciiLetter(
+                    CodePointAt( next, &after_next ) ) ) )
+            break;
+
+          end = next;
+        }
+
+        return end;
+      }
+
+      default:
+        // [^\W\d]\w*
+        if ( !IsIdentifierStart( code_point ) )
+          return position;
+
+        return SkipWhile( next, IsWordCharacter );
+    }
+  }
+
+  const std::string &text_;
+  IdentifierFamily family_;
+};
+
+
+size_t EndOfLine( const std::string &text, size_t position ) {
+  size_t end = text.find( '\n', position );
+  return end == std::string::npos ? text.size() : end;
+}
+
+
+// Returns the end of the string delimited by |quote| that starts at
+// |position|, or |position| if the string isn't closed on the same line.
+size_t EndOfQuotedString( const std::string &text, size_t position ) {
+  char quote = text[ position ];
+  size_t end_of_line = EndOfLine( text, position );
+  bool skipped_escape = false;
+
+  // The regex lazily matches escaped slashes and quotes before any other
+  // character, so on the first try it stops at the first unescaped quote.
+  for ( size_t i = position + 1; i < end_of_line; ++i ) {
+    if ( text[ i ] == quote )
+      return i + 1;
+
+    if ( text[ i ] == '\\' && i + 1 < end_of_line &&
+         ( text[ i + 1 ] == '\\' || text[ i + 1 ] == quote ) ) {
+      skipped_escape = true;
+      ++i;
+    }
+  }
+
+  if ( !skipped_escape )
+    return position;
+
+  // If there is no such quote, the regex backtracks and treats the slashes of
+  // the escape sequences as plain characters, starting from the last ones.
+  // |ends[ i ]| is where the match ends when the rest of the string is matched
+  // from |position + 1 + i|, or 0 if it can't be.
+  size_t length = end_of_line - position - 1;
+  std::vector< size_t > ends( length + 1, 0 );
+
+  for ( size_t i = length; i-- > 0; ) {
+    size_t index = position + 1 + i;
+
+    if ( text[ index ] == quote )
+      ends[ i ] = index + 1;
+    else if ( text[ index ] == '\\' && i + 1 < length &&
+              ( text[ index + 1 ] == '\\' || text[ index + 1 ] == quote ) )
+      ends[ i ] = ends[ i + 2 ] ? ends[ i + 2 ] : ends[ i + 1 ];
+    else
+      ends[ i ] = ends[ i + 1 ];
+  }
+
+  return ends[ 0 ] ? ends[ 0 ] : position;
+}
+
+
+// Returns the end of the comment or string starting at |position|, or
+// |position| if there is none. The alternatives are tried in the same order
+// as in COMMENT_AND_STRING_REGEX.
+size_t EndOfIdentifierFreeText( const std::string &text, size_t position ) {
+  char current = text[ position ];
+  char next = position + 1 < text.size() ? text[ position + 1 ] : '\0';
+
+  if ( current == '#' || ( current == '/' && next == '/' ) )
+    return EndOfLine( text, position );
+
+  if ( current == '/' ) {
+    if ( next != '*' )
+      return position;
+
+    size_t end = text.find( "*/", position + 2 );
+    return end == std::string::npos ? position : end + 2;
+  }
+
+  const std::string triple_quote( 3, current );
+
+  if ( text.compare( position, 3, triple_quote ) == 0 ) {
+    size_t end = text.find( triple_quote, position + 3 );
+
+    if ( end != std::string::npos )
+      return end + 3;
+  }
+
+  // An escaped quote doesn't start a string.
+  if ( position > 0 && text[ position - 1 ] == '\\' )
+    return position;
+
+  return EndOfQuotedString( text, position );
+}
+
 }  // unnamed namespace
 
 
+std::string RemoveIdentifierFreeText( const std::string &text ) {
+  std::string result;
+  result.reserve( text.size() );
+  size_t position = 0;
+
+  while ( position < text.size() ) {
+    // Comments and strings can only start with one of these characters.
+    size_t start = text.find_first_of( "/#'\"", position );
+
+    if ( start == std::string::npos )
+      start = text.size();
+
+    result.append( text, position, start - position );
+    position = start;
+
+    if ( position < text.size() ) {
+      size_t end = EndOfIdentifierFreeText( text, position );
+
+      if ( end > position ) {
+        position = end;
+      } else {
+        result.push_back( text[ position ] );
+        ++position;
+      }
+    }
+  }
+
+  return result;
+}
+
+
+std::vector< std::string > ExtractIdentifiersFromText(
+  const std::string &text,
+  const std::string &filetype ) {
+  IdentifierFamily family = FindWithDefault( FILETYPE_TO_IDENTIFIER_FAMILY,
+                                             filetype.c_str(),
+                                             DEFAULT_IDENTIFIER );
+  return IdentifierLexer( text, family ).ExtractIdentifiers();
+}
+
+
 FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
   const fs::path &path_to_tag_file ) {
+  FiletypeFingerprintMap fingerprints;
+  return ExtractChangedIdentifiersFromTagsFile( path_to_tag_file,
+                                                fingerprints );
+}
+
+
+FiletypeIdentifierMap ExtractChangedIdentifiersFromTagsFile(
+  const fs::path &path_to_tag_file,
+  FiletypeFingerprintMap &fingerprints ) {
   FiletypeIdentifierMap filetype_identifier_map;
-  std::string tags_file_contents;
+  bi::mapped_region region;
 
   try {
-    tags_file_contents = ReadUtf8File( path_to_tag_file );
+    bi::file_mapping mapping( path_to_tag_file.string().c_str(),
+                              bi::read_only );
+
+    // Empty files can't be mapped. They are read as an empty region instead,
+    // i.e. a tags file without tags, so that the identifiers of the files it
+    // used to have tags for are removed.
+    if ( fs::file_size( path_to_tag_file ) > 0 )
+      bi::mapped_region( mapping, bi::read_only ).swap( region );
   } catch ( ... ) {
     return filetype_identifier_map;
   }
 
-  std::string::const_iterator start = tags_file_contents.begin();
-  std::string::const_iterator end   = tags_file_contents.end();
+  // Nothing to compare with, so all the identifiers are collected in a single
+  // pass and fingerprinted afterwards.
+  if ( fingerprints.empty() ) {
+    IdentifierVisitor visitor( filetype_identifier_map, NULL );
+    VisitTags( region, path_to_tag_file, visitor );
+
+    foreach ( const FiletypeIdentifierMap::value_type & filetype_and_map,
+              filetype_identifier_map ) {
+      foreach ( const FilepathToIdentifiers::value_type & path_and_identifiers,
+                filetype_and_map.second ) {
+        size_t &fingerprint =
+          fingerprints[ filetype_and_map.first ][ path_and_identifiers.first ];
+
+        foreach ( const std::string & identifier,
+                  path_and_identifiers.second ) {
+          AddToFingerprint( fingerprint,
+                            identifier.data(),
+                            identifier.data() + identifier.size() );
+        }
+      }
+    }
+
+    return filetype_identifier_map;
+  }
+
+  FiletypeFingerprintMap new_fingerprints;
+  FingerprintVisitor fingerprint_visitor( new_fingerprints );
+  VisitTags( region, path_to_tag_file, fingerprint_visitor );
 
-  boost::smatch matches;
-  const boost::regex expression( TAG_REGEX );
-  const boost::match_flag_type options = boost::match_not_dot_newline;
+  FiletypeFingerprintMap changed_paths;
 
-  while ( boost::regex_search( start, end, matches, expression, options ) ) {
-    start = matches[ 0 ].second;
+  foreach ( const FiletypeFingerprintMap::value_type & filetype_and_map,
+            new_fingerprints ) {
+    const FilepathToFingerprint &old_fingerprints =
+      fingerprints[ filetype_and_map.first ];
 
-    std::string language( matches[ 3 ] );
-    std::string filetype = FindWithDefault( LANG_TO_FILETYPE,
-                                            language.c_str(),
-                                            NOT_FOUND );
+    foreach ( const FilepathToFingerprint::value_type & path_and_fingerprint,
+              filetype_and_map.second ) {
+      FilepathToFingerprint::const_iterator it =
+        old_fingerprints.find( path_and_fingerprint.first );
 
-    if ( filetype == NOT_FOUND )
-      continue;
+      if ( it == old_fingerprints.end() ||
+           it->second != path_and_fingerprint.second ) {
+        changed_paths[ filetype_and_map.first ].insert( path_and_fingerprint );
+      }
+    }
+  }
 
-    std::string identifier( matches[ 1 ] );
-    fs::path path( matches[ 2 ].str() );
-    path = fs::absolute( path, path_to_tag_file.parent_path() )
-           .make_preferred();
+  if ( !changed_paths.empty() ) {
+    IdentifierVisitor visitor( filetype_identifier_map, &changed_paths );
+    VisitTags( region, path_to_tag_file, visitor );
+  }
 
-    filetype_identifier_map[ filetype ][ path.string() ].push_back( identifier );
+  // Files that don't have tags anymore get an empty list of identifiers.
+  foreach ( const FiletypeFingerprintMap::value_type & filetype_and_map,
+            fingerprints ) {
+    FilepathToFingerprint &paths = new_fingerprints[ filetype_and_map.first ];
+
+    foreach ( const FilepathToFingerprint::value_type & path_and_fingerprint,
+              filetype_and_map.second ) {
+      if ( paths.find( path_and_fingerprint.first ) == paths.end() ) {
+        filetype_identifier_map[ filetype_and_map.first ]
+        [ path_and_fingerprint.first ];
+      }
+    }
+
+    if ( paths.empty() )
+      new_fingerprints.erase( filetype_and_map.first );
   }
 
+  fingerprints.swap( new_fingerprints );
   return filetype_identifier_map;
 }
 
+
 } // namespace YouCompleteMe
@@ -25,12 +25,41 @@
 #include <string>
 
 #include <boost/filesystem.hpp>
+#include <boost/unordered_map.hpp>
 
 namespace YouCompleteMe {
 
+// filepath -> fingerprint of the tags of the file
+typedef boost::unordered_map< std::string, size_t > FilepathToFingerprint;
+
+// filetype -> (filepath -> fingerprint)
+typedef boost::unordered_map< std::string, FilepathToFingerprint >
+FiletypeFingerprintMap;
+
+// Returns |text| without the comments and strings it contains. The removed
+// parts are the same as the ones matched by COMMENT_AND_STRING_REGEX in
+// ycmd/identifier_utils.py.
+YCM_DLL_EXPORT std::string RemoveIdentifierFreeText( const std::string &text );
+
+// Returns the identifiers found in the UTF-8 encoded |text|, in the order they
+// appear. What is an identifier depends on |filetype| and follows
+// FILETYPE_TO_IDENTIFIER_REGEX in ycmd/identifier_utils.py.
+YCM_DLL_EXPORT std::vector< std::string > ExtractIdentifiersFromText(
+  const std::string &text,
+  const std::string &filetype );
+
 YCM_DLL_EXPORT FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
   const boost::filesystem::path &path_to_tag_file );
 
+// Same as above, but only returns the identifiers of the files whose tags
+// changed since |fingerprints| were computed. Files that don't have tags
+// anymore are returned with no identifiers. |fingerprints| is updated to
+// the current contents of the tags file. It is left untouched if the file
+// can't be read.
+YCM_DLL_EXPORT FiletypeIdentifierMap ExtractChangedIdentifiersFromTagsFile(
+  const boost::filesystem::path &path_to_tag_file,
+  FiletypeFingerprintMap &fingerprints );
+
 } // namespace YouCompleteMe
 
 #endif /* end of include guard: IDENTIFIERUTILS_CPP_WFFUZNET */
@@ -21,6 +21,7 @@
 #include "Candidate.h"
 #include "CandidateRepository.h"
 #include "ReleaseGil.h"
+#include "Utils.h"
 
 #include <boost/algorithm/string.hpp>
 #include <boost/algorithm/cxx11/any_of.hpp>
@@ -30,7 +31,7 @@ using boost::algorithm::any_of;
 using boost::algorithm::is_upper;
 using boost::python::len;
 using boost::python::str;
-using boost::python::extract;
+using boost::python::handle;
 using boost::python::object;
 typedef boost::python::list pylist;
 
@@ -41,17 +42,19 @@ namespace {
 std::vector< const Candidate * > CandidatesFromObjectList(
   const pylist &candidates,
   const std::string &candidate_property ) {
+  // We read the candidate text straight from the Python objects; the caller
+  // doesn't need to copy or convert the candidates beforehand.
   int num_candidates = len( candidates );
   std::vector< std::string > candidate_strings;
   candidate_strings.reserve( num_candidates );
+  object property_name( candidate_property );
 
   for ( int i = 0; i < num_candidates; ++i ) {
     if ( candidate_property.empty() ) {
       candidate_strings.push_back( GetUtf8String( candidates[ i ] ) );
     } else {
-      object holder = extract< object >( candidates[ i ] );
       candidate_strings.push_back( GetUtf8String(
-                                     holder[ candidate_property.c_str() ] ) );
+                                     candidates[ i ][ property_name ] ) );
     }
   }
 
@@ -65,16 +68,23 @@ std::vector< const Candidate * > CandidatesFromObjectList(
 boost::python::list FilterAndSortCandidates(
   const boost::python::list &candidates,
   const std::string &candidate_property,
-  const std::string &query ) {
+  const std::string &query,
+  size_t max_results ) {
   pylist filtered_candidates;
 
-  if ( query.empty() )
-    return candidates;
+  if ( query.empty() ) {
+    if ( max_results == 0 ||
+         static_cast< size_t >( len( candidates ) ) <= max_results )
+      return candidates;
+
+    return pylist( candidates.slice( 0, max_results ) );
+  }
 
   if ( !IsPrintable( query ) )
     return boost::python::list();
 
   int num_candidates = len( candidates );
+  CandidateRepository::Pin pin;
   std::vector< const Candidate * > repository_candidates =
     CandidatesFromObjectList( candidates, candidate_property );
 
@@ -99,7 +109,7 @@ boost::python::list FilterAndSortCandidates(
       }
     }
 
-    std::sort( result_and_objects.begin(), result_and_objects.end() );
+    PartialSort( result_and_objects, max_results );
   }
 
   foreach ( const ResultAnd< int > &result_and_object,
@@ -112,12 +122,24 @@ boost::python::list FilterAndSortCandidates(
 
 
 std::string GetUtf8String( const boost::python::object &string_or_unicode ) {
-  extract< std::string > to_string( string_or_unicode );
-
-  if ( to_string.check() )
-    return to_string();
+  PyObject *value = string_or_unicode.ptr();
+
+  // PyBytes_* are aliases of PyString_* on Python 2 so this branch handles the
+  // native str type of both versions, as well as the newbytes type from
+  // python-future which subclasses it.
+  if ( PyBytes_Check( value ) )
+    return std::string( PyBytes_AS_STRING( value ), PyBytes_GET_SIZE( value ) );
+
+  // Unicode objects (including the newstr type from python-future on Python 2)
+  // are encoded directly. We don't go through str() because it raises on
+  // Python 2 for non-ASCII characters.
+  if ( PyUnicode_Check( value ) ) {
+    handle<> utf8_bytes( PyUnicode_AsUTF8String( value ) );
+    return std::string( PyBytes_AS_STRING( utf8_bytes.get() ),
+                        PyBytes_GET_SIZE( utf8_bytes.get() ) );
+  }
 
-  return extract< std::string >( str( string_or_unicode ).encode( "utf8" ) );
+  return GetUtf8String( str( string_or_unicode ) );
 }
 
 } // namespace YouCompleteMe
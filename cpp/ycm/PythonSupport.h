@@ -26,10 +26,13 @@ namespace YouCompleteMe {
 /// python list |candidates|, a |candidate_property| on which to filter and sort
 /// the candidates and a user query, returns a new sorted python list with the
 /// original objects that survived the filtering.
+// Only the best |max_results| candidates are returned, unless |max_results| is
+// 0.
 boost::python::list FilterAndSortCandidates(
   const boost::python::list &candidates,
   const std::string &candidate_property,
-  const std::string &query );
+  const std::string &query,
+  size_t max_results = 0 );
 
 /// Given a Python object that's supposed to be "string-like", returns a UTF-8
 /// encoded std::string. If the object can't be converted to a string, returns an
@@ -100,6 +100,7 @@ Result::Result()
   query_is_candidate_prefix_( false ),
   text_is_lowercase_( false ),
   char_match_index_sum_( 0 ),
+  proximity_( 0 ),
   text_( NULL ) {
 }
 
@@ -114,6 +115,7 @@ Result::Result( bool is_subsequence )
   query_is_candidate_prefix_( false ),
   text_is_lowercase_( false ),
   char_match_index_sum_( 0 ),
+  proximity_( 0 ),
   text_( NULL ) {
 }
 
@@ -133,6 +135,7 @@ Result::Result( bool is_subsequence,
   query_is_candidate_prefix_( false ),
   text_is_lowercase_( text_is_lowercase ),
   char_match_index_sum_( char_match_index_sum ),
+  proximity_( 0 ),
   text_( text ) {
   if ( is_subsequence )
     SetResultFeaturesFromQuery( word_boundary_chars, query );
@@ -186,6 +189,9 @@ bool Result::operator< ( const Result &other ) const {
                other.word_boundary_char_utilization_;
     }
 
+    if ( proximity_ != other.proximity_ )
+      return proximity_ > other.proximity_;
+
     if ( char_match_index_sum_ != other.char_match_index_sum_ )
       return char_match_index_sum_ < other.char_match_index_sum_;
 
@@ -44,6 +44,12 @@ public:
     return text_;
   }
 
+  // Among results that match the query equally well, the ones with a higher
+  // proximity are ranked first.
+  inline void SetProximity( int proximity ) {
+    proximity_ = proximity;
+  }
+
 private:
   void SetResultFeaturesFromQuery(
     const std::string &query,
@@ -81,6 +87,10 @@ private:
   // the char indexes of those letters in the candidate string.
   int char_match_index_sum_;
 
+  // How close the candidate is to what the user is editing, e.g. whether it
+  // appears in the current file and how often. 0 when unknown.
+  int proximity_;
+
   // points to the full candidate text
   const std::string *text_;
 
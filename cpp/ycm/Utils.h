@@ -20,14 +20,35 @@
 
 #include "DLLDefines.h"
 
+#include <algorithm>
 #include <string>
 #include <vector>
 #include <boost/filesystem.hpp>
 
+#define NUM_LETTERS 128
+
 namespace fs = boost::filesystem;
 
 namespace YouCompleteMe {
 
+inline bool IsUppercase( char letter ) {
+  return 'A' <= letter && letter <= 'Z';
+}
+
+
+inline bool IsInAsciiRange( int index ) {
+  return 0 <= index && index < NUM_LETTERS;
+}
+
+
+inline int IndexForLetter( char letter ) {
+  if ( IsUppercase( letter ) )
+    return letter + ( 'a' - 'A' );
+
+  return letter;
+}
+
+
 bool AlmostEqual( double a, double b );
 
 // Reads the entire contents of the specified file. If the file does not exist,
@@ -77,6 +98,23 @@ bool Erase( Container &container, const Key &key ) {
   return false;
 }
 
+
+// Sorts the elements and only keeps the smallest |max_elements| ones, unless
+// |max_elements| is 0. Selecting the top elements is much cheaper than sorting
+// all of them when only a few are needed.
+template <class T>
+void PartialSort( std::vector< T > &elements, size_t max_elements ) {
+  if ( max_elements == 0 || elements.size() <= max_elements ) {
+    std::sort( elements.begin(), elements.end() );
+    return;
+  }
+
+  std::partial_sort( elements.begin(),
+                     elements.begin() + max_elements,
+                     elements.end() );
+  elements.erase( elements.begin() + max_elements, elements.end() );
+}
+
 } // namespace YouCompleteMe
 
 #endif /* end of include guard: UTILS_H_KEPMRPBH */
@@ -0,0 +1,125 @@
+// Copyright (C) 2016 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+// Measures the heap memory used by each Candidate and the time taken to match
+// a few queries against all of them. Allocations are counted by replacing the
+// global operator new, which also catches the ones made inside ycm_core on
+// platforms where the executable's operator new takes precedence over the
+// library's (e.g. Linux).
+
+#include "Candidate.h"
+#include "Result.h"
+
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <new>
+#include <sstream>
+#include <string>
+#include <vector>
+
+namespace {
+
+size_t allocated_bytes = 0;
+
+} // unnamed namespace
+
+void *operator new( size_t size ) {
+  // The size is stored in front of the block so that operator delete can
+  // subtract it.
+  size_t *block = static_cast< size_t * >(
+    std::malloc( size + sizeof( size_t ) ) );
+
+  if ( !block )
+    throw std::bad_alloc();
+
+  *block = size;
+  allocated_bytes += size;
+  return block + 1;
+}
+
+
+void operator delete( void *pointer ) throw() {
+  if ( !pointer )
+    return;
+
+  size_t *block = static_cast< size_t * >( pointer ) - 1;
+  allocated_bytes -= *block;
+  std::free( block );
+}
+
+
+using namespace YouCompleteMe;
+
+int main( int argc, char **argv ) {
+  const int num_candidates = argc > 1 ? std::atoi( argv[ 1 ] ) : 200000;
+  const int num_rounds = 5;
+  const char *queries[] = { "sif", "sIF", "some1F", "xyz", "s_9", "idf12" };
+
+  std::vector< std::string > texts;
+  texts.reserve( num_candidates );
+  size_t num_chars = 0;
+
+  for ( int i = 0; i < num_candidates; ++i ) {
+    std::ostringstream text;
+    text << "someIdentifier_" << i << "Foo";
+    texts.push_back( text.str() );
+    num_chars += texts.back().size();
+  }
+
+  std::vector< const Candidate * > candidates;
+  candidates.reserve( num_candidates );
+  size_t bytes_before = allocated_bytes;
+
+  for ( int i = 0; i < num_candidates; ++i ) {
+    candidates.push_back( new Candidate( texts[ i ] ) );
+  }
+
+  size_t bytes_after = allocated_bytes;
+
+  std::chrono::steady_clock::time_point start =
+    std::chrono::steady_clock::now();
+  size_t num_matches = 0;
+
+  for ( int round = 0; round < num_rounds; ++round ) {
+    for ( const char *query : queries ) {
+      for ( const Candidate *candidate : candidates ) {
+        if ( candidate->QueryMatchResult( query, true ).IsSubsequence() )
+          ++num_matches;
+      }
+    }
+  }
+
+  double milliseconds = std::chrono::duration< double, std::milli >(
+    std::chrono::steady_clock::now() - start ).count();
+
+  std::printf( "Candidates:                %d\n", num_candidates );
+  std::printf( "Average length:            %.1f characters\n",
+               static_cast< double >( num_chars ) / num_candidates );
+  std::printf( "Heap bytes per candidate:  %.1f\n",
+               static_cast< double >( bytes_after - bytes_before ) /
+               num_candidates );
+  std::printf( "Matches:                   %zu\n", num_matches );
+  std::printf( "Matching time (%d rounds): %.0f ms\n", num_rounds,
+               milliseconds );
+
+  for ( const Candidate *candidate : candidates ) {
+    delete candidate;
+  }
+
+  return 0;
+}
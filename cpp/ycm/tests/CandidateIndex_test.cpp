@@ -0,0 +1,130 @@
+// Copyright (C) 2016 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include <gtest/gtest.h>
+#include <gmock/gmock.h>
+#include "CandidateIndex.h"
+#include "CandidateRepository.h"
+
+using ::testing::ElementsAre;
+using ::testing::IsEmpty;
+
+namespace YouCompleteMe {
+
+class CandidateIndexTest : public ::testing::Test {
+protected:
+  virtual void SetUp() {
+    std::vector< std::string > texts;
+    texts.push_back( "foobar" );
+    texts.push_back( "fbr" );
+    texts.push_back( "barfoo" );
+    texts.push_back( "qux" );
+
+    candidates_ = CandidateRepository::Instance().AcquireCandidatesForStrings(
+                    texts );
+
+    for ( size_t i = 0; i < candidates_.size(); ++i ) {
+      index_.AddCandidate( candidates_[ i ] );
+    }
+  }
+
+  virtual void TearDown() {
+    CandidateRepository::Instance().ReleaseCandidates( candidates_ );
+  }
+
+  std::vector< const Candidate * > Prefilter( const std::string &query ) {
+    std::vector< const Candidate * > candidates;
+    index_.CandidatesPassingPrefilter( LetterBitsetFromString( query ),
+                                       query.size(),
+                                       candidates );
+    return candidates;
+  }
+
+  std::vector< const Candidate * > candidates_;
+  CandidateIndex index_;
+};
+
+
+TEST_F( CandidateIndexTest, Size ) {
+  EXPECT_EQ( 4, index_.Size() );
+}
+
+
+TEST_F( CandidateIndexTest, PrefilterKeepsCandidatesWithQueryLetters ) {
+  EXPECT_THAT( Prefilter( "fbr" ),
+               ElementsAre( candidates_[ 0 ],
+                            candidates_[ 1 ],
+                            candidates_[ 2 ] ) );
+  EXPECT_THAT( Prefilter( "QX" ), ElementsAre( candidates_[ 3 ] ) );
+  EXPECT_THAT( Prefilter( "z" ), IsEmpty() );
+}
+
+
+TEST_F( CandidateIndexTest, PrefilterSkipsCandidatesShorterThanQuery ) {
+  EXPECT_THAT( Prefilter( "fbrr" ),
+               ElementsAre( candidates_[ 0 ],
+                            candidates_[ 2 ] ) );
+  EXPECT_THAT( Prefilter( "quxx" ), IsEmpty() );
+}
+
+
+TEST_F( CandidateIndexTest, CandidatesAreStoredOnce ) {
+  index_.AddCandidate( candidates_[ 0 ] );
+
+  EXPECT_EQ( 4, index_.Size() );
+  EXPECT_THAT( Prefilter( "foob" ),
+               ElementsAre( candidates_[ 0 ],
+                            candidates_[ 2 ] ) );
+}
+
+
+TEST_F( CandidateIndexTest, CandidatesRemovedWhenAllReferencesRemoved ) {
+  index_.AddCandidate( candidates_[ 0 ] );
+  index_.RemoveCandidate( candidates_[ 0 ] );
+
+  EXPECT_EQ( 4, index_.Size() );
+  EXPECT_THAT( Prefilter( "foob" ),
+               ElementsAre( candidates_[ 0 ],
+                            candidates_[ 2 ] ) );
+
+  index_.RemoveCandidate( candidates_[ 0 ] );
+
+  EXPECT_EQ( 3, index_.Size() );
+  EXPECT_THAT( Prefilter( "foob" ), ElementsAre( candidates_[ 2 ] ) );
+  EXPECT_THAT( Prefilter( "fbr" ),
+               ElementsAre( candidates_[ 1 ],
+                            candidates_[ 2 ] ) );
+
+  index_.RemoveCandidate( candidates_[ 0 ] );
+  EXPECT_EQ( 3, index_.Size() );
+}
+
+
+TEST_F( CandidateIndexTest, RemovedPositionsAreReused ) {
+  index_.RemoveCandidate( candidates_[ 1 ] );
+  index_.RemoveCandidate( candidates_[ 3 ] );
+  index_.AddCandidate( candidates_[ 1 ] );
+
+  EXPECT_EQ( 3, index_.Size() );
+  EXPECT_THAT( Prefilter( "fbr" ),
+               ElementsAre( candidates_[ 0 ],
+                            candidates_[ 2 ],
+                            candidates_[ 1 ] ) );
+  EXPECT_THAT( Prefilter( "qux" ), IsEmpty() );
+}
+
+} // namespace YouCompleteMe
@@ -20,8 +20,23 @@
 #include "Candidate.h"
 #include "Result.h"
 
+#include <boost/bind.hpp>
+#include <boost/lexical_cast.hpp>
+#include <boost/thread/thread.hpp>
+
 namespace YouCompleteMe {
 
+namespace {
+
+void AcquireCandidates( const std::vector< std::string > *inputs,
+                        std::vector< const Candidate * > *candidates ) {
+  *candidates =
+    CandidateRepository::Instance().AcquireCandidatesForStrings( *inputs );
+}
+
+} // unnamed namespace
+
+
 TEST( CandidateRepositoryTest, Basic ) {
   std::vector< std::string > inputs;
   inputs.push_back( "foobar" );
@@ -34,6 +49,62 @@ TEST( CandidateRepositoryTest, Basic ) {
 }
 
 
+TEST( CandidateRepositoryTest, SameTextGivesSameCandidate ) {
+  std::vector< std::string > inputs;
+  inputs.push_back( "same_text" );
+  inputs.push_back( std::string( "same_" ) + "text" );
+
+  CandidateRepository &repo = CandidateRepository::Instance();
+  std::vector< const Candidate * > candidates =
+    repo.AcquireCandidatesForStrings( inputs );
+
+  EXPECT_EQ( candidates[ 0 ], candidates[ 1 ] );
+  EXPECT_NE( &inputs[ 0 ], &candidates[ 0 ]->Text() );
+
+  // The candidate is found again once it's evicted and recreated.
+  repo.ReleaseCandidates( candidates );
+  ASSERT_TRUE( repo.EvictUnreferencedCandidates() );
+
+  candidates = repo.GetCandidatesForStrings( inputs );
+  EXPECT_EQ( candidates[ 0 ], candidates[ 1 ] );
+  EXPECT_EQ( "same_text", candidates[ 0 ]->Text() );
+}
+
+
+TEST( CandidateRepositoryTest, ConcurrentCallsGiveSameCandidates ) {
+  std::vector< std::string > inputs;
+
+  for ( int i = 0; i < 1000; ++i ) {
+    inputs.push_back( "concurrent_" + boost::lexical_cast< std::string >( i ) );
+  }
+
+  std::vector< const Candidate * > first_candidates;
+  std::vector< const Candidate * > second_candidates;
+  boost::thread first( boost::bind( &AcquireCandidates,
+                                    &inputs,
+                                    &first_candidates ) );
+  boost::thread second( boost::bind( &AcquireCandidates,
+                                     &inputs,
+                                     &second_candidates ) );
+  first.join();
+  second.join();
+
+  ASSERT_EQ( inputs.size(), first_candidates.size() );
+  EXPECT_TRUE( first_candidates == second_candidates );
+
+  for ( size_t i = 0; i < inputs.size(); ++i ) {
+    EXPECT_EQ( inputs[ i ], first_candidates[ i ]->Text() );
+  }
+
+  // Each candidate was referenced once by each thread.
+  CandidateRepository &repo = CandidateRepository::Instance();
+  repo.ReleaseCandidates( first_candidates );
+  ASSERT_TRUE( repo.EvictUnreferencedCandidates() );
+  EXPECT_EQ( inputs[ 0 ], second_candidates[ 0 ]->Text() );
+  repo.ReleaseCandidates( second_candidates );
+}
+
+
 TEST( CandidateRepositoryTest, TooLongCandidateSkipped ) {
   std::vector< std::string > inputs;
   inputs.push_back( std::string( 81, 'a' ) );  // this one is too long
@@ -74,5 +145,47 @@ TEST( CandidateRepositoryTest, EmptyCandidatesForNonPrintable ) {
 }
 
 
-} // namespace YouCompleteMe
+TEST( CandidateRepositoryTest, ReferencedCandidatesNotEvicted ) {
+  std::vector< std::string > inputs;
+  inputs.push_back( "referenced_candidate" );
+
+  CandidateRepository &repo = CandidateRepository::Instance();
+  ASSERT_TRUE( repo.EvictUnreferencedCandidates() );
+  int num_candidates = repo.NumStoredCandidates();
+  size_t num_bytes = repo.NumStoredBytes();
+
+  std::vector< const Candidate * > candidates =
+    repo.AcquireCandidatesForStrings( inputs );
+  EXPECT_EQ( num_candidates + 1, repo.NumStoredCandidates() );
+  EXPECT_LT( num_bytes, repo.NumStoredBytes() );
+
+  EXPECT_TRUE( repo.EvictUnreferencedCandidates() );
+  EXPECT_EQ( num_candidates + 1, repo.NumStoredCandidates() );
+  EXPECT_EQ( "referenced_candidate", candidates[ 0 ]->Text() );
+
+  repo.ReleaseCandidates( candidates );
+  EXPECT_TRUE( repo.EvictUnreferencedCandidates() );
+  EXPECT_EQ( num_candidates, repo.NumStoredCandidates() );
+  EXPECT_EQ( num_bytes, repo.NumStoredBytes() );
+}
+
 
+TEST( CandidateRepositoryTest, PinPreventsEviction ) {
+  std::vector< std::string > inputs;
+  inputs.push_back( "pinned_candidate" );
+
+  CandidateRepository &repo = CandidateRepository::Instance();
+
+  {
+    CandidateRepository::Pin pin;
+    std::vector< const Candidate * > candidates =
+      repo.GetCandidatesForStrings( inputs );
+
+    EXPECT_FALSE( repo.EvictUnreferencedCandidates() );
+    EXPECT_EQ( "pinned_candidate", candidates[ 0 ]->Text() );
+  }
+
+  EXPECT_TRUE( repo.EvictUnreferencedCandidates() );
+}
+
+} // namespace YouCompleteMe
@@ -235,4 +235,11 @@ TEST( CandidateTest, QueryMatchResultCaseSensitiveIsntSubsequence ) {
   EXPECT_FALSE( candidate.QueryMatchResult( "foobaaaR", true ).IsSubsequence() );
 }
 
+TEST( CandidateTest, QueryMatchResultNonAsciiIsntSubsequence ) {
+  Candidate candidate( "foobar" );
+
+  EXPECT_FALSE( candidate.QueryMatchResult( "f¢"      , false ).IsSubsequence() );
+  EXPECT_FALSE( candidate.QueryMatchResult( "€"       , true ).IsSubsequence() );
+}
+
 } // namespace YouCompleteMe
@@ -18,15 +18,21 @@
 #include <gtest/gtest.h>
 #include <gmock/gmock.h>
 #include "IdentifierCompleter.h"
+#include "CandidateRepository.h"
 #include "Utils.h"
 #include "TestUtils.h"
 
+#include <boost/filesystem.hpp>
+#include <boost/lexical_cast.hpp>
+
 using ::testing::ElementsAre;
 using ::testing::IsEmpty;
 using ::testing::WhenSorted;
 
 namespace YouCompleteMe {
 
+namespace fs = boost::filesystem;
+
 
 // This differs from what we expect from the ClangCompleter. That one should
 // return results for an empty query.
@@ -298,6 +304,132 @@ TEST( IdentifierCompleterTest, TagsEndToEndWorks ) {
 
 }
 
+
+TEST( IdentifierCompleterTest, EmptiedTagsFileRemovesIdentifiers ) {
+  fs::path tags = fs::temp_directory_path() / fs::unique_path();
+  fs::copy_file( PathToTestFile( "basic.tags" ), tags );
+  std::vector< std::string > tag_files;
+  tag_files.push_back( tags.string() );
+
+  IdentifierCompleter completer;
+  completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "fo", "cpp" ),
+               ElementsAre( "foosy",
+                            "fooaaa" ) );
+
+  WriteUtf8File( tags, "" );
+  completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "fo", "cpp" ), IsEmpty() );
+
+  fs::remove( tags );
+}
+
+
+TEST( IdentifierCompleterTest, SnapshotRestoresIdentifiers ) {
+  fs::path snapshot = fs::temp_directory_path() / fs::unique_path();
+  std::vector< std::string > tag_files;
+  tag_files.push_back( PathToTestFile( "basic.tags" ).string() );
+
+  {
+    IdentifierCompleter completer( StringVector( "foobar" ), "cpp", "/foo" );
+    completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+    EXPECT_TRUE( completer.SaveSnapshot( snapshot.string() ) );
+  }
+
+  IdentifierCompleter completer;
+  EXPECT_TRUE( completer.LoadSnapshot( snapshot.string() ) );
+
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "fo", "cpp" ),
+               WhenSorted( ElementsAre( "fooaaa",
+                                        "foobar",
+                                        "foosy" ) ) );
+
+  fs::remove( snapshot );
+}
+
+
+TEST( IdentifierCompleterTest, MaxCandidatesKeepsBestOnes ) {
+  EXPECT_THAT( IdentifierCompleter(
+                 StringVector(
+                   "foobarbaz",
+                   "afoobar",
+                   "foobar",
+                   "fooquxbar" ) ).CandidatesForQueryAndType( "fbr", "", 2 ),
+               ElementsAre( "foobar",
+                            "foobarbaz" ) );
+}
+
+
+TEST( IdentifierCompleterTest, ManyCandidatesSortedAcrossShards ) {
+  std::vector< std::string > candidates;
+
+  for ( int i = 0; i < 30000; ++i ) {
+    candidates.push_back( "foo" + boost::lexical_cast< std::string >( i ) );
+  }
+
+  IdentifierCompleter completer( candidates );
+
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "foo1", "", 5 ),
+               ElementsAre( "foo1",
+                            "foo10",
+                            "foo11",
+                            "foo12",
+                            "foo13" ) );
+
+  std::vector< std::string > all_results =
+    completer.CandidatesForQueryAndType( "foo29", "" );
+
+  EXPECT_EQ( 4485, all_results.size() );
+  EXPECT_EQ( "foo29", all_results.front() );
+}
+
+
+TEST( IdentifierCompleterTest, ClearedCandidatesAreEvictable ) {
+  CandidateRepository &repo = CandidateRepository::Instance();
+  ASSERT_TRUE( repo.EvictUnreferencedCandidates() );
+  int num_candidates = repo.NumStoredCandidates();
+
+  IdentifierCompleter completer;
+  completer.AddIdentifiersToDatabase( StringVector( "foobar", "foobar" ),
+                                      "cpp",
+                                      "/foo" );
+  completer.AddIdentifiersToDatabase( StringVector( "foobar", "zoobar" ),
+                                      "cpp",
+                                      "/bar" );
+
+  EXPECT_TRUE( repo.EvictUnreferencedCandidates() );
+  EXPECT_EQ( num_candidates + 2, repo.NumStoredCandidates() );
+
+  completer.ClearForFileAndAddIdentifiersToDatabase(
+    std::vector< std::string >(), "cpp", "/bar" );
+
+  EXPECT_TRUE( repo.EvictUnreferencedCandidates() );
+  EXPECT_EQ( num_candidates + 1, repo.NumStoredCandidates() );
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "oo", "cpp" ),
+               ElementsAre( "foobar" ) );
+}
+
+
+TEST( IdentifierCompleterTest, ReplacingIdentifiersKeepsOtherFiles ) {
+  IdentifierCompleter completer;
+  completer.AddIdentifiersToDatabase( StringVector( "foobar", "foozoo" ),
+                                      "cpp",
+                                      "/foo" );
+  completer.AddIdentifiersToDatabase( StringVector( "foobar" ),
+                                      "cpp",
+                                      "/bar" );
+
+  completer.ClearForFileAndAddIdentifiersToDatabase(
+    StringVector( "fooqux", "fooqux" ), "cpp", "/foo" );
+
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "foo", "cpp" ),
+               ElementsAre( "foobar",
+                            "fooqux" ) );
+}
+
+
 // TODO: tests for filepath and filetype candidate storing
 
 } // namespace YouCompleteMe
@@ -0,0 +1,194 @@
+// Copyright (C) 2016 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include <gtest/gtest.h>
+#include <gmock/gmock.h>
+#include "IdentifierDatabase.h"
+#include "CandidateRepository.h"
+#include "Result.h"
+#include "TestUtils.h"
+
+#include <boost/bind.hpp>
+#include <boost/thread/thread.hpp>
+
+using ::testing::ElementsAre;
+
+namespace YouCompleteMe {
+
+namespace {
+
+std::vector< std::string > ResultTexts(
+  const IdentifierDatabase &database,
+  const std::string &query,
+  const std::vector< std::string > &filepaths =
+    std::vector< std::string >() ) {
+  CandidateRepository::Pin pin;
+  std::vector< Result > results;
+  database.ResultsForQueryAndType( query, "cpp", filepaths, results );
+
+  std::vector< std::string > texts;
+
+  for ( size_t i = 0; i < results.size(); ++i ) {
+    texts.push_back( *results[ i ].Text() );
+  }
+
+  return texts;
+}
+
+
+void ReplaceIdentifiersRepeatedly( IdentifierDatabase *database ) {
+  for ( int i = 0; i < 500; ++i ) {
+    database->ReplaceCandidatesStoredForFile(
+      StringVector( i % 2 ? "fooqux" : "foozoo" ), "cpp", "/foo" );
+  }
+}
+
+} // unnamed namespace
+
+
+TEST( IdentifierDatabaseTest, ReplaceCandidatesStoredForFile ) {
+  IdentifierDatabase database;
+  database.AddIdentifiers( StringVector( "foobar", "foozoo" ), "cpp", "/foo" );
+  database.AddIdentifiers( StringVector( "foobar" ), "cpp", "/bar" );
+
+  database.ReplaceCandidatesStoredForFile( StringVector( "fooqux", "foozoo" ),
+                                           "cpp",
+                                           "/foo" );
+
+  EXPECT_THAT( ResultTexts( database, "foo" ),
+               ElementsAre( "foobar",
+                            "fooqux",
+                            "foozoo" ) );
+
+  database.ClearCandidatesStoredForFile( "cpp", "/bar" );
+
+  EXPECT_THAT( ResultTexts( database, "foo" ),
+               ElementsAre( "fooqux",
+                            "foozoo" ) );
+}
+
+
+TEST( IdentifierDatabaseTest, UpdateCandidatesStoredForFile ) {
+  IdentifierDatabase database;
+  database.AddIdentifiers( StringVector( "foobar", "foozoo" ), "cpp", "/foo" );
+  database.AddIdentifiers( StringVector( "foozoo" ), "cpp", "/bar" );
+
+  database.UpdateCandidatesStoredForFile( StringVector( "fooqux", "foobar" ),
+                                          StringVector( "foozoo", "foonil" ),
+                                          "cpp",
+                                          "/foo" );
+
+  EXPECT_THAT( ResultTexts( database, "foo" ),
+               ElementsAre( "foobar",
+                            "fooqux",
+                            "foozoo" ) );
+
+  database.UpdateCandidatesStoredForFile( StringVector( "fooqux" ),
+                                          StringVector( "foozoo" ),
+                                          "cpp",
+                                          "/bar" );
+
+  EXPECT_THAT( ResultTexts( database, "foo" ),
+               ElementsAre( "foobar",
+                            "fooqux" ) );
+
+  database.ClearCandidatesStoredForFile( "cpp", "/foo" );
+
+  EXPECT_THAT( ResultTexts( database, "foo" ), ElementsAre( "fooqux" ) );
+}
+
+
+TEST( IdentifierDatabaseTest, ResultsNearFilesAreRankedFirst ) {
+  IdentifierDatabase database;
+  database.AddIdentifiers( StringVector( "foo_a" ), "cpp", "/a" );
+  database.AddIdentifiers( StringVector( "foo_b" ), "cpp", "/b" );
+  database.AddIdentifiers( StringVector( "foo_c" ), "cpp", "/c" );
+
+  EXPECT_THAT( ResultTexts( database, "foo" ),
+               ElementsAre( "foo_a", "foo_b", "foo_c" ) );
+  EXPECT_THAT( ResultTexts( database, "foo", StringVector( "/c", "/b" ) ),
+               ElementsAre( "foo_c", "foo_b", "foo_a" ) );
+
+  // The prefix matches are still ranked first.
+  database.AddIdentifiers( StringVector( "xfoo" ), "cpp", "/c" );
+  EXPECT_THAT( ResultTexts( database, "foo", StringVector( "/c" ) ),
+               ElementsAre( "foo_c", "foo_a", "foo_b", "xfoo" ) );
+}
+
+
+TEST( IdentifierDatabaseTest, ResultsStoredForSeveralNearFilesUseTheNearest ) {
+  IdentifierDatabase database;
+  database.AddIdentifiers( StringVector( "foo_ab" ), "cpp", "/a" );
+  database.AddIdentifiers( StringVector( "foo_ab", "foo_b" ), "cpp", "/b" );
+  database.AddIdentifiers( StringVector( "foo_c" ), "cpp", "/c" );
+
+  EXPECT_THAT( ResultTexts( database, "foo", StringVector( "/a", "/b" ) ),
+               ElementsAre( "foo_ab", "foo_b", "foo_c" ) );
+  // Both are stored for /b, so the shorter one comes first.
+  EXPECT_THAT( ResultTexts( database, "foo", StringVector( "/c", "/b" ) ),
+               ElementsAre( "foo_c", "foo_b", "foo_ab" ) );
+}
+
+
+TEST( IdentifierDatabaseTest, ResultsAreRankedByOccurrences ) {
+  IdentifierDatabase database;
+  database.AddIdentifiers( StringVector( "foo_a", "foo_b", "foo_c" ),
+                           "cpp",
+                           "/foo" );
+
+  std::vector< int > occurrences;
+  occurrences.push_back( 2 );
+  occurrences.push_back( 5 );
+  database.SetOccurrencesForFile( StringVector( "foo_b", "foo_c" ),
+                                  occurrences,
+                                  "cpp",
+                                  "/foo" );
+
+  EXPECT_THAT( ResultTexts( database, "foo", StringVector( "/foo" ) ),
+               ElementsAre( "foo_c", "foo_b", "foo_a" ) );
+
+  // The occurrences of a removed candidate are forgotten.
+  database.UpdateCandidatesStoredForFile( StringVector( "foo_d" ),
+                                          StringVector( "foo_c" ),
+                                          "cpp",
+                                          "/foo" );
+  database.UpdateCandidatesStoredForFile( StringVector( "foo_c" ),
+                                          std::vector< std::string >(),
+                                          "cpp",
+                                          "/foo" );
+
+  EXPECT_THAT( ResultTexts( database, "foo", StringVector( "/foo" ) ),
+               ElementsAre( "foo_b", "foo_a", "foo_c", "foo_d" ) );
+}
+
+
+TEST( IdentifierDatabaseTest, QueriesSeeReplacedCandidatesAtomically ) {
+  IdentifierDatabase database;
+  database.AddIdentifiers( StringVector( "foobar" ), "cpp", "/bar" );
+  database.AddIdentifiers( StringVector( "foozoo" ), "cpp", "/foo" );
+
+  boost::thread writer( boost::bind( &ReplaceIdentifiersRepeatedly,
+                                     &database ) );
+
+  for ( int i = 0; i < 500; ++i ) {
+    EXPECT_EQ( 2, ResultTexts( database, "foo" ).size() );
+  }
+
+  writer.join();
+}
+
+} // namespace YouCompleteMe
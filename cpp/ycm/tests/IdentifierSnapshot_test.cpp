@@ -0,0 +1,185 @@
+// Copyright (C) 2016 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+
+#include <gtest/gtest.h>
+#include <gmock/gmock.h>
+#include "IdentifierSnapshot.h"
+#include "IdentifierDatabase.h"
+#include "CandidateRepository.h"
+#include "TestUtils.h"
+#include "Utils.h"
+
+#include <boost/filesystem.hpp>
+#include <boost/filesystem/fstream.hpp>
+
+using ::testing::ElementsAre;
+using ::testing::IsEmpty;
+using ::testing::WhenSorted;
+
+namespace YouCompleteMe {
+
+namespace fs = boost::filesystem;
+
+namespace {
+
+class IdentifierSnapshotTest : public ::testing::Test {
+protected:
+  IdentifierSnapshotTest()
+    : path_( fs::temp_directory_path() / fs::unique_path() ) {
+  }
+
+  virtual ~IdentifierSnapshotTest() {
+    fs::remove( path_ );
+  }
+
+  fs::path path_;
+};
+
+} // unnamed namespace
+
+
+TEST_F( IdentifierSnapshotTest, RoundTrip ) {
+  IdentifierDatabase database;
+  database.AddIdentifiers( StringVector( "foo", "bar" ), "cpp", "/foo" );
+  database.AddIdentifiers( StringVector( "bar", "qux" ), "cpp", "/bar" );
+  database.AddIdentifiers( StringVector( "zoo" ), "python", "/zoo" );
+
+  TagFileStateMap tag_file_states;
+  TagFileState &state = tag_file_states[ "/tags" ];
+  state.last_write_time_ = 1234;
+  state.size_ = 5678;
+  state.fingerprints_[ "cpp" ][ "/foo" ] = 42;
+
+  {
+    CandidateRepository::Pin pin;
+    FiletypeStoredCandidateMap stored_candidates;
+    database.GetStoredCandidates( stored_candidates );
+
+    ASSERT_TRUE( WriteIdentifierSnapshot( path_,
+                                          tag_file_states,
+                                          stored_candidates ) );
+  }
+
+  TagFileStateMap read_tag_file_states;
+  FiletypeIdentifierMap identifiers;
+  ASSERT_TRUE( ReadIdentifierSnapshot( path_,
+                                       read_tag_file_states,
+                                       identifiers ) );
+
+  EXPECT_EQ( 1U, read_tag_file_states.size() );
+  EXPECT_EQ( 1234, read_tag_file_states[ "/tags" ].last_write_time_ );
+  EXPECT_EQ( 5678U, read_tag_file_states[ "/tags" ].size_ );
+  EXPECT_EQ( 42U,
+             read_tag_file_states[ "/tags" ].fingerprints_[ "cpp" ][ "/foo" ] );
+
+  EXPECT_EQ( 2U, identifiers.size() );
+  EXPECT_THAT( identifiers[ "cpp" ][ "/foo" ], WhenSorted( ElementsAre( "bar",
+                                                                       "foo" ) ) );
+  EXPECT_THAT( identifiers[ "cpp" ][ "/bar" ], WhenSorted( ElementsAre( "bar",
+                                                                       "qux" ) ) );
+  EXPECT_THAT( identifiers[ "python" ][ "/zoo" ], ElementsAre( "zoo" ) );
+}
+
+
+TEST_F( IdentifierSnapshotTest, InvalidSnapshotIsIgnored ) {
+  TagFileStateMap tag_file_states;
+  FiletypeIdentifierMap identifiers;
+
+  EXPECT_FALSE( ReadIdentifierSnapshot( path_, tag_file_states, identifiers ) );
+
+  WriteUtf8File( path_, "YCMIDSNP garbage" );
+  EXPECT_FALSE( ReadIdentifierSnapshot( path_, tag_file_states, identifiers ) );
+
+  {
+    IdentifierDatabase database;
+    database.AddIdentifiers( StringVector( "foo" ), "cpp", "/foo" );
+    CandidateRepository::Pin pin;
+    FiletypeStoredCandidateMap stored_candidates;
+    database.GetStoredCandidates( stored_candidates );
+    ASSERT_TRUE( WriteIdentifierSnapshot( path_,
+                                          tag_file_states,
+                                          stored_candidates ) );
+  }
+
+  // A truncated snapshot is rejected as a whole.
+  fs::resize_file( path_, fs::file_size( path_ ) - 1 );
+  EXPECT_FALSE( ReadIdentifierSnapshot( path_, tag_file_states, identifiers ) );
+  EXPECT_THAT( tag_file_states, IsEmpty() );
+  EXPECT_THAT( identifiers, IsEmpty() );
+}
+
+
+TEST_F( IdentifierSnapshotTest, CorruptCountIsRejected ) {
+  {
+    IdentifierDatabase database;
+    database.AddIdentifiers( StringVector( "foo" ), "cpp", "/foo" );
+    CandidateRepository::Pin pin;
+    FiletypeStoredCandidateMap stored_candidates;
+    database.GetStoredCandidates( stored_candidates );
+    ASSERT_TRUE( WriteIdentifierSnapshot( path_,
+                                          TagFileStateMap(),
+                                          stored_candidates ) );
+  }
+
+  std::string snapshot = ReadUtf8File( path_ );
+
+  // The snapshot ends with the number of files of the filetype, the path of
+  // the file, its number of candidates and the candidate. A huge count must be
+  // rejected instead of being allocated.
+  const size_t count_offsets[] = { snapshot.size() - 16,
+                                   snapshot.size() - 8 };
+
+  for ( size_t i = 0; i < 2; ++i ) {
+    std::string corrupt_snapshot = snapshot;
+    corrupt_snapshot.replace( count_offsets[ i ], 4, 4, '\xff' );
+
+    {
+      fs::ofstream file( path_, std::ios::out | std::ios::binary );
+      file.write( corrupt_snapshot.data(), corrupt_snapshot.size() );
+    }
+
+    TagFileStateMap tag_file_states;
+    FiletypeIdentifierMap identifiers;
+    EXPECT_FALSE( ReadIdentifierSnapshot( path_,
+                                          tag_file_states,
+                                          identifiers ) );
+    EXPECT_THAT( identifiers, IsEmpty() );
+  }
+}
+
+
+TEST_F( IdentifierSnapshotTest, NoTemporaryFileIsLeft ) {
+  ASSERT_TRUE( WriteIdentifierSnapshot( path_,
+                                        TagFileStateMap(),
+                                        FiletypeStoredCandidateMap() ) );
+
+  size_t num_files = 0;
+
+  for ( fs::directory_iterator it( path_.parent_path() ), end;
+        it != end;
+        ++it ) {
+    if ( it->path().filename().string().find(
+           path_.filename().string() ) == 0 ) {
+      ++num_files;
+    }
+  }
+
+  EXPECT_EQ( 1U, num_files );
+}
+
+} // namespace YouCompleteMe
@@ -18,6 +18,7 @@
 #include "IdentifierUtils.h"
 #include "TestUtils.h"
 #include "IdentifierDatabase.h"
+#include "Utils.h"
 
 #include <gtest/gtest.h>
 #include <gmock/gmock.h>
@@ -29,6 +30,125 @@ namespace fs = boost::filesystem;
 using ::testing::ElementsAre;
 using ::testing::ContainerEq;
 using ::testing::WhenSorted;
+using ::testing::IsEmpty;
+
+
+TEST( IdentifierUtilsTest, RemoveIdentifierFreeTextWorks ) {
+  EXPECT_STREQ( "foo \nbar \nqux",
+                RemoveIdentifierFreeText( "foo \nbar //foo \nqux" ).c_str() );
+
+  EXPECT_STREQ( "foo \nbar \nqux",
+                RemoveIdentifierFreeText( "foo \nbar #foo \nqux" ).c_str() );
+
+  EXPECT_STREQ( "foo \nbar \nqux",
+                RemoveIdentifierFreeText(
+                  "foo \nbar /* foo \n foo2 */\nqux" ).c_str() );
+
+  EXPECT_STREQ( "foo \nbar \nqux",
+                RemoveIdentifierFreeText( "foo \nbar 'foo'\nqux" ).c_str() );
+
+  EXPECT_STREQ( "foo \nbar \nqux",
+                RemoveIdentifierFreeText( "foo \nbar \"foo\"\nqux" ).c_str() );
+}
+
+
+TEST( IdentifierUtilsTest, RemoveIdentifierFreeTextEscapedQuotes ) {
+  EXPECT_STREQ( "foo \nbar \nqux",
+                RemoveIdentifierFreeText(
+                  "foo \nbar 'fo\\'oz\\nfoo'\nqux" ).c_str() );
+
+  EXPECT_STREQ( "foo \nbar baz\nqux ",
+                RemoveIdentifierFreeText(
+                  "foo \nbar \"fo\\\\\"baz\nqux \"qwe\"" ).c_str() );
+
+  EXPECT_STREQ( "\\\"foo\\\" zoo",
+                RemoveIdentifierFreeText(
+                  "\\\"foo\\\"'\"''bar' zoo'test'" ).c_str() );
+
+  // Without a closing quote on the line, an escaped quote ends the string.
+  EXPECT_STREQ( "foo \nbar",
+                RemoveIdentifierFreeText( "foo 'a\\'\nbar" ).c_str() );
+}
+
+
+TEST( IdentifierUtilsTest, RemoveIdentifierFreeTextMultilineStrings ) {
+  EXPECT_STREQ( "'\nlet x = \nlet y = ",
+                RemoveIdentifierFreeText(
+                  "'\nlet x = 'foo'\nlet y = 'bar'" ).c_str() );
+
+  EXPECT_STREQ( "\nzoo",
+                RemoveIdentifierFreeText(
+                  "\"\"\"\nfoobar\n\"\"\"\nzoo" ).c_str() );
+
+  EXPECT_STREQ( "\nzoo",
+                RemoveIdentifierFreeText( "'''\nfoobar\n'''\nzoo" ).c_str() );
+}
+
+
+TEST( IdentifierUtilsTest, ExtractIdentifiersFromTextWorks ) {
+  EXPECT_THAT( ExtractIdentifiersFromText(
+                 "foo $_bar \n&BazGoo\n FOO= !!! '-' - _ (x) one-two !moo [qqq]",
+                 "" ),
+               ElementsAre( "foo", "_bar", "BazGoo", "FOO", "_", "x", "one",
+                            "two", "moo", "qqq" ) );
+
+  EXPECT_THAT( ExtractIdentifiersFromText( "uniçode 1çx ç→d", "cpp" ),
+               ElementsAre( "uniçode", "çx", "ç", "d" ) );
+}
+
+
+TEST( IdentifierUtilsTest, ExtractIdentifiersFromTextUnicodeCharacterClasses ) {
+  // A combining acute accent isn't a word character.
+  EXPECT_THAT( ExtractIdentifiersFromText( "cafe\xcc\x81x", "cpp" ),
+               ElementsAre( "cafe", "x" ) );
+
+  // Greek question mark, Arabic comma, Devanagari danda and modifier letter
+  // symbols.
+  EXPECT_THAT( ExtractIdentifiersFromText(
+                 "a\xcd\xbe" "b\xd8\x8c" "c\xe0\xa5\xa4" "d\xcb\x82" "e",
+                 "cpp" ),
+               ElementsAre( "a", "b", "c", "d", "e" ) );
+
+  // Arabic-Indic digit one.
+  EXPECT_THAT( ExtractIdentifiersFromText( "\xd9\xa1" "ab", "cpp" ),
+               ElementsAre( "ab" ) );
+  EXPECT_THAT( ExtractIdentifiersFromText( ".\xd9\xa1" "a b", "r" ),
+               ElementsAre( "a", "b" ) );
+
+  // Ideographic space.
+  EXPECT_THAT( ExtractIdentifiersFromText( "a\xe3\x80\x80" "b", "html" ),
+               ElementsAre( "a", "b" ) );
+}
+
+
+TEST( IdentifierUtilsTest, ExtractIdentifiersFromTextPerFiletype ) {
+  EXPECT_THAT( ExtractIdentifiersFromText( "$foo a$1 1b", "javascript" ),
+               ElementsAre( "$foo", "a$1", "b" ) );
+
+  EXPECT_THAT( ExtractIdentifiersFromText(
+                 "foo -zoo {font-size: 12px;} a99", "css" ),
+               ElementsAre( "foo", "-zoo", "font-size", "px", "a99" ) );
+
+  EXPECT_THAT( ExtractIdentifiersFromText(
+                 "<foo> <goo-foo zoo=bar aa=\"\" z=''/> b@g fo.ba", "html" ),
+               ElementsAre( "foo", "goo-foo", "zoo", "bar", "aa", "z", "b@g",
+                            "fo", "ba" ) );
+
+  EXPECT_THAT( ExtractIdentifiersFromText( "a.b .1a _a ..1", "r" ),
+               ElementsAre( "a.b", "a", "a", "..1" ) );
+
+  EXPECT_THAT( ExtractIdentifiersFromText( "(a/b/c *foo?)", "clojure" ),
+               ElementsAre( "a/b", "c", "*foo?" ) );
+
+  EXPECT_THAT( ExtractIdentifiersFromText( "foo' x 'y", "haskell" ),
+               ElementsAre( "foo'" ) );
+
+  EXPECT_THAT( ExtractIdentifiersFromText( "\\ref{fig:foo-bar} some8", "tex" ),
+               ElementsAre( "ref", "fig:foo-bar", "some" ) );
+
+  EXPECT_THAT( ExtractIdentifiersFromText( "foo-bar baz- qu'x", "perl6" ),
+               ElementsAre( "foo-bar", "baz", "qu'x" ) );
+}
 
 
 TEST( IdentifierUtilsTest, ExtractIdentifiersFromTagsFileWorks ) {
@@ -55,5 +175,61 @@ TEST( IdentifierUtilsTest, ExtractIdentifiersFromTagsFileWorks ) {
                ContainerEq( expected ) );
 }
 
+
+TEST( IdentifierUtilsTest, ExtractChangedIdentifiersFromTagsFile ) {
+  fs::path testfile = fs::temp_directory_path() / fs::unique_path();
+  fs::path testfile_parent = testfile.parent_path();
+  std::string foo = ( testfile_parent / "foo" ).string();
+  std::string bar = ( testfile_parent / "bar" ).string();
+  std::string qux = ( testfile_parent / "qux" ).string();
+
+  WriteUtf8File( testfile,
+                 "i1\tfoo\t/^i1$/;\"\tlanguage:C++\n"
+                 "i2\tbar\t/^i2$/;\"\tlanguage:C++\n"
+                 "i3\tqux\t/^i3$/;\"\tlanguage:C\n" );
+
+  FiletypeFingerprintMap fingerprints;
+  FiletypeIdentifierMap expected;
+  expected[ "cpp" ][ foo ].push_back( "i1" );
+  expected[ "cpp" ][ bar ].push_back( "i2" );
+  expected[ "c" ][ qux ].push_back( "i3" );
+
+  EXPECT_THAT( ExtractChangedIdentifiersFromTagsFile( testfile, fingerprints ),
+               ContainerEq( expected ) );
+
+  // Tags are added for foo and removed for qux; bar is unchanged.
+  WriteUtf8File( testfile,
+                 "i1\tfoo\t/^i1$/;\"\tlanguage:C++\n"
+                 "i2\tbar\t/^i2$/;\"\tlanguage:C++\n"
+                 "i4\tfoo\t/^i4$/;\"\tlanguage:C++\n" );
+
+  expected.clear();
+  expected[ "cpp" ][ foo ].push_back( "i1" );
+  expected[ "cpp" ][ foo ].push_back( "i4" );
+  expected[ "c" ][ qux ];
+
+  EXPECT_THAT( ExtractChangedIdentifiersFromTagsFile( testfile, fingerprints ),
+               ContainerEq( expected ) );
+
+  EXPECT_THAT( ExtractChangedIdentifiersFromTagsFile( testfile, fingerprints ),
+               IsEmpty() );
+
+  // All the tags are removed when the file is emptied.
+  WriteUtf8File( testfile, "" );
+
+  expected.clear();
+  expected[ "cpp" ][ foo ];
+  expected[ "cpp" ][ bar ];
+
+  EXPECT_THAT( ExtractChangedIdentifiersFromTagsFile( testfile, fingerprints ),
+               ContainerEq( expected ) );
+  EXPECT_THAT( fingerprints, IsEmpty() );
+
+  EXPECT_THAT( ExtractChangedIdentifiersFromTagsFile( testfile, fingerprints ),
+               IsEmpty() );
+
+  fs::remove( testfile );
+}
+
 } // namespace YouCompleteMe
 
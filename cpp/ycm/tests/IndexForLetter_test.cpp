@@ -16,7 +16,7 @@
 // along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
 #include <gtest/gtest.h>
-#include "LetterNodeListMap.h"
+#include "Utils.h"
 
 namespace YouCompleteMe {
 
@@ -16,7 +16,10 @@
 // along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
 #include "IdentifierCompleter.h"
+#include "IdentifierUtils.h"
+#include "CandidateRepository.h"
 #include "PythonSupport.h"
+#include "ReleaseGil.h"
 #include "versioning.h"
 
 #ifdef USE_CLANG_COMPLETER
@@ -44,6 +47,39 @@ bool HasClangSupport() {
 }
 
 
+int NumStoredCandidates() {
+  return YouCompleteMe::CandidateRepository::Instance().NumStoredCandidates();
+}
+
+
+size_t NumStoredCandidateBytes() {
+  return YouCompleteMe::CandidateRepository::Instance().NumStoredBytes();
+}
+
+
+// The buffers of the identifier completer can be big, so the GIL is released
+// while they are processed.
+std::string RemoveIdentifierFreeTextReleasingGil( const std::string &text ) {
+  YouCompleteMe::ReleaseGil unlock;
+  return YouCompleteMe::RemoveIdentifierFreeText( text );
+}
+
+
+std::vector< std::string > ExtractIdentifiersFromTextReleasingGil(
+  const std::string &text,
+  const std::string &filetype ) {
+  YouCompleteMe::ReleaseGil unlock;
+  return YouCompleteMe::ExtractIdentifiersFromText( text, filetype );
+}
+
+
+// The max_results argument of FilterAndSortCandidates is optional.
+BOOST_PYTHON_FUNCTION_OVERLOADS( FilterAndSortCandidatesOverloads,
+                                 YouCompleteMe::FilterAndSortCandidates,
+                                 3,
+                                 4 )
+
+
 BOOST_PYTHON_MODULE(ycm_core)
 {
   using namespace boost::python;
@@ -53,8 +89,14 @@ BOOST_PYTHON_MODULE(ycm_core)
   PyEval_InitThreads();
 
   def( "HasClangSupport", HasClangSupport );
-  def( "FilterAndSortCandidates", FilterAndSortCandidates );
+  def( "FilterAndSortCandidates",
+       FilterAndSortCandidates,
+       FilterAndSortCandidatesOverloads() );
   def( "YcmCoreVersion", YcmCoreVersion );
+  def( "NumStoredCandidates", NumStoredCandidates );
+  def( "NumStoredCandidateBytes", NumStoredCandidateBytes );
+  def( "RemoveIdentifierFreeText", RemoveIdentifierFreeTextReleasingGil );
+  def( "ExtractIdentifiersFromText", ExtractIdentifiersFromTextReleasingGil );
 
   // This is exposed so that we can test it.
   def( "GetUtf8String", GetUtf8String );
@@ -64,15 +106,26 @@ BOOST_PYTHON_MODULE(ycm_core)
           &IdentifierCompleter::AddIdentifiersToDatabase )
     .def( "ClearForFileAndAddIdentifiersToDatabase",
           &IdentifierCompleter::ClearForFileAndAddIdentifiersToDatabase )
+    .def( "UpdateIdentifiersInDatabase",
+          &IdentifierCompleter::UpdateIdentifiersInDatabase )
+    .def( "SetIdentifierOccurrencesInDatabase",
+          &IdentifierCompleter::SetIdentifierOccurrencesInDatabase )
     .def( "AddIdentifiersToDatabaseFromTagFiles",
           &IdentifierCompleter::AddIdentifiersToDatabaseFromTagFiles )
+    .def( "SaveSnapshot", &IdentifierCompleter::SaveSnapshot )
+    .def( "LoadSnapshot", &IdentifierCompleter::LoadSnapshot )
     .def( "CandidatesForQueryAndType",
-          &IdentifierCompleter::CandidatesForQueryAndType );
+          &IdentifierCompleter::CandidatesForQueryAndType )
+    .def( "CandidatesForQueryAndTypeNearFiles",
+          &IdentifierCompleter::CandidatesForQueryAndTypeNearFiles );
 
   class_< std::vector< std::string >,
       boost::shared_ptr< std::vector< std::string > > >( "StringVector" )
     .def( vector_indexing_suite< std::vector< std::string > >() );
 
+  class_< std::vector< int > >( "IntVector" )
+    .def( vector_indexing_suite< std::vector< int > >() );
+
 #ifdef USE_CLANG_COMPLETER
   def( "ClangVersion", ClangVersion );
 
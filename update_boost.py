@@ -52,6 +52,8 @@ BOOST_PARTS = [
   'boost/ptr_container/ptr_container.hpp',
   'boost/filesystem.hpp',
   'boost/filesystem/fstream.hpp',
+  'boost/interprocess/file_mapping.hpp',
+  'boost/interprocess/mapped_region.hpp',
   'boost/utility.hpp',
   'boost/algorithm/cxx11/any_of.hpp',
   'atomic',
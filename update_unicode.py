@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+# Generates the tables of non-ASCII code points used by the native identifier
+# extraction in cpp/ycm/IdentifierUtils.cpp. The tables are built by matching
+# every code point against the same character classes as the identifier regexes
+# of ycmd/identifier_utils.py so that both always agree. Run this script again
+# with a newer Python to update the tables to its Unicode database.
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import os
+import re
+import sys
+import unicodedata
+
+DIR_OF_THIS_SCRIPT = os.path.dirname( os.path.abspath( __file__ ) )
+UNICODE_TABLES_PATH = os.path.join(
+  DIR_OF_THIS_SCRIPT, 'cpp', 'ycm', 'UnicodeTables.inc' )
+
+FIRST_NON_ASCII_CODE_POINT = 0x80
+LAST_CODE_POINT = 0x10FFFF
+FIRST_SURROGATE = 0xD800
+LAST_SURROGATE = 0xDFFF
+
+# Python's \w, \d and \s, as used by the identifier regexes.
+TABLES = [
+  ( 'NON_ASCII_WORD_RANGES', r'\w', 'Non-ASCII code points matched by \\w.' ),
+  ( 'NON_ASCII_DIGIT_RANGES', r'\d', 'Non-ASCII code points matched by \\d.' ),
+  ( 'NON_ASCII_SPACE_RANGES', r'\s', 'Non-ASCII code points matched by \\s.' ),
+]
+
+RANGES_PER_LINE = 3
+
+HEADER = ( '// This file is generated by update_unicode.py from the Unicode '
+           '{version}\n// database of Python {python_version}. Do not edit it '
+           'manually.' )
+
+
+def CodePointRanges( regex ):
+  ranges = []
+  for code_point in range( FIRST_NON_ASCII_CODE_POINT, LAST_CODE_POINT + 1 ):
+    if FIRST_SURROGATE <= code_point <= LAST_SURROGATE:
+      continue
+    if not regex.match( chr( code_point ) ):
+      continue
+    if ranges and ranges[ -1 ][ 1 ] == code_point - 1:
+      ranges[ -1 ][ 1 ] = code_point
+    else:
+      ranges.append( [ code_point, code_point ] )
+  return ranges
+
+
+def FormatTable( name, comment, ranges ):
+  entries = [ '{{ 0x{0:X}, 0x{1:X} }}'.format( first, last )
+              for first, last in ranges ]
+  lines = []
+  for index in range( 0, len( entries ), RANGES_PER_LINE ):
+    line = entries[ index : index + RANGES_PER_LINE ]
+    lines.append( '  ' + ''.join( '{0:<22}'.format( entry + ',' )
+                                  for entry in line ).rstrip() )
+  lines[ -1 ] = lines[ -1 ].rstrip( ',' )
+  lines.insert( 0, 'const CodePointRange {0}[] = {{'.format( name ) )
+  lines.insert( 0, '// ' + comment )
+  lines.append( '};' )
+  return '\n'.join( lines )
+
+
+def Main():
+  if sys.version_info[ 0 ] < 3:
+    sys.exit( 'update_unicode.py must be run with Python 3.' )
+
+  python_version = '.'.join( str( part ) for part in sys.version_info[ :3 ] )
+  tables = [ HEADER.format( version = unicodedata.unidata_version,
+                            python_version = python_version ) ]
+  for name, character_class, comment in TABLES:
+    regex = re.compile( character_class, re.UNICODE )
+    tables.append( FormatTable( name, comment, CodePointRanges( regex ) ) )
+
+  with open( UNICODE_TABLES_PATH, 'w' ) as tables_file:
+    tables_file.write( '\n\n'.join( tables ) + '\n' )
+
+
+if __name__ == '__main__':
+  Main()
@@ -38,11 +38,13 @@ import logging
 import json
 import argparse
 import signal
+import socket
 import os
 import base64
 
 from ycmd import extra_conf_store, user_options_store, utils
 from ycmd.hmac_plugin import HmacPlugin
+from ycmd.stdio_server import StdioServer, StdioStreams
 from ycmd.utils import ToBytes, ReadFile, OpenForStdHandle
 from ycmd.wsgi_server import StoppableWSGIServer
 
@@ -100,6 +102,13 @@ def ParseArguments():
   # Default of 0 will make the OS pick a free port for us
   parser.add_argument( '--port', type = int, default = 0,
                        help = 'server port')
+  parser.add_argument( '--unix_socket', type = str, default = None,
+                       help = 'path of a unix domain socket to listen on '
+                              'instead of --host and --port; only the user '
+                              'running the server can connect to it' )
+  parser.add_argument( '--stdio', action = 'store_true', default = False,
+                       help = 'serve requests as length-prefixed JSON messages '
+                              'on stdin and stdout instead of over HTTP' )
   parser.add_argument( '--log', type = str, default = 'info',
                        help = 'log level, one of '
                               '[debug|info|warning|error|critical]' )
@@ -116,7 +125,10 @@ def ParseArguments():
                        help = 'optional file to use for stderr' )
   parser.add_argument( '--keep_logfiles', action = 'store_true', default = None,
                        help = 'retain logfiles after the server exits' )
-  return parser.parse_args()
+  args = parser.parse_args()
+  if args.unix_socket and not hasattr( socket, 'AF_UNIX' ):
+    parser.error( '--unix_socket is not supported on this platform' )
+  return args
 
 
 def SetupLogging( log_level ):
@@ -148,6 +160,9 @@ def CloseStdin():
 def Main():
   args = ParseArguments()
 
+  # Done first so that nothing is printed into the messages.
+  stdio_streams = StdioStreams() if args.stdio else None
+
   if args.stdout is not None:
     sys.stdout = OpenForStdHandle( args.stdout )
   if args.stderr is not None:
@@ -184,12 +199,39 @@ def Main():
   atexit.register( handlers.ServerCleanup )
   handlers.app.install( WatchdogPlugin( args.idle_suicide_seconds,
                                         args.check_interval_seconds ) )
-  handlers.app.install( HmacPlugin( hmac_secret ) )
+  # The stdio streams are only shared with the client that started us, so
+  # requests don't need to be authenticated.
+  if not args.stdio:
+    handlers.app.install( HmacPlugin(
+      hmac_secret, check_host_header = not args.unix_socket ) )
   CloseStdin()
-  handlers.wsgi_server = StoppableWSGIServer( handlers.app,
-                                              host = args.host,
-                                              port = args.port,
-                                              threads = 30 )
+  if args.stdio:
+    input_stream, output_stream = stdio_streams
+    handlers.wsgi_server = StdioServer( handlers.app,
+                                        input_stream,
+                                        output_stream,
+                                        threads = 30 )
+  elif args.unix_socket:
+    # Only defined on platforms with unix domain sockets, which ParseArguments
+    # already checked.
+    from ycmd.wsgi_server import StoppableUnixWSGIServer
+    atexit.register( utils.RemoveIfExists, args.unix_socket )
+    # Create the socket without access for other users instead of relying
+    # only on the chmod done by Waitress once the socket is bound.
+    umask = os.umask( 0o177 )
+    try:
+      handlers.wsgi_server = StoppableUnixWSGIServer(
+        handlers.app,
+        unix_socket = args.unix_socket,
+        unix_socket_perms = '600',
+        threads = 30 )
+    finally:
+      os.umask( umask )
+  else:
+    handlers.wsgi_server = StoppableWSGIServer( handlers.app,
+                                                host = args.host,
+                                                port = args.port,
+                                                threads = 30 )
   handlers.wsgi_server.Run()
 
 
@@ -0,0 +1,209 @@
+# Copyright (C) 2016 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+from builtins import *  # noqa
+
+from future.utils import iteritems
+import threading
+
+from ycmd.responses import InvalidBufferEdit, UnknownBufferVersion
+from ycmd.utils import ( ByteOffsetToCodepointOffset, LINE_BREAK_REGEX,
+                         LineIndex, ToBytes )
+
+
+class _Buffer( object ):
+  def __init__( self, contents, version, generation, base_generation,
+                edited_line ):
+    self.contents = contents
+    self.version = version
+    self.generation = generation
+    self.base_generation = base_generation
+    self.edited_line = edited_line
+
+
+class BufferStore( object ):
+  """Keeps the latest contents of every buffer the client sent, so that
+  clients don't have to resend unchanged buffers with each request.
+
+  Each entry of a request's file_data is one of:
+    - the full buffer: { 'filetypes': [...], 'contents': '...' }, optionally
+      with a 'version' chosen by the client;
+    - a reference to a version sent before: { 'filetypes': [...],
+      'version': 4 };
+    - edits to a version sent before: { 'filetypes': [...], 'version': 5,
+      'base_version': 4, 'edits': [ { 'start': { 'line_num': 1,
+      'column_num': 1 }, 'end': { ... }, 'text': '...' }, ... ] }, where the
+      edits are applied in order and positions are 1-based with byte
+      columns, like everywhere else in the API. The position just past the
+      end of the buffer is line_num one past the last line and column_num 1.
+
+  A reference or edits to a version the store doesn't have (e.g. after a
+  server restart) raise UnknownBufferVersion, and edits with a position
+  outside the buffer raise InvalidBufferEdit; the client should then resend
+  the full buffer.
+
+  Only buffers sent with a 'version' are stored. Entries without one are
+  passed through unchanged and drop any stored version of their buffer, so
+  clients that always send full contents pay nothing for the store. New
+  contents of a versioned buffer, sent in full or as edits, are compared with
+  the stored ones to keep the generation of a buffer that didn't change; like
+  applying edits, that costs time proportional to the length of the buffer.
+
+  Resolved entries always have 'contents', and the ones of stored buffers also
+  carry a 'generation'. It is increased each time the contents of any buffer
+  change, so completers can use ( filepath, generation ) as a cache key for
+  data computed from a buffer. They also carry a 'base_generation' and an
+  'edited_line': the contents only differ from those of base_generation on
+  the line edited_line, or not at all when edited_line is None. This lets
+  data that doesn't depend on the line being edited survive typing on it."""
+
+  def __init__( self ):
+    self._buffers = {}
+    self._generation = 0
+    self._lock = threading.Lock()
+
+
+  def ResolveFileData( self, file_data ):
+    """Returns a copy of |file_data| where every entry has the full contents
+    of its buffer, and records those contents in the store."""
+    with self._lock:
+      return dict( ( filepath, self._ResolveEntry( filepath, entry ) )
+                   for filepath, entry in iteritems( file_data ) )
+
+
+  def Forget( self, filepath ):
+    with self._lock:
+      self._buffers.pop( filepath, None )
+
+
+  def NumBuffers( self ):
+    with self._lock:
+      return len( self._buffers )
+
+
+  def _ResolveEntry( self, filepath, entry ):
+    version = entry.get( 'version' )
+    if version is None:
+      self._buffers.pop( filepath, None )
+      return entry
+
+    stored = self._buffers.get( filepath )
+    contents, edited_line = _NewContents( filepath, entry, stored )
+
+    if stored and stored.contents == contents:
+      stored.version = version
+    else:
+      stored = self._NewBuffer( contents, version, stored, edited_line )
+      self._buffers[ filepath ] = stored
+
+    resolved = dict( ( key, value ) for key, value in iteritems( entry )
+                     if key not in ( 'edits', 'base_version' ) )
+    resolved[ 'contents' ] = contents
+    resolved[ 'generation' ] = stored.generation
+    resolved[ 'base_generation' ] = stored.base_generation
+    resolved[ 'edited_line' ] = stored.edited_line
+    return resolved
+
+
+  def _NewBuffer( self, contents, version, previous, edited_line ):
+    """Returns the buffer replacing |previous| with |contents|, which only
+    differ from the previous contents on the line |edited_line|, or anywhere
+    when it is None."""
+    self._generation += 1
+    if not previous or edited_line is None:
+      return _Buffer( contents, version, self._generation, self._generation,
+                      None )
+
+    # The contents still only differ from those of the previous base
+    # generation on one line if that's the line that was already edited.
+    if previous.edited_line in ( None, edited_line ):
+      base_generation = previous.base_generation
+    else:
+      base_generation = previous.generation
+    return _Buffer( contents, version, self._generation, base_generation,
+                    edited_line )
+
+
+def _NewContents( filepath, entry, stored ):
+  """Returns the contents of the buffer described by |entry| and the only line
+  on which they differ from the |stored| ones, or None if that line isn't
+  known."""
+  version = entry[ 'version' ]
+  if 'contents' in entry:
+    return entry[ 'contents' ], None
+
+  if stored and stored.version == version:
+    # Either a plain reference or edits the store has already applied, e.g.
+    # when the same file_data is sent with several requests.
+    return stored.contents, None
+
+  if 'edits' not in entry:
+    raise UnknownBufferVersion( filepath, version )
+
+  base_version = entry.get( 'base_version' )
+  if not stored or base_version is None or stored.version != base_version:
+    raise UnknownBufferVersion( filepath, base_version )
+
+  contents = stored.contents
+  edited_lines = set()
+  for edit in entry[ 'edits' ]:
+    contents, edited_line = _ApplyEdit( filepath, contents, edit )
+    edited_lines.add( edited_line )
+  return contents, edited_lines.pop() if len( edited_lines ) == 1 else None
+
+
+def _ApplyEdit( filepath, contents, edit ):
+  """Returns the edited contents and the line the edit was confined to, or
+  None if it may have changed several lines."""
+  lines = LineIndex( contents )
+  start = _PositionToOffset( filepath, lines, edit[ 'start' ] )
+  end = _PositionToOffset( filepath, lines, edit[ 'end' ] )
+  if start > end:
+    raise InvalidBufferEdit( filepath, 'the edit ends before it starts' )
+
+  line_num = edit[ 'start' ][ 'line_num' ]
+  if ( line_num != edit[ 'end' ][ 'line_num' ] or
+       line_num > len( lines ) or
+       LINE_BREAK_REGEX.search( edit[ 'text' ] ) ):
+    line_num = None
+  return contents[ : start ] + edit[ 'text' ] + contents[ end : ], line_num
+
+
+def _PositionToOffset( filepath, lines, position ):
+  line_num = position[ 'line_num' ]
+  column_num = position[ 'column_num' ]
+  if line_num == len( lines ) + 1 and column_num == 1:
+    return len( lines.contents )
+
+  if not 1 <= line_num <= len( lines ):
+    raise InvalidBufferEdit(
+      filepath, 'line {0} is outside of the buffer'.format( line_num ) )
+
+  line = lines[ line_num - 1 ]
+  if not 1 <= column_num <= len( ToBytes( line ) ) + 1:
+    raise InvalidBufferEdit(
+      filepath,
+      'column {0} is outside of line {1}'.format( column_num, line_num ) )
+
+  codepoint_column = ByteOffsetToCodepointOffset( line, column_num )
+  return lines.LineStartOffset( line_num - 1 ) + codepoint_column - 1
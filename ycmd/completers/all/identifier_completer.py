@@ -25,14 +25,22 @@ from builtins import *  # noqa
 
 import os
 import logging
+import queue
+import threading
 import ycm_core
 from collections import defaultdict
+from future.utils import iteritems
 from ycmd.completers.general_completer import GeneralCompleter
 from ycmd import identifier_utils
-from ycmd.utils import ToCppStringCompatible, SplitLines
+from ycmd.utils import ToCppStringCompatible, ToUnicode, SplitLines
 from ycmd import responses
 
 SYNTAX_FILENAME = 'YCM_PLACEHOLDER_FOR_SYNTAX'
+SNAPSHOT_INTERVAL_SECONDS = 300
+INGESTION_QUEUE_SIZE = 100
+# Number of recently edited files, besides the current one, whose identifiers
+# are ranked higher.
+MAX_NUM_RECENT_FILES = 5
 
 
 class IdentifierCompleter( GeneralCompleter ):
@@ -42,6 +50,42 @@ class IdentifierCompleter( GeneralCompleter ):
     self._tags_file_last_mtime = defaultdict( int )
     self._logger = logging.getLogger( __name__ )
     self._max_candidates = user_options[ 'max_num_identifier_candidates' ]
+    self._buffer_identifiers = {}
+    self._buffer_identifiers_lock = threading.Lock()
+    self._rank_by_proximity = bool(
+      user_options[ 'rank_identifiers_by_proximity' ] )
+    self._recent_filepaths = []
+    self._recent_filepaths_lock = threading.Lock()
+    self._ingestion_queue = _IngestionQueue( INGESTION_QUEUE_SIZE )
+    self._snapshot_file = user_options[ 'identifier_snapshot_file' ]
+    self._snapshot_stop_event = threading.Event()
+    self._snapshot_thread = None
+    if self._snapshot_file:
+      self._LoadSnapshot()
+      self._snapshot_thread = threading.Thread( target = self._SnapshotLoop )
+      self._snapshot_thread.daemon = True
+      self._snapshot_thread.start()
+
+
+  def _LoadSnapshot( self ):
+    if self._completer.LoadSnapshot(
+        ToCppStringCompatible( self._snapshot_file ) ):
+      self._logger.info( 'Loaded identifier snapshot from %s',
+                         self._snapshot_file )
+
+
+  def _SaveSnapshot( self ):
+    # The snapshot is only rewritten if the database changed since the last
+    # save, so calling this often is cheap.
+    if self._completer.SaveSnapshot(
+        ToCppStringCompatible( self._snapshot_file ) ):
+      self._logger.info( 'Saved identifier snapshot to %s',
+                         self._snapshot_file )
+
+
+  def _SnapshotLoop( self ):
+    while not self._snapshot_stop_event.wait( SNAPSHOT_INTERVAL_SECONDS ):
+      self._SaveSnapshot()
 
 
   def ShouldUseNow( self, request_data ):
@@ -52,11 +96,18 @@ class IdentifierCompleter( GeneralCompleter ):
     if not self.ShouldUseNow( request_data ):
       return []
 
-    completions = self._completer.CandidatesForQueryAndType(
-      ToCppStringCompatible( _SanitizeQuery( request_data[ 'query' ] ) ),
-      ToCppStringCompatible( request_data[ 'first_filetype' ] ) )
+    query = ToCppStringCompatible( _SanitizeQuery( request_data[ 'query' ] ) )
+    filetype = ToCppStringCompatible( request_data[ 'first_filetype' ] )
+    if self._rank_by_proximity:
+      completions = self._completer.CandidatesForQueryAndTypeNearFiles(
+        query,
+        filetype,
+        _ToStringVector( self._NearFilepaths( request_data[ 'filepath' ] ) ),
+        self._max_candidates )
+    else:
+      completions = self._completer.CandidatesForQueryAndType(
+        query, filetype, self._max_candidates )
 
-    completions = completions[ : self._max_candidates ]
     completions = _RemoveSmallCandidates(
       completions, self.user_options[ 'min_num_identifier_candidate_chars' ] )
 
@@ -68,6 +119,22 @@ class IdentifierCompleter( GeneralCompleter ):
     return [ ConvertCompletionData( x ) for x in completions ]
 
 
+  def _NearFilepaths( self, filepath ):
+    """Returns the current file followed by the recently edited ones, the most
+    recent first."""
+    with self._recent_filepaths_lock:
+      return [ filepath ] + [ path for path in self._recent_filepaths
+                              if path != filepath ]
+
+
+  def _AddRecentFilepath( self, filepath ):
+    with self._recent_filepaths_lock:
+      if filepath in self._recent_filepaths:
+        self._recent_filepaths.remove( filepath )
+      self._recent_filepaths.insert( 0, filepath )
+      del self._recent_filepaths[ MAX_NUM_RECENT_FILES + 1: ]
+
+
   def _AddIdentifier( self, identifier, request_data ):
     filetype = request_data[ 'first_filetype' ]
     filepath = request_data[ 'filepath' ]
@@ -77,11 +144,20 @@ class IdentifierCompleter( GeneralCompleter ):
 
     vector = ycm_core.StringVector()
     vector.append( ToCppStringCompatible( identifier ) )
-    self._logger.info( 'Adding ONE buffer identifier for file: %s', filepath )
-    self._completer.AddIdentifiersToDatabase(
-      vector,
-      ToCppStringCompatible( filetype ),
-      ToCppStringCompatible( filepath ) )
+
+    # The identifier is recorded and added to the database under the same lock
+    # as buffer updates so that an update can't remove it in between.
+    with self._buffer_identifiers_lock:
+      buffer_identifiers = self._buffer_identifiers.get( filepath )
+      if buffer_identifiers and buffer_identifiers.filetype == filetype:
+        buffer_identifiers.AddExtraIdentifier( identifier )
+
+      self._logger.info( 'Adding ONE buffer identifier for file: %s',
+                         filepath )
+      self._completer.AddIdentifiersToDatabase(
+        vector,
+        ToCppStringCompatible( filetype ),
+        ToCppStringCompatible( filepath ) )
 
 
   def _AddPreviousIdentifier( self, request_data ):
@@ -106,13 +182,42 @@ class IdentifierCompleter( GeneralCompleter ):
     collect_from_comments_and_strings = bool( self.user_options[
       'collect_identifiers_from_comments_and_strings' ] )
     text = request_data[ 'file_data' ][ filepath ][ 'contents' ]
-    self._logger.info( 'Adding buffer identifiers for file: %s', filepath )
-    self._completer.ClearForFileAndAddIdentifiersToDatabase(
-        _IdentifiersFromBuffer( text,
-                                filetype,
-                                collect_from_comments_and_strings ),
-        ToCppStringCompatible( filetype ),
-        ToCppStringCompatible( filepath ) )
+    lines = _IdentifierLinesFromBuffer( text,
+                                        collect_from_comments_and_strings )
+
+    self._AddRecentFilepath( filepath )
+
+    with self._buffer_identifiers_lock:
+      buffer_identifiers = self._buffer_identifiers.get( filepath )
+
+      # The identifiers are sent to the database in full the first time we see
+      # a buffer, and only the ones that changed afterwards.
+      if not buffer_identifiers or buffer_identifiers.filetype != filetype:
+        buffer_identifiers = _BufferIdentifiers( filetype )
+        self._buffer_identifiers[ filepath ] = buffer_identifiers
+        added, _, occurrences = buffer_identifiers.Update( lines )
+        self._logger.info( 'Adding buffer identifiers for file: %s', filepath )
+        self._completer.ClearForFileAndAddIdentifiersToDatabase(
+          _ToStringVector( added ),
+          ToCppStringCompatible( filetype ),
+          ToCppStringCompatible( filepath ) )
+      else:
+        added, removed, occurrences = buffer_identifiers.Update( lines )
+        if added or removed:
+          self._logger.info( 'Updating buffer identifiers for file: %s',
+                             filepath )
+          self._completer.UpdateIdentifiersInDatabase(
+            _ToStringVector( added ),
+            _ToStringVector( removed ),
+            ToCppStringCompatible( filetype ),
+            ToCppStringCompatible( filepath ) )
+
+      if occurrences:
+        self._completer.SetIdentifierOccurrencesInDatabase(
+          _ToStringVector( occurrences.keys() ),
+          _ToIntVector( occurrences.values() ),
+          ToCppStringCompatible( filetype ),
+          ToCppStringCompatible( filepath ) )
 
 
   def _FilterUnchangedTagFiles( self, tag_files ):
@@ -124,7 +229,8 @@ class IdentifierCompleter( GeneralCompleter ):
       last_mtime = self._tags_file_last_mtime[ tag_file ]
 
       # We don't want to repeatedly process the same file over and over; we only
-      # process if it's changed since the last time we looked at it
+      # process if it's changed since the last time we looked at it. Even then,
+      # only the identifiers of the files whose tags changed are updated.
       if current_mtime <= last_mtime:
         continue
 
@@ -158,11 +264,20 @@ class IdentifierCompleter( GeneralCompleter ):
 
   def OnFileReadyToParse( self, request_data ):
     self._AddBufferIdentifiers( request_data )
+
+    # Tag files and syntax keywords can take a while to process so they are
+    # added in the background.
     if 'tag_files' in request_data:
-      self._AddIdentifiersFromTagFiles( request_data[ 'tag_files' ] )
+      for tag_file in request_data[ 'tag_files' ]:
+        self._ingestion_queue.Add( 'tag file ' + tag_file,
+                                   self._AddIdentifiersFromTagFiles,
+                                   [ tag_file ] )
     if 'syntax_keywords' in request_data:
-      self._AddIdentifiersFromSyntax( request_data[ 'syntax_keywords' ],
-                                     request_data[ 'first_filetype' ] )
+      filetype = request_data[ 'first_filetype' ]
+      self._ingestion_queue.Add( 'syntax keywords for ' + filetype,
+                                 self._AddIdentifiersFromSyntax,
+                                 request_data[ 'syntax_keywords' ],
+                                 filetype )
 
 
   def OnInsertLeave( self, request_data ):
@@ -173,6 +288,81 @@ class IdentifierCompleter( GeneralCompleter ):
     self._AddPreviousIdentifier( request_data )
 
 
+  def IngestionDebugInfo( self ):
+    return self._ingestion_queue.DebugInfo()
+
+
+  def Shutdown( self ):
+    if not self._snapshot_thread:
+      return
+
+    self._snapshot_stop_event.set()
+    self._snapshot_thread.join()
+    self._SaveSnapshot()
+
+
+class _IngestionQueue( object ):
+  """Runs the queued tasks one at a time on a background thread. A task is
+  identified by a key: adding a task whose key is still in the queue replaces
+  its arguments instead of queuing it again. Tasks are dropped when the queue
+  is full."""
+
+  def __init__( self, max_size ):
+    self._logger = logging.getLogger( __name__ )
+    self._queue = queue.Queue( max_size )
+    self._lock = threading.Lock()
+    self._pending_tasks = {}
+    self._current_task = None
+    self._num_done_tasks = 0
+    thread = threading.Thread( target = self._Run )
+    thread.daemon = True
+    thread.start()
+
+
+  def Add( self, key, function, *args ):
+    with self._lock:
+      if key not in self._pending_tasks:
+        try:
+          self._queue.put_nowait( key )
+        except queue.Full:
+          self._logger.warning( 'Ingestion queue is full, dropping %s', key )
+          return
+      self._pending_tasks[ key ] = ( function, args )
+
+
+  def Join( self ):
+    """Only provided for tests! Blocks until all the queued tasks are done."""
+    self._queue.join()
+
+
+  def DebugInfo( self ):
+    with self._lock:
+      return ( 'Identifier ingestion:\n'
+               '  Queued tasks: {0}\n'
+               '  Done tasks: {1}\n'
+               '  Current task: {2}'.format( len( self._pending_tasks ),
+                                             self._num_done_tasks,
+                                             self._current_task or 'none' ) )
+
+
+  def _Run( self ):
+    while True:
+      key = self._queue.get()
+      with self._lock:
+        function, args = self._pending_tasks.pop( key )
+        self._current_task = key
+
+      try:
+        function( *args )
+      except Exception:
+        self._logger.exception( 'Error while processing %s', key )
+
+      with self._lock:
+        self._current_task = None
+        self._num_done_tasks += 1
+      self._queue.task_done()
+
+
 # This looks for the previous identifier and returns it; this might mean looking
 # at last identifier on the previous line if a new line has just been created.
 def _PreviousIdentifier( min_num_candidate_size_chars, request_data ):
@@ -188,8 +378,7 @@ def _PreviousIdentifier( min_num_candidate_size_chars, request_data ):
   column_num = request_data[ 'column_codepoint' ] - 1
   filepath = request_data[ 'filepath' ]
 
-  contents_per_line = (
-    SplitLines( request_data[ 'file_data' ][ filepath ][ 'contents' ] ) )
+  contents_per_line = request_data.FileLines( filepath )
 
   filetype = request_data[ 'first_filetype' ]
   ident = PreviousIdentifierOnLine( contents_per_line[ line_num ],
@@ -226,15 +415,108 @@ def _GetCursorIdentifier( request_data ):
       request_data[ 'first_filetype' ] )
 
 
-def _IdentifiersFromBuffer( text,
-                            filetype,
-                            collect_from_comments_and_strings ):
+class _BufferIdentifiers( object ):
+  """Identifiers of a buffer counted per line, so that only the lines that
+  changed since the last update need to be scanned for identifiers."""
+
+  def __init__( self, filetype ):
+    self.filetype = filetype
+    self._cpp_filetype = ToCppStringCompatible( filetype )
+    self._line_counts = defaultdict( int )
+    self._identifier_counts = defaultdict( int )
+    # Identifiers added outside of the buffer contents, e.g. the identifier
+    # under the cursor. They are removed on the next update if they are not in
+    # the buffer.
+    self._extra_identifiers = set()
+
+
+  def AddExtraIdentifier( self, identifier ):
+    if identifier not in self._identifier_counts:
+      self._extra_identifiers.add( identifier )
+
+
+  def Update( self, lines ):
+    """Updates the identifiers from the new lines of the buffer and returns
+    a tuple of the identifiers that appeared, the ones that disappeared and a
+    dict of the new number of occurrences of the identifiers whose number of
+    occurrences changed."""
+    added, removed, occurrences = self._ApplyIdentifierDeltas(
+      self._IdentifierDeltasFromLines( lines ) )
+
+    removed.extend( identifier for identifier in self._extra_identifiers
+                    if identifier not in self._identifier_counts )
+    self._extra_identifiers = set()
+    return added, removed, occurrences
+
+
+  def _IdentifierDeltasFromLines( self, lines ):
+    """Diffs the lines against the ones of the last update and returns a dict
+    of the change in the number of occurrences of each identifier found on
+    the lines that were added or removed."""
+    line_counts = defaultdict( int )
+    for line in lines:
+      line_counts[ line ] += 1
+
+    identifier_deltas = defaultdict( int )
+    for line, count in iteritems( line_counts ):
+      delta = count - self._line_counts.get( line, 0 )
+      if delta:
+        self._AddIdentifierDeltas( identifier_deltas, line, delta )
+    for line, count in iteritems( self._line_counts ):
+      if line not in line_counts:
+        self._AddIdentifierDeltas( identifier_deltas, line, -count )
+    self._line_counts = line_counts
+    return identifier_deltas
+
+
+  def _ApplyIdentifierDeltas( self, identifier_deltas ):
+    added = []
+    removed = []
+    occurrences = {}
+    for identifier, delta in iteritems( identifier_deltas ):
+      if not delta:
+        continue
+      count = self._identifier_counts.get( identifier, 0 )
+      new_count = count + delta
+      occurrences[ identifier ] = new_count
+      if new_count:
+        self._identifier_counts[ identifier ] = new_count
+      else:
+        del self._identifier_counts[ identifier ]
+
+      if not count:
+        added.append( identifier )
+      elif not new_count:
+        removed.append( identifier )
+    return added, removed, occurrences
+
+
+  def _AddIdentifierDeltas( self, identifier_deltas, line, delta ):
+    for identifier in ycm_core.ExtractIdentifiersFromText(
+        ToCppStringCompatible( line ), self._cpp_filetype ):
+      identifier_deltas[ ToUnicode( identifier ) ] += delta
+
+
+# Identifiers never span several lines, so the text left after removing the
+# comments and strings is scanned line by line.
+def _IdentifierLinesFromBuffer( text, collect_from_comments_and_strings ):
   if not collect_from_comments_and_strings:
-    text = identifier_utils.RemoveIdentifierFreeText( text )
-  idents = identifier_utils.ExtractIdentifiersFromText( text, filetype )
+    text = ToUnicode( ycm_core.RemoveIdentifierFreeText(
+      ToCppStringCompatible( text ) ) )
+  return SplitLines( text )
+
+
+def _ToStringVector( identifiers ):
   vector = ycm_core.StringVector()
-  for ident in idents:
-    vector.append( ToCppStringCompatible( ident ) )
+  for identifier in identifiers:
+    vector.append( ToCppStringCompatible( identifier ) )
+  return vector
+
+
+def _ToIntVector( integers ):
+  vector = ycm_core.IntVector()
+  for integer in integers:
+    vector.append( integer )
   return vector
 
 
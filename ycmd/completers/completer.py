@@ -158,7 +158,10 @@ class Completer( with_metaclass( abc.ABCMeta, object ) ):
             user_trigger_map = user_options[ 'semantic_triggers' ],
             filetype_set = set( self.SupportedFiletypes() ) )
         if user_options[ 'auto_trigger' ] else None )
-    self._completions_cache = CompletionsCache()
+    self._completions_cache = CompletionsCache(
+        max_entries = user_options[ 'max_num_completions_cache_entries' ],
+        max_candidates = user_options[
+          'max_num_completions_cache_candidates' ] )
 
 
   def CompletionType( self, request_data ):
@@ -169,16 +172,14 @@ class Completer( with_metaclass( abc.ABCMeta, object ) ):
   # version of it.
   def ShouldUseNow( self, request_data ):
     if not self.ShouldUseNowInner( request_data ):
-      self._completions_cache.Invalidate()
+      self._completions_cache.InvalidateLocation( request_data )
       return False
 
     # We have to do the cache valid check and get the completions as part of one
     # call because we have to ensure a different thread doesn't change the cache
     # data.
     cache_completions = self._completions_cache.GetCompletionsIfCacheValid(
-        request_data[ 'line_num' ],
-        request_data[ 'start_column' ],
-        self.CompletionType( request_data ) )
+        request_data, self.CompletionType( request_data ) )
 
     # If None, then the cache isn't valid and we know we should return true
     if cache_completions is None:
@@ -217,29 +218,43 @@ class Completer( with_metaclass( abc.ABCMeta, object ) ):
 
     candidates = self._GetCandidatesFromSubclass( request_data )
     if request_data[ 'query' ]:
-      candidates = self.FilterAndSortCandidates( candidates,
-                                                 request_data[ 'query' ] )
+      candidates = self._FilterAndSortCachedCandidates( candidates,
+                                                        request_data )
     return candidates
 
 
   def _GetCandidatesFromSubclass( self, request_data ):
+    completion_type = self.CompletionType( request_data )
     cache_completions = self._completions_cache.GetCompletionsIfCacheValid(
-          request_data[ 'line_num' ],
-          request_data[ 'start_column' ],
-          self.CompletionType( request_data ) )
+          request_data, completion_type )
 
     if cache_completions:
       return cache_completions
     else:
       raw_completions = self.ComputeCandidatesInner( request_data )
       self._completions_cache.Update(
-          request_data[ 'line_num' ],
-          request_data[ 'start_column' ],
-          self.CompletionType( request_data ),
-          raw_completions )
+          request_data, completion_type, raw_completions )
       return raw_completions
 
 
+  def _FilterAndSortCachedCandidates( self, candidates, request_data ):
+    query = request_data[ 'query' ]
+    completion_type = self.CompletionType( request_data )
+
+    # If the previous query for the same completion location is a subsequence of
+    # the current one, we only need to filter the results of that query.
+    cached_candidates = (
+      self._completions_cache.GetCandidatesToFilterIfCacheValid(
+        request_data, completion_type, query ) )
+    if cached_candidates is not None:
+      candidates = cached_candidates
+
+    filtered_candidates = self.FilterAndSortCandidates( candidates, query )
+    self._completions_cache.UpdateFilteredCompletions(
+        request_data, completion_type, query, filtered_candidates )
+    return filtered_candidates
+
+
   def ComputeCandidatesInner( self, request_data ):
     pass # pragma: no cover
 
@@ -282,7 +297,7 @@ class Completer( with_metaclass( abc.ABCMeta, object ) ):
       return 'This Completer has no supported subcommands.'
 
 
-  def FilterAndSortCandidates( self, candidates, query ):
+  def FilterAndSortCandidates( self, candidates, query, max_results = 0 ):
     if not candidates:
       return []
 
@@ -298,12 +313,14 @@ class Completer( with_metaclass( abc.ABCMeta, object ) ):
       elif 'insertion_text' in candidates[ 0 ]:
         sort_property = 'insertion_text'
 
-    return self.FilterAndSortCandidatesInner( candidates, sort_property, query )
+    return self.FilterAndSortCandidatesInner( candidates, sort_property, query,
+                                              max_results )
 
 
-  def FilterAndSortCandidatesInner( self, candidates, sort_property, query ):
+  def FilterAndSortCandidatesInner( self, candidates, sort_property, query,
+                                    max_results = 0 ):
     return completer_utils.FilterAndSortCandidatesWrap(
-      candidates, sort_property, query )
+      candidates, sort_property, query, max_results )
 
 
   def OnFileReadyToParse( self, request_data ):
@@ -367,6 +384,20 @@ class Completer( with_metaclass( abc.ABCMeta, object ) ):
     return ''
 
 
+  def CompletionsCacheDebugInfo( self ):
+    cache = self._completions_cache
+    num_entries, num_candidates = cache.Size()
+    hits, misses = cache.QueryNarrowingStatistics()
+    return ( 'Completions cache:\n'
+             '  Cached locations: {0}\n'
+             '  Cached candidates: {1}\n'
+             '  Query narrowing hits: {2}\n'
+             '  Query narrowing misses: {3}'.format( num_entries,
+                                                     num_candidates,
+                                                     hits,
+                                                     misses ) )
+
+
   def Shutdown( self ):
     pass # pragma: no cover
 
@@ -382,43 +413,166 @@ class Completer( with_metaclass( abc.ABCMeta, object ) ):
 
 
 class CompletionsCache( object ):
-  """Completions for a particular request. Importantly, columns are byte
-  offsets, not unicode codepoints."""
-
-  def __init__( self ):
+  """Least recently used cache of the completions computed for the most recent
+  completion locations. A location is made of the file, the line and the start
+  column of the completion, the completion type, and a fingerprint of the buffer
+  contents outside of the completion line; editing the buffer anywhere else
+  therefore invalidates the cached completions. Importantly, columns are byte
+  offsets, not unicode codepoints.
+
+  The cache holds at most |max_entries| locations. When the total number of
+  cached candidates exceeds |max_candidates| (if non-zero), the least recently
+  used locations are evicted; the most recent location is always kept.
+
+  Along with the raw completions, each entry keeps the filtered completions for
+  the last query. When the next query extends that query, only those are
+  filtered again."""
+
+  def __init__( self, max_entries, max_candidates ):
     self._access_lock = threading.Lock()
+    self._max_entries = max( max_entries, 1 )
+    self._max_candidates = max_candidates
+    self._query_narrowing_hits = 0
+    self._query_narrowing_misses = 0
     self.Invalidate()
 
 
   def Invalidate( self ):
     with self._access_lock:
-      self._line_num = None
-      self._start_column = None
-      self._completion_type = None
-      self._completions = None
+      self._entries = {}
+      # Keys of the entries, from least to most recently used.
+      self._lru_keys = []
+      self._num_candidates = 0
+
+
+  def InvalidateLocation( self, request_data ):
+    """Removes the entries for the completion location of |request_data|,
+    whatever their completion type."""
+    location = _CacheLocation( request_data )
+    with self._access_lock:
+      for key in list( self._lru_keys ):
+        if key[ : len( location ) ] == location:
+          self._RemoveNoLock( key )
 
 
-  # start_column is a byte offset.
-  def Update( self, line_num, start_column, completion_type, completions ):
+  def Update( self, request_data, completion_type, completions ):
+    key = _CacheKey( request_data, completion_type )
     with self._access_lock:
-      self._line_num = line_num
-      self._start_column = start_column
-      self._completion_type = completion_type
-      self._completions = completions
+      if key in self._entries:
+        self._RemoveNoLock( key )
 
+      entry = _CompletionsCacheEntry( completions )
+      self._entries[ key ] = entry
+      self._lru_keys.append( key )
+      self._num_candidates += entry.num_candidates
+      self._EvictNoLock()
 
-  # start_column is a byte offset.
-  def GetCompletionsIfCacheValid( self, line_num, start_column,
-                                  completion_type ):
+
+  def UpdateFilteredCompletions( self, request_data, completion_type, query,
+                                 filtered_completions ):
+    key = _CacheKey( request_data, completion_type )
+    with self._access_lock:
+      entry = self._GetEntryNoLock( key )
+      if entry is None:
+        return
+      entry.query = query
+      entry.filtered_completions = filtered_completions
+
+
+  def GetCompletionsIfCacheValid( self, request_data, completion_type ):
+    key = _CacheKey( request_data, completion_type )
+    with self._access_lock:
+      entry = self._GetEntryNoLock( key )
+      if entry is None:
+        return None
+      return entry.completions
+
+
+  def GetCandidatesToFilterIfCacheValid( self, request_data, completion_type,
+                                         query ):
+    """Returns the smallest list of cached completions that contains all the
+    matches for |query|: the filtered completions of the previous query if
+    |query| extends it, the raw completions otherwise. Returns None if the cache
+    isn't valid."""
+    key = _CacheKey( request_data, completion_type )
     with self._access_lock:
-      if not self._CacheValidNoLock( line_num, start_column,
-                                     completion_type ):
+      entry = self._GetEntryNoLock( key )
+      if entry is None:
         return None
-      return self._completions
+
+      if ( entry.query is not None and
+           _IsSubsequence( entry.query, query ) ):
+        self._query_narrowing_hits += 1
+        return entry.filtered_completions
+
+      self._query_narrowing_misses += 1
+      return entry.completions
+
+
+  def QueryNarrowingStatistics( self ):
+    with self._access_lock:
+      return self._query_narrowing_hits, self._query_narrowing_misses
+
+
+  def Size( self ):
+    """Returns the number of cached locations and the total number of cached
+    candidates."""
+    with self._access_lock:
+      return len( self._entries ), self._num_candidates
+
+
+  def _GetEntryNoLock( self, key ):
+    entry = self._entries.get( key )
+    if entry is not None and self._lru_keys[ -1 ] != key:
+      self._lru_keys.remove( key )
+      self._lru_keys.append( key )
+    return entry
+
+
+  def _RemoveNoLock( self, key ):
+    entry = self._entries.pop( key )
+    self._lru_keys.remove( key )
+    self._num_candidates -= entry.num_candidates
+
+
+  def _EvictNoLock( self ):
+    while len( self._lru_keys ) > 1 and (
+        len( self._lru_keys ) > self._max_entries or
+        ( self._max_candidates and
+          self._num_candidates > self._max_candidates ) ):
+      self._RemoveNoLock( self._lru_keys[ 0 ] )
+
+
+class _CompletionsCacheEntry( object ):
+  def __init__( self, completions ):
+    self.completions = completions
+    self.num_candidates = _NumCandidates( completions )
+    self.query = None
+    self.filtered_completions = None
+
+
+def _NumCandidates( completions ):
+  # Omnifunc completers may return a dictionary with the candidates stored in
+  # its 'words' entry.
+  if isinstance( completions, dict ):
+    completions = completions.get( 'words' )
+  return len( completions ) if completions else 0
+
+
+# start_column is a byte offset.
+def _CacheLocation( request_data ):
+  return ( request_data[ 'filepath' ],
+           request_data[ 'line_num' ],
+           request_data[ 'start_column' ] )
+
+
+def _CacheKey( request_data, completion_type ):
+  return _CacheLocation( request_data ) + (
+    completion_type, request_data[ 'buffer_fingerprint' ] )
 
 
-  # start_column is a byte offset.
-  def _CacheValidNoLock( self, line_num, start_column, completion_type ):
-    return ( line_num == self._line_num and
-             start_column == self._start_column and
-             completion_type == self._completion_type )
+def _IsSubsequence( subsequence, text ):
+  """Returns True if the characters of |subsequence| appear in |text| in the
+  same order. Any candidate matching |text| then also matches |subsequence|."""
+  characters = iter( text )
+  return all( character in characters for character in subsequence )
@@ -28,9 +28,8 @@ from future.utils import iteritems
 # We don't want ycm_core inside Vim.
 import os
 import re
-import copy
 from collections import defaultdict
-from ycmd.utils import ToCppStringCompatible, ToUnicode, ReadFile
+from ycmd.utils import ToCppStringCompatible, ToUnicode
 
 
 class PreparedTriggers( object ):
@@ -169,74 +168,26 @@ def FiletypeCompleterExistsForFiletype( filetype ):
   return os.path.exists( PathToFiletypeCompleterPluginLoader( filetype ) )
 
 
-def FilterAndSortCandidatesWrap( candidates, sort_property, query ):
+def FilterAndSortCandidatesWrap( candidates, sort_property, query,
+                                 max_results = 0 ):
   from ycm_core import FilterAndSortCandidates
 
-  # The c++ interface we use only understands the (*native*) 'str' type (i.e.
-  # not the 'str' type from python-future. If we pass it a 'unicode' or
-  # 'bytes' instance then various things blow up, such as converting to
-  # std::string. Therefore all strings passed into the c++ API must pass through
-  # ToCppStringCompatible (or more strictly all strings which the C++ code
-  # needs to use and convert. In this case, just the insertion text property)
-
-  # FIXME: This is actually quite inefficient in an area which is used
-  # constantly and the key performance critical part of the system. There is
-  # code in the C++ layer (see PythonSupport.cpp:GetUtf8String) which attempts
-  # to work around this limitation. Unfortunately it has issues which cause the
-  # above problems, and we work around it by converting here in the python
-  # layer until we can come up with a better solution in the C++ layer.
-
-  # Note: we must deep copy candidates because we do not want to clobber the
-  # data that is passed in. It is actually used directly by the cache, so if
-  # we change the data pointed to by the elements of candidates, then this will
-  # be reflected in a subsequent response from the cache. This is particularly
-  # important for those candidates which are *not* returned after the filter, as
-  # they are not converted back to unicode.
-  cpp_compatible_candidates = _ConvertCandidatesToCppCompatible(
-    copy.deepcopy( candidates ),
-    sort_property )
-
-  # However, the reset of the python layer expects all the candidates properties
-  # to be some form of unicode string - a python-future str() instance.
-  # So we need to convert the insertion text property back to a unicode string
-  # before returning it.
-  filtered_candidates = FilterAndSortCandidates(
-    cpp_compatible_candidates,
-    ToCppStringCompatible( sort_property ),
-    ToCppStringCompatible( query ) )
-
-  return _ConvertCandidatesToPythonCompatible( filtered_candidates,
-                                               sort_property )
-
-
-def _ConvertCandidatesToCppCompatible( candidates, sort_property ):
-  """Convert the candidates to the format expected by the C++ layer."""
-  return _ConvertCandidates( candidates, sort_property, ToCppStringCompatible )
-
-
-def _ConvertCandidatesToPythonCompatible( candidates, sort_property ):
-  """Convert the candidates to the format expected by the python layer."""
-  return _ConvertCandidates( candidates, sort_property, ToUnicode )
-
-
-def _ConvertCandidates( candidates, sort_property, converter ):
-  """Apply the conversion function |converter| to the logical insertion text
-  field within the candidates in the candidate list |candidates|. The
-  |sort_property| is required to determine the format of |candidates|.
-
-  The conversion function should take a single argument (the string) and return
-  the converted string. It should be one of ycmd.utils.ToUnicode or
-  ycmd.utils.ToCppStringCompatible.
-
-  Typically this method is not called directly, rather it is used via
-  _ConvertCandidatesToCppCompatible and _ConvertCandidatesToPythonCompatible."""
-
-  if sort_property:
-    for candidate in candidates:
-      candidate[ sort_property ] = converter( candidate[ sort_property ] )
-    return candidates
-
-  return [ converter( c ) for c in candidates ]
+  # The C++ layer reads the sort property directly from the candidates and
+  # handles both unicode and bytes values (see
+  # PythonSupport.cpp:GetUtf8String), so we don't need to copy or convert the
+  # candidates here. The returned list contains the original candidate objects,
+  # which is important because the list passed in is also held by the
+  # completions cache.
+  #
+  # The sort property and query are still passed through ToCppStringCompatible
+  # because the C++ interface takes them as std::string arguments.
+  #
+  # When max_results is not 0, only the best max_results candidates are
+  # selected and sorted by the C++ layer.
+  return FilterAndSortCandidates( candidates,
+                                  ToCppStringCompatible( sort_property ),
+                                  ToCppStringCompatible( query ),
+                                  max_results )
 
 
 TRIGGER_REGEX_PREFIX = 're!'
@@ -296,16 +247,3 @@ def GetIncludeStatementValue( line, check_closing = True ):
       if close_char_pos != -1:
         include_value = line[ match.end() : close_char_pos ]
   return include_value, quoted_include
-
-
-def GetFileContents( request_data, filename ):
-  """Returns the contents of the absolute path |filename| as a unicode
-  string. If the file contents exist in |request_data| (i.e. it is open and
-  potentially modified/dirty in the user's editor), then it is returned,
-  otherwise the file is read from disk (assuming a UTF-8 encoding) and its
-  contents returned."""
-  file_data = request_data[ 'file_data' ]
-  if filename in file_data:
-    return ToUnicode( file_data[ filename ][ 'contents' ] )
-
-  return ToUnicode( ReadFile( filename ) )
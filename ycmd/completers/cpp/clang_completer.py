@@ -60,6 +60,9 @@ class ClangCompleter( Completer ):
     self._flags = Flags()
     self._diagnostic_store = None
     self._files_being_compiled = EphemeralValuesSet()
+    # Maps each filename to the ( generation, UnsavedFile ) last built for it,
+    # so that unchanged buffers aren't encoded again for every request.
+    self._unsaved_files = {}
 
 
   def SupportedFiletypes( self ):
@@ -75,12 +78,20 @@ class ClangCompleter( Completer ):
       if not contents or not filename:
         continue
 
+      generation = file_data.get( 'generation' )
+      cached = self._unsaved_files.get( filename )
+      if generation is not None and cached and cached[ 0 ] == generation:
+        files.append( cached[ 1 ] )
+        continue
+
       unsaved_file = ycm_core.UnsavedFile()
       utf8_contents = ToCppStringCompatible( contents )
       unsaved_file.contents_ = utf8_contents
       unsaved_file.length_ = len( utf8_contents )
       unsaved_file.filename_ = ToCppStringCompatible( filename )
 
+      if generation is not None:
+        self._unsaved_files[ filename ] = ( generation, unsaved_file )
       files.append( unsaved_file )
     return files
 
@@ -337,6 +348,7 @@ class ClangCompleter( Completer ):
 
 
   def OnBufferUnload( self, request_data ):
+    self._unsaved_files.pop( request_data[ 'filepath' ], None )
     self._completer.DeleteCachesForFile(
         ToCppStringCompatible( request_data[ 'filepath' ] ) )
 
@@ -32,7 +32,6 @@ from ycmd.completers.completer import Completer
 from ycmd.utils import ForceSemanticCompletion, CodepointOffsetToByteOffset
 from ycmd import responses
 from ycmd import utils
-from ycmd.completers.completer_utils import GetFileContents
 import requests
 import urllib.parse
 import logging
@@ -124,11 +123,13 @@ class CsharpCompleter( Completer ):
                                                    completion_type ) ]
 
 
-  def FilterAndSortCandidates( self, candidates, query ):
+  def FilterAndSortCandidates( self, candidates, query, max_results = 0 ):
+    # Completions requiring an import are moved to the end, so the results are
+    # only truncated once they are in their final order.
     result = super( CsharpCompleter, self ).FilterAndSortCandidates( candidates,
                                                                      query )
     result.sort( key = _CompleteIsFromImport )
-    return result
+    return result[ : max_results ] if max_results else result
 
 
   def GetSubcommandsMap( self ):
@@ -655,8 +656,9 @@ def _BuildChunks( request_data, new_buffer ):
 
   replacement_text = new_buffer[ start_index : new_length - end_index ]
 
-  ( start_line, start_column ) = _IndexToLineColumn( old_buffer, start_index )
-  ( end_line, end_column ) = _IndexToLineColumn( old_buffer,
+  old_lines = utils.LineIndex( old_buffer )
+  ( start_line, start_column ) = _IndexToLineColumn( old_lines, start_index )
+  ( end_line, end_column ) = _IndexToLineColumn( old_lines,
                                                  old_length - end_index )
 
   # No need for _BuildLocation, because _IndexToLineColumn already converted
@@ -679,25 +681,23 @@ def _FixLineEndings( old_buffer, new_buffer ):
   return new_buffer
 
 
-# Adapted from http://stackoverflow.com/a/24495900
-def _IndexToLineColumn( text, index ):
-  """Get 1-based (line_number, col) of `index` in `string`, where string is a
-  unicode string and col is a byte offset."""
-  lines = text.splitlines( True )
-  curr_pos = 0
-  for linenum, line in enumerate( lines ):
-    if curr_pos + len( line ) > index:
-      return ( linenum + 1,
-               CodepointOffsetToByteOffset( line, index - curr_pos + 1 ) )
-    curr_pos += len( line )
-  assert False
+def _IndexToLineColumn( lines, index ):
+  """Get 1-based (line_number, col) of `index` in the contents of the LineIndex
+  `lines`, where index is a codepoint offset and col is a byte offset."""
+  assert 0 <= index < len( lines.contents )
+  line_index = lines.LineIndexForOffset( index )
+  line_start = lines.LineStartOffset( line_index )
+  # Slice the contents rather than the line so that an index on a line break
+  # is counted the same way as any other character.
+  return ( line_index + 1,
+           CodepointOffsetToByteOffset( lines.contents[ line_start : index ],
+                                        index - line_start + 1 ) )
 
 
 def _BuildLocation( request_data, filename, line_num, column_num ):
   if line_num <= 0 or column_num <= 0:
     return None
-  contents = utils.SplitLines( GetFileContents( request_data, filename ) )
-  line_value = contents[ line_num - 1 ]
+  line_value = request_data.FileLines( filename )[ line_num - 1 ]
   return responses.Location(
       line_num,
       CodepointOffsetToByteOffset( line_value, column_num ),
@@ -32,7 +32,6 @@ import threading
 from subprocess import PIPE
 from ycmd import utils, responses
 from ycmd.completers.completer import Completer
-from ycmd.completers.completer_utils import GetFileContents
 
 _logger = logging.getLogger( __name__ )
 
@@ -528,7 +527,7 @@ class TernCompleter( Completer ):
     filepath = self._ServerPathToAbsolute( response[ 'file' ] )
     return responses.BuildGoToResponseFromLocation(
       _BuildLocation(
-        utils.SplitLines( GetFileContents( request_data, filepath ) ),
+        request_data.FileLines( filepath ),
         filepath,
         response[ 'start' ][ 'line' ],
         response[ 'start' ][ 'ch' ] ) )
@@ -547,7 +546,7 @@ class TernCompleter( Completer ):
       filepath = self._ServerPathToAbsolute( ref[ 'file' ] )
       return responses.BuildGoToResponseFromLocation(
         _BuildLocation(
-          utils.SplitLines( GetFileContents( request_data, filepath ) ),
+          request_data.FileLines( filepath ),
           filepath,
           ref[ 'start' ][ 'line' ],
           ref[ 'start' ][ 'ch' ] ) )
@@ -630,8 +629,7 @@ class TernCompleter( Completer ):
 
     def BuildFixItChunk( change ):
       filepath = self._ServerPathToAbsolute( change[ 'file' ] )
-      file_contents = utils.SplitLines(
-        GetFileContents( request_data, filepath ) )
+      file_contents = request_data.FileLines( filepath )
       return responses.FixItChunk(
         change[ 'text' ],
         BuildRange( file_contents,
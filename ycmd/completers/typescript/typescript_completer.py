@@ -37,7 +37,6 @@ from tempfile import NamedTemporaryFile
 from ycmd import responses
 from ycmd import utils
 from ycmd.completers.completer import Completer
-from ycmd.completers.completer_utils import GetFileContents
 
 BINARY_NOT_FOUND_MESSAGE = ( 'TSServer not found. '
                              'TypeScript 1.5 or higher is required.' )
@@ -393,8 +392,7 @@ class TypeScriptCompleter( Completer ):
 
       span = filespans[ 0 ]
       return responses.BuildGoToResponseFromLocation(
-        _BuildLocation( utils.SplitLines( GetFileContents( request_data,
-                                                           span[ 'file' ] ) ),
+        _BuildLocation( request_data.FileLines( span[ 'file' ] ),
                         span[ 'file' ],
                         span[ 'start' ][ 'line' ],
                         span[ 'start' ][ 'offset' ] ) )
@@ -411,8 +409,7 @@ class TypeScriptCompleter( Completer ):
     } )
     return [
       responses.BuildGoToResponseFromLocation(
-        _BuildLocation( utils.SplitLines( GetFileContents( request_data,
-                                                           ref[ 'file' ] ) ),
+        _BuildLocation( request_data.FileLines( ref[ 'file' ] ),
                         ref[ 'file' ],
                         ref[ 'start' ][ 'line' ],
                         ref[ 'start' ][ 'offset' ] ),
@@ -640,7 +637,7 @@ def _BuildFixItChunksForFile( request_data, new_name, file_replacement ):
   # whereas all other paths in Python are of the C:\\blah\\blah form. We use
   # normpath to have python do the conversion for us.
   file_path = os.path.normpath( file_replacement[ 'file' ] )
-  file_contents = utils.SplitLines( GetFileContents( request_data, file_path ) )
+  file_contents = request_data.FileLines( file_path )
   return [ _BuildFixItChunkForRange( new_name, file_contents, file_path, r )
            for r in file_replacement[ 'locs' ] ]
 
@@ -0,0 +1,129 @@
+# Copyright (C) 2016 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+from builtins import *  # noqa
+
+import zlib
+
+# Content encodings ycmd understands, in order of preference. 'deflate' (the
+# zlib format) is the faster one: it has a smaller header and trailer than gzip
+# and uses an Adler-32 instead of a CRC-32 checksum.
+SUPPORTED_ENCODINGS = [ 'deflate', 'gzip' ]
+
+# Responses smaller than this aren't worth the time it takes to compress them.
+MIN_COMPRESSED_RESPONSE_SIZE = 16 * 1024
+
+# Payloads are mostly source code and JSON, which compress well even at the
+# fastest level.
+COMPRESSION_LEVEL = 1
+
+# Makes zlib read and write the gzip format.
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+DECOMPRESSION_WBITS = {
+  'deflate': zlib.MAX_WBITS,
+  'gzip': GZIP_WBITS,
+}
+
+
+class UnsupportedEncoding( ValueError ):
+  def __init__( self, encoding ):
+    super( UnsupportedEncoding, self ).__init__(
+      'Unsupported content encoding: {0}'.format( encoding ) )
+
+
+class DecompressedDataTooLarge( ValueError ):
+  def __init__( self, max_size ):
+    super( DecompressedDataTooLarge, self ).__init__(
+      'Decompressed data larger than {0} bytes'.format( max_size ) )
+
+
+def Compress( data, encoding ):
+  """Compresses the bytes |data| with the content |encoding|."""
+  if encoding == 'identity':
+    return data
+  if encoding == 'deflate':
+    return zlib.compress( data, COMPRESSION_LEVEL )
+  if encoding == 'gzip':
+    compressor = zlib.compressobj( COMPRESSION_LEVEL, zlib.DEFLATED,
+                                   GZIP_WBITS )
+    return compressor.compress( data ) + compressor.flush()
+  raise UnsupportedEncoding( encoding )
+
+
+def Decompress( data, encoding, max_size = None ):
+  """Decompresses the bytes |data| sent with the content |encoding|. Raises
+  zlib.error if they are corrupt and DecompressedDataTooLarge if they expand
+  to more than |max_size| bytes; decompression stops as soon as that size is
+  reached, so a small body can't be inflated to exhaust memory."""
+  if encoding == 'identity':
+    return data
+  if encoding not in DECOMPRESSION_WBITS:
+    raise UnsupportedEncoding( encoding )
+
+  decompressor = zlib.decompressobj( DECOMPRESSION_WBITS[ encoding ] )
+  if max_size is None:
+    decompressed = decompressor.decompress( data ) + decompressor.flush()
+  else:
+    decompressed = decompressor.decompress( data, max_size )
+    if decompressor.unconsumed_tail:
+      raise DecompressedDataTooLarge( max_size )
+    decompressed += decompressor.flush()
+    if len( decompressed ) > max_size:
+      raise DecompressedDataTooLarge( max_size )
+
+  # Unlike zlib.decompress, decompression objects don't complain about a
+  # truncated stream. The eof attribute only exists on Python 3.
+  if not getattr( decompressor, 'eof', True ):
+    raise zlib.error( 'Incomplete or truncated stream' )
+  return decompressed
+
+
+def NegotiateEncoding( accept_encoding ):
+  """Returns the first of SUPPORTED_ENCODINGS accepted by the |accept_encoding|
+  header value (e.g. 'gzip, deflate;q=0.5'), or None if the client accepts
+  none of them. Encodings refused with q=0 are not accepted through '*'."""
+  accepted = set()
+  refused = set()
+  for item in accept_encoding.split( ',' ):
+    parameters = [ parameter.strip() for parameter in item.split( ';' ) ]
+    encoding = parameters[ 0 ].lower()
+    quality = 1.0
+    for parameter in parameters[ 1: ]:
+      if parameter.startswith( 'q=' ):
+        try:
+          quality = float( parameter[ 2: ] )
+        except ValueError:
+          quality = 0.0
+    if quality > 0:
+      accepted.add( encoding )
+    else:
+      refused.add( encoding )
+
+  if '*' in accepted:
+    accepted.update( set( SUPPORTED_ENCODINGS ) - refused )
+
+  for encoding in SUPPORTED_ENCODINGS:
+    if encoding in accepted:
+      return encoding
+  return None
@@ -24,18 +24,20 @@ standard_library.install_aliases()
 from builtins import *  # noqa
 
 import bottle
-import json
 import logging
 import time
 import traceback
+import zlib
 from bottle import request
 from threading import Thread
 
 import ycm_core
-from ycmd import extra_conf_store, hmac_plugin, server_state, user_options_store
+from ycmd import ( compression_utils, extra_conf_store, hmac_plugin,
+                   json_utils, server_state, user_options_store )
 from ycmd.responses import BuildExceptionResponse, BuildCompletionResponse
 from ycmd.request_wrap import RequestWrap
 from ycmd.bottle_utils import SetResponseHeader
+from ycmd.utils import ToBytes
 from ycmd.completers.completer_utils import FilterAndSortCandidatesWrap
 
 
@@ -43,6 +45,11 @@ from ycmd.completers.completer_utils import FilterAndSortCandidatesWrap
 # size is less than this
 bottle.Request.MEMFILE_MAX = 10 * 1024 * 1024
 
+# Responses are only compressed for clients that ask for it with this header
+# rather than the standard Accept-Encoding, which many HTTP libraries send by
+# default while hiding the compressed bytes the HMAC is computed over.
+_ACCEPT_ENCODING_HEADER = 'x-ycm-accept-encoding'
+
 _server_state = None
 _hmac_secret = bytes()
 _logger = logging.getLogger( __name__ )
@@ -53,7 +60,7 @@ wsgi_server = None
 @app.post( '/event_notification' )
 def EventNotification():
   _logger.info( 'Received event notification' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap()
   event_name = request_data[ 'event_name' ]
   _logger.debug( 'Event name: %s', event_name )
 
@@ -66,6 +73,9 @@ def EventNotification():
     response_data = getattr( _server_state.GetFiletypeCompleter( filetypes ),
                              event_handler )( request_data )
 
+  if event_name == 'BufferUnload':
+    _server_state.buffer_store.Forget( request_data[ 'filepath' ] )
+
   if response_data:
     return _JsonResponse( response_data )
   return _JsonResponse( {} )
@@ -74,7 +84,7 @@ def EventNotification():
 @app.post( '/run_completer_command' )
 def RunCompleterCommand():
   _logger.info( 'Received command request' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap()
   completer = _GetCompleterForRequestData( request_data )
 
   return _JsonResponse( completer.OnUserCommand(
@@ -85,7 +95,7 @@ def RunCompleterCommand():
 @app.post( '/completions' )
 def GetCompletions():
   _logger.info( 'Received completion request' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap()
   ( do_filetype_completion, forced_filetype_completion ) = (
                     _server_state.ShouldUseFiletypeCompleter( request_data ) )
   _logger.debug( 'Using filetype completion: %s', do_filetype_completion )
@@ -127,12 +137,13 @@ def FilterAndSortCandidates():
   _logger.info( 'Received filter & sort request' )
   # Not using RequestWrap because no need and the requests coming in aren't like
   # the usual requests we handle.
-  request_data = request.json
+  request_data = _RequestJson()
 
   return _JsonResponse( FilterAndSortCandidatesWrap(
     request_data[ 'candidates'],
     request_data[ 'sort_property' ],
-    request_data[ 'query' ] ) )
+    request_data[ 'query' ],
+    request_data.get( 'max_results', 0 ) ) )
 
 
 @app.get( '/healthy' )
@@ -164,13 +175,13 @@ def _IsSubserverReady( filetype ):
 def FiletypeCompletionAvailable():
   _logger.info( 'Received filetype completion available request' )
   return _JsonResponse( _server_state.FiletypeCompletionAvailable(
-      RequestWrap( request.json )[ 'filetypes' ] ) )
+      _RequestWrap()[ 'filetypes' ] ) )
 
 
 @app.post( '/defined_subcommands' )
 def DefinedSubcommands():
   _logger.info( 'Received defined subcommands request' )
-  completer = _GetCompleterForRequestData( RequestWrap( request.json ) )
+  completer = _GetCompleterForRequestData( _RequestWrap() )
 
   return _JsonResponse( completer.DefinedSubcommands() )
 
@@ -178,7 +189,7 @@ def DefinedSubcommands():
 @app.post( '/detailed_diagnostic' )
 def GetDetailedDiagnostic():
   _logger.info( 'Received detailed diagnostic request' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap()
   completer = _GetCompleterForRequestData( request_data )
 
   return _JsonResponse( completer.GetDetailedDiagnostic( request_data ) )
@@ -187,7 +198,7 @@ def GetDetailedDiagnostic():
 @app.post( '/load_extra_conf_file' )
 def LoadExtraConfFile():
   _logger.info( 'Received extra conf load request' )
-  request_data = RequestWrap( request.json, validate = False )
+  request_data = RequestWrap( _RequestJson(), validate = False )
   extra_conf_store.Load( request_data[ 'filepath' ], force = True )
 
   return _JsonResponse( True )
@@ -196,7 +207,7 @@ def LoadExtraConfFile():
 @app.post( '/ignore_extra_conf_file' )
 def IgnoreExtraConfFile():
   _logger.info( 'Received extra conf ignore request' )
-  request_data = RequestWrap( request.json, validate = False )
+  request_data = RequestWrap( _RequestJson(), validate = False )
   extra_conf_store.Disable( request_data[ 'filepath' ] )
 
   return _JsonResponse( True )
@@ -214,10 +225,21 @@ def DebugInfo():
   if has_clang_support:
     output.append( 'Clang version: ' + ycm_core.ClangVersion() )
 
-  request_data = RequestWrap( request.json )
+  output.append( 'Candidate repository:\n'
+                 '  Stored candidates: {0}\n'
+                 '  Estimated size: {1} bytes'.format(
+                   ycm_core.NumStoredCandidates(),
+                   ycm_core.NumStoredCandidateBytes() ) )
+
+  identifier_completer = (
+    _server_state.GetGeneralCompleter().GetIdentifierCompleter() )
+  output.append( identifier_completer.IngestionDebugInfo() )
+
+  request_data = _RequestWrap()
   try:
-    output.append(
-        _GetCompleterForRequestData( request_data ).DebugInfo( request_data ) )
+    completer = _GetCompleterForRequestData( request_data )
+    output.append( completer.DebugInfo( request_data ) )
+    output.append( completer.CompletionsCacheDebugInfo() )
   except Exception:
     _logger.debug( 'Exception in debug info request: '
                    + traceback.format_exc() )
@@ -247,7 +269,16 @@ app.default_error_handler = ErrorHandler
 
 def _JsonResponse( data ):
   SetResponseHeader( 'Content-Type', 'application/json' )
-  return json.dumps( data, default = _UniversalSerialize )
+  body = json_utils.Dumps( data, default = _UniversalSerialize )
+  if len( body ) < compression_utils.MIN_COMPRESSED_RESPONSE_SIZE:
+    return body
+
+  encoding = compression_utils.NegotiateEncoding(
+    request.headers.get( _ACCEPT_ENCODING_HEADER, '' ) )
+  if not encoding:
+    return body
+  SetResponseHeader( 'Content-Encoding', encoding )
+  return compression_utils.Compress( ToBytes( body ), encoding )
 
 
 def _UniversalSerialize( obj ):
@@ -259,6 +290,40 @@ def _UniversalSerialize( obj ):
     return str( obj )
 
 
+def _RequestJson():
+  # Requests received through the stdio transport are already parsed.
+  if json_utils.REQUEST_JSON_ENVIRON_KEY in request.environ:
+    return request.environ[ json_utils.REQUEST_JSON_ENVIRON_KEY ]
+
+  # Parsed with json_utils instead of request.json, but like request.json we
+  # refuse bodies larger than the request body buffer, before and after
+  # decompression.
+  if request.content_length > bottle.Request.MEMFILE_MAX:
+    raise bottle.HTTPError( 413, 'Request entity too large' )
+  body = request.body.read()
+
+  # The HMAC plugin has already authenticated the body as it was sent, so it's
+  # only decompressed here.
+  encoding = request.headers.get( 'Content-Encoding' )
+  if encoding:
+    try:
+      body = compression_utils.Decompress( body,
+                                           encoding.strip().lower(),
+                                           bottle.Request.MEMFILE_MAX )
+    except compression_utils.UnsupportedEncoding as error:
+      raise bottle.HTTPError( 415, str( error ) )
+    except compression_utils.DecompressedDataTooLarge:
+      raise bottle.HTTPError( 413, 'Request entity too large' )
+    except zlib.error as error:
+      raise bottle.HTTPError( 400, 'Invalid request body: {0}'.format( error ) )
+  return json_utils.Loads( body )
+
+
+def _RequestWrap():
+  return RequestWrap( _RequestJson(),
+                      buffer_store = _server_state.buffer_store )
+
+
 def _GetCompleterForRequestData( request_data ):
   completer_target = request_data.get( 'completer_target', None )
 
@@ -50,14 +50,17 @@ class HmacPlugin( object ):
   api = 2
 
 
-  def __init__( self, hmac_secret ):
+  def __init__( self, hmac_secret, check_host_header = True ):
     self._hmac_secret = hmac_secret
+    # The Host header only protects against DNS rebinding, which can't reach a
+    # server listening on a unix domain socket.
+    self._check_host_header = check_host_header
     self._logger = logging.getLogger( __name__ )
 
 
   def __call__( self, callback ):
     def wrapper( *args, **kwargs ):
-      if not HostHeaderCorrect( request ):
+      if self._check_host_header and not HostHeaderCorrect( request ):
         self._logger.info( 'Dropping request with bad Host header.' )
         abort( requests.codes.unauthorized,
                'Unauthorized, received bad Host header.' )
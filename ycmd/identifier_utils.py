@@ -137,6 +137,136 @@ def IsIdentifier( text, filetype = None ):
   return match and match.end() == len( text )
 
 
+class _IdentifierScanner( object ):
+  """Finds the start of the longest identifier ending at an index with a single
+  right-to-left scan. It must agree with the identifier regex of the filetype:
+  |body_regex| matches the characters that can follow the first one and
+  |start_regex| the ones that can start an identifier, which must also be body
+  characters. Whether a character belongs to these classes is cached."""
+
+  def __init__( self, start_regex, body_regex, min_length = 1 ):
+    self._start_regex = re.compile( start_regex, re.UNICODE )
+    self._body_regex = re.compile( body_regex, re.UNICODE )
+    self._min_length = min_length
+    self._start_chars = {}
+    self._body_chars = {}
+
+
+  def StartOfLongestIdentifierEndingAtIndex( self, text, index ):
+    start = self._StartOfBody( text, index )
+    for i in range( start, index - self._min_length + 1 ):
+      if self._IsStart( text, i, index ):
+        return self._ExtendStart( text, start, i )
+    return index
+
+
+  def _StartOfBody( self, text, index ):
+    """Returns the start of the longest sequence of body characters ending at
+    |index|. An identifier ending at |index| can't start before it."""
+    i = index
+    while i > 0 and self._IsBodyChar( text, i - 1, index ):
+      i -= 1
+    return i
+
+
+  def _IsBodyChar( self, text, i, index ):
+    return _CachedMatch( self._body_regex, self._body_chars, text[ i ] )
+
+
+  def _IsStart( self, text, i, index ):
+    return _CachedMatch( self._start_regex, self._start_chars, text[ i ] )
+
+
+  def _ExtendStart( self, text, body_start, start ):
+    return start
+
+
+class _CssIdentifierScanner( _IdentifierScanner ):
+  """The identifier may be preceded by a single dash."""
+
+  def _ExtendStart( self, text, body_start, start ):
+    if start > body_start and text[ start - 1 ] == '-':
+      return start - 1
+    return start
+
+
+class _RIdentifierScanner( _IdentifierScanner ):
+  """The identifier can't start with a dot followed by a digit."""
+
+  def _IsStart( self, text, i, index ):
+    if not super( _RIdentifierScanner, self )._IsStart( text, i, index ):
+      return False
+    return not ( text[ i ] == '.' and i + 1 < index and
+                 _CachedMatch( _DIGIT_REGEX, _DIGIT_CHARS, text[ i + 1 ] ) )
+
+
+class _ClojureIdentifierScanner( _IdentifierScanner ):
+  """A single slash may appear after the first character."""
+
+  def _StartOfBody( self, text, index ):
+    i = index
+    slash_seen = False
+    while i > 0:
+      if text[ i - 1 ] == '/':
+        if slash_seen:
+          break
+        slash_seen = True
+      elif not self._IsBodyChar( text, i - 1, index ):
+        break
+      i -= 1
+    return i
+
+
+class _Perl6IdentifierScanner( _IdentifierScanner ):
+  """Dashes and apostrophes must be followed by a letter or an underscore."""
+
+  def _IsBodyChar( self, text, i, index ):
+    if text[ i ] in '-\'':
+      return i + 1 < index and self._IsStart( text, i + 1, index )
+    return super( _Perl6IdentifierScanner, self )._IsBodyChar( text, i, index )
+
+
+def _CachedMatch( regex, cache, char ):
+  try:
+    return cache[ char ]
+  except KeyError:
+    matches = bool( regex.match( char ) )
+    cache[ char ] = matches
+    return matches
+
+
+_DIGIT_REGEX = re.compile( r"\d", re.UNICODE )
+_DIGIT_CHARS = {}
+
+# Keep in sync with the identifier regexes above.
+DEFAULT_IDENTIFIER_SCANNER = _IdentifierScanner( r"[^\W\d]", r"\w" )
+
+FILETYPE_TO_IDENTIFIER_SCANNER = {
+    'javascript': _IdentifierScanner( r"[^\W\d]|\$", r"[\w$]" ),
+    'css': _CssIdentifierScanner( r"[_a-zA-Z]", r"[\w-]", min_length = 2 ),
+    'html': _IdentifierScanner( r"[a-zA-Z]", r"[^\s/>='\"}{\.]" ),
+    'r': _RIdentifierScanner( r"[^\d_\W]|\.", r"[\.\w]" ),
+    'clojure': _ClojureIdentifierScanner( r"[-\*\+!_\?:\.a-zA-Z]",
+                                          r"[-\*\+!_\?:\.\w]" ),
+    'haskell': _IdentifierScanner( r"[_a-zA-Z]", r"[\w']", min_length = 2 ),
+    'tex': _IdentifierScanner( r"[_a-zA-Z:-]", r"[_a-zA-Z:-]" ),
+    'perl6': _Perl6IdentifierScanner( r"[_a-zA-Z]", r"\w" ),
+}
+
+FILETYPE_TO_IDENTIFIER_SCANNER[ 'typescript' ] = (
+  FILETYPE_TO_IDENTIFIER_SCANNER[ 'javascript' ] )
+FILETYPE_TO_IDENTIFIER_SCANNER[ 'scss' ] = (
+  FILETYPE_TO_IDENTIFIER_SCANNER[ 'css' ] )
+FILETYPE_TO_IDENTIFIER_SCANNER[ 'sass' ] = (
+  FILETYPE_TO_IDENTIFIER_SCANNER[ 'css' ] )
+FILETYPE_TO_IDENTIFIER_SCANNER[ 'less' ] = (
+  FILETYPE_TO_IDENTIFIER_SCANNER[ 'css' ] )
+FILETYPE_TO_IDENTIFIER_SCANNER[ 'elisp' ] = (
+  FILETYPE_TO_IDENTIFIER_SCANNER[ 'clojure' ] )
+FILETYPE_TO_IDENTIFIER_SCANNER[ 'lisp' ] = (
+  FILETYPE_TO_IDENTIFIER_SCANNER[ 'clojure' ] )
+
+
 # index is 0-based and EXCLUSIVE, so ("foo.", 3) -> 0
 # Works with both unicode and str objects.
 # Returns the index on bad input.
@@ -144,10 +274,9 @@ def StartOfLongestIdentifierEndingAtIndex( text, index, filetype = None ):
   if not text or index < 1 or index > len( text ):
     return index
 
-  for i in range( index ):
-    if IsIdentifier( text[ i : index ], filetype ):
-      return i
-  return index
+  scanner = FILETYPE_TO_IDENTIFIER_SCANNER.get( filetype,
+                                                DEFAULT_IDENTIFIER_SCANNER )
+  return scanner.StartOfLongestIdentifierEndingAtIndex( text, index )
 
 
 # If the index is not on a valid identifer, it searches forward until a valid
@@ -0,0 +1,61 @@
+# Copyright (C) 2016 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+from builtins import *  # noqa
+
+import json
+
+from ycmd.utils import ToUnicode
+
+# WSGI environ key holding the already parsed JSON body of a request, set by
+# transports that don't go through HTTP like the stdio one.
+REQUEST_JSON_ENVIRON_KEY = 'ycmd.request_json'
+
+# ujson is optional; it is several times faster than the json module for the
+# large payloads ycmd sends and receives.
+try:
+  import ujson
+except ImportError:
+  ujson = None
+
+
+def Dumps( data, default = None ):
+  """Serializes |data| to a JSON unicode string, with the faster encoder when
+  it is available. |default| is called for objects that can't be serialized
+  otherwise, like with json.dumps; when it is needed, the json module is used
+  as not all versions of ujson support it."""
+  if ujson:
+    try:
+      return ToUnicode( ujson.dumps( data, escape_forward_slashes = False ) )
+    except ( TypeError, OverflowError ):
+      if not default:
+        raise
+  return json.dumps( data, default = default )
+
+
+def Loads( text ):
+  """Deserializes the JSON |text|, given as bytes or unicode."""
+  text = ToUnicode( text )
+  if ujson:
+    return ujson.loads( text )
+  return json.loads( text )
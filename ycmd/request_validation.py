@@ -58,10 +58,12 @@ def _MissingFieldsForFileData( request_json ):
   missing = set()
   data_for_file = request_json[ 'file_data' ].get( request_json[ 'filepath' ] )
   if data_for_file:
-    required_data = [ 'filetypes', 'contents' ]
-    for required in required_data:
-      if required not in data_for_file:
-        missing.add( _SingleFileDataFieldSpec( request_json, required ) )
+    if 'filetypes' not in data_for_file:
+      missing.add( _SingleFileDataFieldSpec( request_json, 'filetypes' ) )
+    # A buffer already known to the server can be sent as a version, see
+    # BufferStore.
+    if 'contents' not in data_for_file and 'version' not in data_for_file:
+      missing.add( _SingleFileDataFieldSpec( request_json, 'contents' ) )
     filetypes = data_for_file.get( 'filetypes', [] )
     if not filetypes:
       missing.add( '{0}[0]'.format(
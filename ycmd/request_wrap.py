@@ -29,7 +29,8 @@ from ycmd.utils import ( ByteOffsetToCodepointOffset,
                          CodepointOffsetToByteOffset,
                          ToUnicode,
                          ToBytes,
-                         SplitLines )
+                         LineIndex,
+                         ReadFile )
 from ycmd.identifier_utils import StartOfLongestIdentifierEndingAtIndex
 from ycmd.request_validation import EnsureRequestValid
 
@@ -37,11 +38,16 @@ from ycmd.request_validation import EnsureRequestValid
 # TODO: Change the custom computed (and other) keys to be actual properties on
 # the object.
 class RequestWrap( object ):
-  def __init__( self, request, validate = True ):
+  def __init__( self, request, validate = True, buffer_store = None ):
     if validate:
       EnsureRequestValid( request )
     self._request = request
+    self._buffer_store = buffer_store
     self._computed_key = {
+      # The 'file_data' of the request, where buffers sent as versions or
+      # edits are resolved to their full contents through the BufferStore
+      'file_data': self._FileData,
+
       # Unicode string representation of the current line
       'line_value': self._CurrentLine,
 
@@ -71,8 +77,13 @@ class RequestWrap( object ):
       'filetypes': self._Filetypes,
 
       'first_filetype': self._FirstFiletype,
+
+      # Hash of the contents of the current buffer, excluding the current line.
+      # It changes when the buffer is edited anywhere but on the current line.
+      'buffer_fingerprint': self._BufferFingerprint,
     }
     self._cached_computed = {}
+    self._file_lines = {}
 
 
   def __getitem__( self, key ):
@@ -96,11 +107,57 @@ class RequestWrap( object ):
       return default
 
 
-  def _CurrentLine( self ):
-    current_file = self._request[ 'filepath' ]
-    contents = self._request[ 'file_data' ][ current_file ][ 'contents' ]
+  def FileLines( self, filepath ):
+    """Returns a LineIndex of the contents of |filepath|, taken from file_data
+    if the file is there and read from disk otherwise. The index is only built
+    once per request, so completers can look up many locations in the same
+    file without splitting it again each time."""
+    try:
+      return self._file_lines[ filepath ]
+    except KeyError:
+      pass
+
+    try:
+      contents = self[ 'file_data' ][ filepath ][ 'contents' ]
+    except KeyError:
+      contents = ReadFile( filepath )
+    lines = LineIndex( ToUnicode( contents ) )
+    self._file_lines[ filepath ] = lines
+    return lines
+
 
-    return SplitLines( contents )[ self._request[ 'line_num' ] - 1 ]
+  def _FileData( self ):
+    file_data = self._request[ 'file_data' ]
+    if self._buffer_store is None:
+      return file_data
+    return self._buffer_store.ResolveFileData( file_data )
+
+
+  def _CurrentLine( self ):
+    lines = self.FileLines( self._request[ 'filepath' ] )
+    return lines[ self._request[ 'line_num' ] - 1 ]
+
+
+  def _BufferFingerprint( self ):
+    """Returns a value that only changes when the current buffer changes
+    outside of the current line."""
+    filepath = self._request[ 'filepath' ]
+    line_num = self._request[ 'line_num' ]
+    file_data = self[ 'file_data' ].get( filepath, {} )
+    generation = file_data.get( 'generation' )
+    if generation is not None:
+      # See BufferStore for the meaning of these generations.
+      if file_data[ 'edited_line' ] in ( None, line_num ):
+        return ( 'generation', file_data[ 'base_generation' ] )
+      return ( 'generation', generation )
+
+    # Without a generation, hash the text around the current line.
+    lines = self.FileLines( filepath )
+    line_index = line_num - 1
+    # Raise IndexError for a line past the end, as indexing the lines would.
+    start = lines.LineStartOffset( line_index )
+    end = lines.LineEndOffset( line_index )
+    return hash( ( lines.contents[ : start ], lines.contents[ end : ] ) )
 
 
   def CompletionStartColumn( self ):
@@ -34,6 +34,12 @@ NO_EXTRA_CONF_FILENAME_MESSAGE = ( 'No {0} file detected, so no compile flags '
   'are available. Thus no semantic support for C/C++/ObjC/ObjC++. Go READ THE '
   'DOCS *NOW*, DON\'T file a bug report.' ).format( YCM_EXTRA_CONF_FILENAME )
 
+UNKNOWN_BUFFER_VERSION_MESSAGE = ( 'Unknown version {0} of buffer {1}; send '
+  'its full contents instead.' )
+
+INVALID_BUFFER_EDIT_MESSAGE = ( 'Invalid edit of buffer {0}: {1}; send its '
+  'full contents instead.' )
+
 NO_DIAGNOSTIC_SUPPORT_MESSAGE = ( 'YCM has no diagnostics support for this '
   'filetype; refer to Syntastic docs if using Syntastic.')
 
@@ -56,6 +62,21 @@ class NoExtraConfDetected( ServerError ):
       NO_EXTRA_CONF_FILENAME_MESSAGE )
 
 
+class UnknownBufferVersion( ServerError ):
+  def __init__( self, filepath, version ):
+    super( UnknownBufferVersion, self ).__init__(
+      UNKNOWN_BUFFER_VERSION_MESSAGE.format( version, filepath ) )
+    self.filepath = filepath
+    self.version = version
+
+
+class InvalidBufferEdit( ServerError ):
+  def __init__( self, filepath, reason ):
+    super( InvalidBufferEdit, self ).__init__(
+      INVALID_BUFFER_EDIT_MESSAGE.format( filepath, reason ) )
+    self.filepath = filepath
+
+
 class NoDiagnosticSupport( ServerError ):
   def __init__( self ):
     super( NoDiagnosticSupport, self ).__init__( NO_DIAGNOSTIC_SUPPORT_MESSAGE )
@@ -243,7 +264,17 @@ def BuildFixItResponse( fixits ):
 
 def BuildExceptionResponse( exception, traceback ):
   return {
-    'exception': exception,
+    'exception': BuildExceptionData( exception ),
     'message': str( exception ),
     'traceback': traceback
   }
+
+
+def BuildExceptionData( exception ):
+  """Returns the attributes of |exception| along with its type name in the
+  'TYPE' key, which clients use to recognise errors like UnknownExtraConf."""
+  if exception is None:
+    return None
+  data = vars( exception ).copy()
+  data[ 'TYPE' ] = type( exception ).__name__
+  return data
@@ -27,6 +27,7 @@ import os
 import threading
 import logging
 from future.utils import itervalues
+from ycmd.buffer_store import BufferStore
 from ycmd.utils import ForceSemanticCompletion, LoadPythonSource
 from ycmd.completers.general.general_completer_store import (
     GeneralCompleterStore )
@@ -41,6 +42,7 @@ class ServerState( object ):
     self._filetype_completers = dict()
     self._filetype_completers_lock = threading.Lock()
     self._gencomp = GeneralCompleterStore( self._user_options )
+    self._buffer_store = BufferStore()
 
 
   @property
@@ -48,6 +50,11 @@ class ServerState( object ):
     return self._user_options
 
 
+  @property
+  def buffer_store( self ):
+    return self._buffer_store
+
+
   def Shutdown( self ):
     with self._filetype_completers_lock:
       for completer in self._filetype_completers.values():
@@ -0,0 +1,282 @@
+# Copyright (C) 2016 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+from builtins import *  # noqa
+
+from future.utils import native
+import io
+import logging
+import os
+import queue
+import sys
+import threading
+import urllib.parse
+
+from ycmd import json_utils
+from ycmd.json_utils import REQUEST_JSON_ENVIRON_KEY
+from ycmd.utils import OnWindows, ToBytes, ToUnicode
+
+_logger = logging.getLogger( __name__ )
+
+
+def ReadMessage( stream ):
+  """Reads a message from the binary |stream|. Like the messages of TSServer,
+  it is made of headers similar to HTTP, of which only Content-Length is
+  required, followed by an empty line and |Content-Length| bytes of JSON.
+  Returns the bytes of the JSON or None at the end of the stream."""
+  headers = {}
+  while True:
+    headerline = stream.readline()
+    if not headerline:
+      return None
+    headerline = headerline.strip()
+    if not headerline:
+      if headers:
+        break
+      # Tolerate blank lines between messages.
+      continue
+    key, value = ToUnicode( headerline ).split( ':', 1 )
+    headers[ key.strip().lower() ] = value.strip()
+
+  if 'content-length' not in headers:
+    raise RuntimeError( "Missing 'Content-Length' header" )
+  content_length = int( headers[ 'content-length' ] )
+  content = stream.read( content_length )
+  if len( content ) < content_length:
+    return None
+  return content
+
+
+def WriteMessage( stream, content ):
+  """Writes the bytes of JSON |content| as a message to the binary
+  |stream|."""
+  stream.write( ToBytes( 'Content-Length: {0}\r\n\r\n'.format(
+    len( content ) ) ) + content )
+  stream.flush()
+
+
+def StdioStreams():
+  """Returns the binary ( input, output ) streams of the stdio transport. File
+  descriptors 0 and 1 are then pointed elsewhere so that nothing else, like a
+  print statement or a subprocess, writes into the messages."""
+  input_fd = os.dup( sys.stdin.fileno() )
+  output_fd = os.dup( sys.stdout.fileno() )
+  if OnWindows():
+    import msvcrt
+    msvcrt.setmode( input_fd, os.O_BINARY )
+    msvcrt.setmode( output_fd, os.O_BINARY )
+
+  devnull = os.open( os.devnull, os.O_RDONLY )
+  os.dup2( devnull, sys.stdin.fileno() )
+  os.close( devnull )
+  os.dup2( sys.stderr.fileno(), sys.stdout.fileno() )
+  return os.fdopen( input_fd, 'rb' ), os.fdopen( output_fd, 'wb' )
+
+
+class StdioServer( object ):
+  """Serves the WSGI |application| through length-prefixed JSON messages (see
+  ReadMessage) on a pair of binary streams instead of HTTP.
+
+  A request is { "id": ..., "method": "POST", "path": "/completions",
+  "params": { ... }, "body": { ... } }, where the method defaults to POST and
+  the query params and body are optional. The id is a string or a number chosen
+  by the client and sent back with the response: { "id": ..., "status": 200,
+  "body": ... }. Requests are handled concurrently, so responses may arrive in
+  a different order than the requests. Every request gets a response: a
+  malformed one gets a 400 with its id, or a null id if it has none, and one
+  whose handling fails gets a 500.
+
+  It has the same Run and Shutdown methods as StoppableWSGIServer."""
+
+  shutdown_requested = False
+
+  def __init__( self, application, input_stream, output_stream, threads ):
+    self._application = application
+    self._input = input_stream
+    self._output = output_stream
+    self._output_lock = threading.Lock()
+    self._requests = queue.Queue()
+    self._stopped = threading.Event()
+
+    for _ in range( threads ):
+      worker = threading.Thread( target = self._HandleRequests )
+      worker.daemon = True
+      worker.start()
+
+
+  def Run( self ):
+    """Serves requests until Shutdown is called or the input stream is
+    closed."""
+    reader = threading.Thread( target = self._ReadRequests )
+    reader.daemon = True
+    reader.start()
+    # Wait with a timeout so that signals are still handled.
+    while not self._stopped.is_set():
+      self._stopped.wait( 1 )
+
+
+  def Shutdown( self ):
+    """Properly shutdown the server, once pending requests are answered."""
+    self.shutdown_requested = True
+    self._requests.join()
+    self._stopped.set()
+
+
+  def _ReadRequests( self ):
+    try:
+      while not self.shutdown_requested:
+        message = ReadMessage( self._input )
+        if message is None:
+          break
+        self._requests.put( message )
+    except Exception:
+      _logger.exception( 'Error while reading requests' )
+    # The client is gone, so there is no one left to serve.
+    self._stopped.set()
+
+
+  def _HandleRequests( self ):
+    while True:
+      message = self._requests.get()
+      try:
+        self._HandleRequest( message )
+      except Exception:
+        _logger.exception( 'Error while writing a response' )
+      finally:
+        self._requests.task_done()
+
+
+  def _HandleRequest( self, message ):
+    try:
+      request_id, environ = _ParseRequest( message )
+    except InvalidRequestMessage as error:
+      self._WriteResponse( error.request_id, 400, _JsonString( str( error ) ) )
+      return
+
+    try:
+      status, body = self._CallApplication( environ )
+    except Exception as error:
+      _logger.exception( 'Error while handling a request' )
+      status, body = 500, _JsonString(
+        'Error while handling the request: {0}'.format( error ) )
+    self._WriteResponse( request_id, status, body )
+
+
+  def _CallApplication( self, environ ):
+    response = {}
+
+    def StartResponse( status, headers, exc_info = None ):
+      response[ 'status' ] = int( status.split( ' ', 1 )[ 0 ] )
+      response[ 'headers' ] = dict( ( key.lower(), value )
+                                    for key, value in headers )
+
+    result = self._application( environ, StartResponse )
+    try:
+      body = b''.join( ToBytes( chunk ) for chunk in result )
+    finally:
+      if hasattr( result, 'close' ):
+        result.close()
+
+    # Handlers answer with JSON, which is embedded in the response as is.
+    content_type = response[ 'headers' ].get( 'content-type', '' )
+    if not content_type.startswith( 'application/json' ) or not body:
+      body = _JsonString( ToUnicode( body ) )
+    return response[ 'status' ], body
+
+
+  def _WriteResponse( self, request_id, status, body ):
+    content = ToBytes( '{{"id": {0}, "status": {1}, "body": '.format(
+      json_utils.Dumps( request_id ), status ) ) + body + b'}'
+    with self._output_lock:
+      WriteMessage( self._output, content )
+
+
+class InvalidRequestMessage( ValueError ):
+  def __init__( self, request_id, reason ):
+    super( InvalidRequestMessage, self ).__init__(
+      'Invalid request message: {0}'.format( reason ) )
+    self.request_id = request_id
+
+
+def _ParseRequest( message ):
+  """Returns the id of the request |message| and the WSGI environ to call the
+  application with. Raises InvalidRequestMessage if the message is malformed,
+  with the request id if it could be read."""
+  try:
+    request = json_utils.Loads( message )
+  except ValueError as error:
+    raise InvalidRequestMessage( None, error )
+  if not isinstance( request, dict ):
+    raise InvalidRequestMessage( None, 'not a JSON object' )
+
+  request_id = request.get( 'id' )
+  # bool is a subclass of int, but true isn't a sensible id.
+  if isinstance( request_id, bool ) or not isinstance( request_id,
+                                                       ( str, int ) ):
+    raise InvalidRequestMessage( None, 'id must be a string or a number' )
+
+  method = request.get( 'method', 'POST' )
+  path = request.get( 'path' )
+  params = request.get( 'params' )
+  if not isinstance( method, str ):
+    raise InvalidRequestMessage( request_id, 'method must be a string' )
+  if not isinstance( path, str ):
+    raise InvalidRequestMessage( request_id, 'path must be a string' )
+  if params is not None and not isinstance( params, dict ):
+    raise InvalidRequestMessage( request_id, 'params must be an object' )
+
+  body = request.get( 'body' )
+  return request_id, _BuildEnviron( method, path, params, body )
+
+
+def _JsonString( text ):
+  return ToBytes( json_utils.Dumps( text ) )
+
+
+def _BuildEnviron( method, path, params, body ):
+  if not path.startswith( '/' ):
+    path = '/' + path
+  environ = {
+    'REQUEST_METHOD': native( method.upper() ),
+    'SCRIPT_NAME': native( '' ),
+    'PATH_INFO': native( path ),
+    'QUERY_STRING': native( urllib.parse.urlencode( params ) if params
+                            else '' ),
+    'CONTENT_TYPE': native( 'application/json' ),
+    'CONTENT_LENGTH': native( '0' ),
+    'SERVER_NAME': native( 'localhost' ),
+    'SERVER_PORT': native( '0' ),
+    'SERVER_PROTOCOL': native( 'HTTP/1.1' ),
+    'HTTP_HOST': native( 'localhost' ),
+    'wsgi.version': ( 1, 0 ),
+    'wsgi.url_scheme': native( 'http' ),
+    'wsgi.input': io.BytesIO(),
+    'wsgi.errors': sys.stderr,
+    'wsgi.multithread': True,
+    'wsgi.multiprocess': False,
+    'wsgi.run_once': False,
+  }
+  if body is not None:
+    # The handlers use the body as is instead of parsing it again.
+    environ[ REQUEST_JSON_ENVIRON_KEY ] = body
+  return environ
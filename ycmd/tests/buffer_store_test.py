@@ -0,0 +1,167 @@
+# Copyright (C) 2016 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+from builtins import *  # noqa
+
+from hamcrest import assert_that, calling, raises
+from nose.tools import eq_, ok_
+
+from ycmd.buffer_store import BufferStore
+from ycmd.responses import InvalidBufferEdit, UnknownBufferVersion
+
+
+def Resolve( store, entry ):
+  entry = dict( entry, filetypes = [ 'foo' ] )
+  return store.ResolveFileData( { '/foo': entry } )[ '/foo' ]
+
+
+def Edit( start, end, text ):
+  return { 'start': { 'line_num': start[ 0 ], 'column_num': start[ 1 ] },
+           'end': { 'line_num': end[ 0 ], 'column_num': end[ 1 ] },
+           'text': text }
+
+
+def BufferStore_FullContents_test():
+  store = BufferStore()
+  resolved = Resolve( store, { 'contents': 'foo', 'version': 1 } )
+  eq_( 'foo', resolved[ 'contents' ] )
+  eq_( [ 'foo' ], resolved[ 'filetypes' ] )
+  eq_( 1, store.NumBuffers() )
+
+
+def BufferStore_UnversionedContentsAreNotStored_test():
+  store = BufferStore()
+  Resolve( store, { 'contents': 'foo', 'version': 1 } )
+  resolved = Resolve( store, { 'contents': 'bar' } )
+  eq_( 'bar', resolved[ 'contents' ] )
+  ok_( 'generation' not in resolved )
+  eq_( 0, store.NumBuffers() )
+
+
+def BufferStore_VersionReference_test():
+  store = BufferStore()
+  Resolve( store, { 'contents': 'foo\nbar', 'version': 1 } )
+  eq_( 'foo\nbar', Resolve( store, { 'version': 1 } )[ 'contents' ] )
+
+
+def BufferStore_UnknownVersion_test():
+  store = BufferStore()
+  assert_that( calling( Resolve ).with_args( store, { 'version': 1 } ),
+               raises( UnknownBufferVersion, '.*version 1.*/foo.*' ) )
+
+  Resolve( store, { 'contents': 'foo', 'version': 1 } )
+  assert_that( calling( Resolve ).with_args( store, { 'version': 2 } ),
+               raises( UnknownBufferVersion ) )
+  assert_that(
+    calling( Resolve ).with_args( store, {
+      'version': 3,
+      'base_version': 2,
+      'edits': [ Edit( ( 1, 1 ), ( 1, 1 ), 'a' ) ] } ),
+    raises( UnknownBufferVersion ) )
+
+
+def BufferStore_Edits_test():
+  store = BufferStore()
+  Resolve( store, { 'contents': 'foo\r\nbär\nzoo', 'version': 1 } )
+  resolved = Resolve( store, {
+    'version': 2,
+    'base_version': 1,
+    'edits': [
+      # Columns are byte offsets, so the 'r' of 'bär' is at column 4.
+      Edit( ( 2, 4 ), ( 3, 2 ), 'x\ny' ),
+      Edit( ( 1, 1 ), ( 1, 1 ), 'goo ' ),
+    ] } )
+  eq_( 'goo foo\r\nbäx\nyoo', resolved[ 'contents' ] )
+  ok_( 'edits' not in resolved )
+  ok_( 'base_version' not in resolved )
+
+  # Sending the same edits again doesn't apply them twice.
+  eq_( resolved[ 'contents' ], Resolve( store, {
+    'version': 2,
+    'base_version': 1,
+    'edits': [ Edit( ( 1, 1 ), ( 1, 1 ), 'goo ' ) ] } )[ 'contents' ] )
+  eq_( resolved[ 'contents' ],
+       Resolve( store, { 'version': 2 } )[ 'contents' ] )
+
+
+def BufferStore_EditAtEndOfBuffer_test():
+  store = BufferStore()
+  Resolve( store, { 'contents': 'foo\nbar', 'version': 1 } )
+  eq_( 'foo\nbarX', Resolve( store, {
+    'version': 2,
+    'base_version': 1,
+    'edits': [ Edit( ( 3, 1 ), ( 3, 1 ), 'X' ) ] } )[ 'contents' ] )
+  eq_( 'foo\nbarXY', Resolve( store, {
+    'version': 3,
+    'base_version': 2,
+    'edits': [ Edit( ( 2, 5 ), ( 2, 5 ), 'Y' ) ] } )[ 'contents' ] )
+
+
+def BufferStore_EditOutsideOfBuffer_test():
+  store = BufferStore()
+  Resolve( store, { 'contents': 'foo\nbär\n', 'version': 1 } )
+
+  def ResolveEdit( start, end ):
+    return Resolve( store, { 'version': 2,
+                             'base_version': 1,
+                             'edits': [ Edit( start, end, 'X' ) ] } )
+
+  for start, end, message in [
+      ( ( 0, 1 ), ( 0, 1 ), '.*line 0 is outside of the buffer.*' ),
+      ( ( 1, 1 ), ( 5, 1 ), '.*line 5 is outside of the buffer.*' ),
+      ( ( 4, 2 ), ( 4, 2 ), '.*line 4 is outside of the buffer.*' ),
+      ( ( 3, 2 ), ( 3, 2 ), '.*column 2 is outside of line 3.*' ),
+      # 'bär' is 4 bytes long, so column 5 is its end and column 6 is past it.
+      ( ( 2, 6 ), ( 2, 6 ), '.*column 6 is outside of line 2.*' ),
+      ( ( 1, 0 ), ( 1, 1 ), '.*column 0 is outside of line 1.*' ),
+      ( ( 2, 1 ), ( 1, 1 ), '.*ends before it starts.*' ) ]:
+    assert_that( calling( ResolveEdit ).with_args( start, end ),
+                 raises( InvalidBufferEdit, message ) )
+
+  # The buffer is left untouched.
+  eq_( 'foo\nbär\nX', ResolveEdit( ( 3, 1 ), ( 3, 1 ) )[ 'contents' ] )
+
+
+def BufferStore_Generation_test():
+  store = BufferStore()
+  first = Resolve( store, { 'contents': 'foo', 'version': 1 } )[ 'generation' ]
+  eq_( first, Resolve( store, { 'version': 1 } )[ 'generation' ] )
+  eq_( first, Resolve( store, { 'contents': 'foo',
+                                'version': 2 } )[ 'generation' ] )
+
+  second = Resolve( store, { 'contents': 'bar',
+                             'version': 3 } )[ 'generation' ]
+  ok_( second > first )
+
+  other = store.ResolveFileData( {
+    '/bar': { 'filetypes': [ 'foo' ], 'contents': 'foo', 'version': 1 } } )
+  ok_( other[ '/bar' ][ 'generation' ] > second )
+
+
+def BufferStore_Forget_test():
+  store = BufferStore()
+  Resolve( store, { 'contents': 'foo', 'version': 1 } )
+  store.Forget( '/foo' )
+  eq_( 0, store.NumBuffers() )
+  assert_that( calling( Resolve ).with_args( store, { 'version': 1 } ),
+               raises( UnknownBufferVersion ) )
@@ -28,11 +28,13 @@ from base64 import b64decode, b64encode
 from hamcrest import assert_that, empty, equal_to, is_in
 from tempfile import NamedTemporaryFile
 import functools
+import http.client
 import json
 import os
 import psutil
 import re
 import requests
+import socket
 import subprocess
 import sys
 import time
@@ -54,11 +56,44 @@ PATH_TO_YCMD = os.path.join( DIR_OF_THIS_SCRIPT, '..' )
 LOGFILE_FORMAT = 'server_{port}_{std}_'
 
 
+class UnixSocketHTTPConnection( http.client.HTTPConnection ):
+  def __init__( self, path ):
+    http.client.HTTPConnection.__init__( self, 'localhost' )
+    self._path = path
+
+
+  def connect( self ):
+    self.sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+    self.sock.connect( self._path )
+
+
+class UnixSocketResponse( object ):
+  """The parts of requests.Response used by the tests, for responses received
+  through a unix domain socket."""
+
+  def __init__( self, response ):
+    self.status_code = response.status
+    self.headers = requests.structures.CaseInsensitiveDict(
+      response.getheaders() )
+    self.content = response.read()
+
+
+  def json( self ):
+    return json.loads( ToUnicode( self.content ) )
+
+
+  def raise_for_status( self ):
+    if self.status_code >= 400:
+      raise requests.exceptions.HTTPError(
+        'Request failed with status {0}'.format( self.status_code ) )
+
+
 class Client_test( object ):
 
   def __init__( self ):
     self._location = None
     self._port = None
+    self._unix_socket = None
     self._hmac_secret = None
     self._servers = []
     self._logfiles = []
@@ -82,13 +117,15 @@ class Client_test( object ):
 
 
   def Start( self, idle_suicide_seconds = 60,
-             check_interval_seconds = 60 * 10 ):
+             check_interval_seconds = 60 * 10,
+             unix_socket = None ):
     # The temp options file is deleted by ycmd during startup
     with NamedTemporaryFile( mode = 'w+', delete = False ) as options_file:
       json.dump( self._options_dict, options_file )
       options_file.flush()
       self._port = GetUnusedLocalhostPort()
       self._location = 'http://127.0.0.1:' + str( self._port )
+      self._unix_socket = unix_socket
 
       # Define environment variable to enable subprocesses coverage. See:
       # http://coverage.readthedocs.org/en/coverage-4.0.3/subprocess.html
@@ -104,6 +141,8 @@ class Client_test( object ):
         '--idle_suicide_seconds={0}'.format( idle_suicide_seconds ),
         '--check_interval_seconds={0}'.format( check_interval_seconds ),
       ]
+      if unix_socket:
+        ycmd_args.append( '--unix_socket={0}'.format( unix_socket ) )
 
       stdout = CreateLogfile(
           LOGFILE_FORMAT.format( port = self._port, std = 'stdout' ) )
@@ -144,7 +183,7 @@ class Client_test( object ):
 
         if self._IsReady( filetype ):
           return
-      except requests.exceptions.ConnectionError:
+      except ( requests.exceptions.ConnectionError, socket.error ):
         pass
       finally:
         time.sleep( 0.1 )
@@ -215,12 +254,19 @@ class Client_test( object ):
     return ToBytes( json.dumps( data ) if data else None )
 
 
-  def _Request( self, method, handler, data = None, params = None ):
+  def _Request( self, method, handler, data = None, params = None,
+                headers = None ):
     request_uri = self._BuildUri( handler )
     data = self._ToUtf8Json( data )
-    headers = self._ExtraHeaders( method,
-                                  request_uri,
-                                  data )
+    all_headers = self._ExtraHeaders( method,
+                                      request_uri,
+                                      data )
+    if headers:
+      all_headers.update( headers )
+    headers = all_headers
+    if self._unix_socket:
+      return self._UnixSocketRequest( method, request_uri, headers, data,
+                                      params )
     response = requests.request( method,
                                  request_uri,
                                  headers = headers,
@@ -229,6 +275,18 @@ class Client_test( object ):
     return response
 
 
+  def _UnixSocketRequest( self, method, request_uri, headers, data, params ):
+    path = native( ToUnicode( urllib.parse.urlparse( request_uri ).path ) )
+    if params:
+      path += '?' + urllib.parse.urlencode( params )
+    connection = UnixSocketHTTPConnection( self._unix_socket )
+    try:
+      connection.request( method, path, body = data, headers = headers )
+      return UnixSocketResponse( connection.getresponse() )
+    finally:
+      connection.close()
+
+
   def _BuildUri( self, handler ):
     return native( ToBytes( urllib.parse.urljoin( self._location, handler ) ) )
 
@@ -24,11 +24,14 @@ from future import standard_library
 standard_library.install_aliases()
 from builtins import *  # noqa
 
-from ycmd.tests.test_utils import DummyCompleter, ExpectedFailure
+from ycmd.completers.completer import CompletionsCache
+from ycmd.request_wrap import RequestWrap
+from ycmd.tests.test_utils import ( BuildRequest, DummyCompleter,
+                                    ExpectedFailure )
 from ycmd.user_options_store import DefaultOptions
 from mock import patch
-from nose.tools import eq_
-from hamcrest import contains_string
+from nose.tools import eq_, ok_
+from hamcrest import assert_that, contains_string
 
 
 def _FilterAndSortCandidates_Match( candidates, query, expected_matches ):
@@ -61,6 +64,30 @@ def FilterAndSortCandidates_ServerCompleter_test():
                                   [ { 'insertion_text': 'password' } ] )
 
 
+def FilterAndSortCandidates_DoesNotModifyCandidates_test():
+  candidates = [ { 'insertion_text': 'password', 'menu_text': 'ø' },
+                 { 'insertion_text': 'foo' } ]
+  completer = DummyCompleter( DefaultOptions() )
+  matches = completer.FilterAndSortCandidates( candidates, 'p' )
+
+  eq_( [ { 'insertion_text': 'password', 'menu_text': 'ø' } ], matches )
+  ok_( matches[ 0 ] is candidates[ 0 ] )
+  eq_( [ { 'insertion_text': 'password', 'menu_text': 'ø' },
+         { 'insertion_text': 'foo' } ], candidates )
+
+
+def FilterAndSortCandidates_MaxResults_test():
+  completer = DummyCompleter( DefaultOptions() )
+  candidates = [ 'afoo', 'foobar', 'foo', 'bar' ]
+
+  eq_( [ 'foo', 'foobar' ],
+       completer.FilterAndSortCandidates( candidates, 'fo', max_results = 2 ) )
+  eq_( [ 'foo', 'foobar', 'afoo' ],
+       completer.FilterAndSortCandidates( candidates, 'fo', max_results = 5 ) )
+  eq_( [ 'afoo', 'foobar' ],
+       completer.FilterAndSortCandidates( candidates, '', max_results = 2 ) )
+
+
 @ExpectedFailure( 'Filtering does not support unicode characters',
                   contains_string( '[]' ) )
 def FilterAndSortCandidates_Unicode_test():
@@ -74,3 +101,134 @@ def FilterAndSortCandidates_Unicode_test():
 def DefinedSubcommands_RemoveStopServerSubcommand_test( subcommands_map ):
   completer = DummyCompleter( DefaultOptions() )
   eq_( completer.DefinedSubcommands(), [ 'Foo' ] )
+
+
+def _CacheRequest( filepath = '/foo', line_num = 1, start_column = 1,
+                   buffer_fingerprint = 0 ):
+  return { 'filepath': filepath,
+           'line_num': line_num,
+           'start_column': start_column,
+           'buffer_fingerprint': buffer_fingerprint }
+
+
+def CompletionsCache_NarrowsExtendedQuery_test():
+  cache = CompletionsCache( max_entries = 10, max_candidates = 0 )
+  request = _CacheRequest()
+  cache.Update( request, 0, [ 'foo', 'fooBar', 'bar' ] )
+  eq_( [ 'foo', 'fooBar', 'bar' ],
+       cache.GetCandidatesToFilterIfCacheValid( request, 0, 'fo' ) )
+
+  cache.UpdateFilteredCompletions( request, 0, 'fo', [ 'foo', 'fooBar' ] )
+  eq_( [ 'foo', 'fooBar' ],
+       cache.GetCandidatesToFilterIfCacheValid( request, 0, 'fob' ) )
+  eq_( [ 'foo', 'fooBar' ],
+       cache.GetCandidatesToFilterIfCacheValid( request, 0, 'fxo' ) )
+  eq_( [ 'foo', 'fooBar', 'bar' ],
+       cache.GetCandidatesToFilterIfCacheValid( request, 0, 'of' ) )
+  eq_( [ 'foo', 'fooBar', 'bar' ],
+       cache.GetCandidatesToFilterIfCacheValid( request, 0, 'f' ) )
+  eq_( None, cache.GetCandidatesToFilterIfCacheValid(
+    _CacheRequest( start_column = 2 ), 0, 'fob' ) )
+  eq_( ( 2, 3 ), cache.QueryNarrowingStatistics() )
+
+
+def CompletionsCache_UpdateClearsFilteredCompletions_test():
+  cache = CompletionsCache( max_entries = 10, max_candidates = 0 )
+  request = _CacheRequest()
+  cache.Update( request, 0, [ 'foo', 'bar' ] )
+  cache.UpdateFilteredCompletions( request, 0, 'fo', [ 'foo' ] )
+  cache.Update( request, 0, [ 'foo', 'fooBar', 'bar' ] )
+  eq_( [ 'foo', 'fooBar', 'bar' ],
+       cache.GetCandidatesToFilterIfCacheValid( request, 0, 'foo' ) )
+
+  # Filtered completions for a location not in the cache are ignored.
+  cache.UpdateFilteredCompletions( _CacheRequest( line_num = 2 ), 0, 'fo',
+                                   [ 'foo' ] )
+  eq_( None, cache.GetCompletionsIfCacheValid( _CacheRequest( line_num = 2 ),
+                                               0 ) )
+
+
+def CompletionsCache_KeepsMultipleLocations_test():
+  cache = CompletionsCache( max_entries = 2, max_candidates = 0 )
+  first_request = _CacheRequest( line_num = 1 )
+  second_request = _CacheRequest( line_num = 2 )
+  third_request = _CacheRequest( line_num = 3 )
+
+  cache.Update( first_request, 0, [ 'foo' ] )
+  cache.Update( second_request, 0, [ 'bar' ] )
+  eq_( [ 'foo' ], cache.GetCompletionsIfCacheValid( first_request, 0 ) )
+  eq_( [ 'bar' ], cache.GetCompletionsIfCacheValid( second_request, 0 ) )
+  eq_( None, cache.GetCompletionsIfCacheValid( second_request, 1 ) )
+  eq_( None, cache.GetCompletionsIfCacheValid(
+    _CacheRequest( filepath = '/bar', line_num = 2 ), 0 ) )
+
+  # The first location is now the least recently used one.
+  cache.Update( third_request, 0, [ 'baz' ] )
+  eq_( None, cache.GetCompletionsIfCacheValid( first_request, 0 ) )
+  eq_( [ 'bar' ], cache.GetCompletionsIfCacheValid( second_request, 0 ) )
+  eq_( [ 'baz' ], cache.GetCompletionsIfCacheValid( third_request, 0 ) )
+  eq_( ( 2, 2 ), cache.Size() )
+
+
+def CompletionsCache_BufferChangedOutsideLine_test():
+  cache = CompletionsCache( max_entries = 10, max_candidates = 0 )
+  cache.Update( _CacheRequest( buffer_fingerprint = 1 ), 0, [ 'foo' ] )
+  eq_( None, cache.GetCompletionsIfCacheValid(
+    _CacheRequest( buffer_fingerprint = 2 ), 0 ) )
+
+
+def CompletionsCache_EvictsWhenTooManyCandidates_test():
+  cache = CompletionsCache( max_entries = 10, max_candidates = 3 )
+  first_request = _CacheRequest( line_num = 1 )
+  second_request = _CacheRequest( line_num = 2 )
+  third_request = _CacheRequest( line_num = 3 )
+
+  cache.Update( first_request, 0, [ 'foo', 'bar' ] )
+  cache.Update( second_request, 0, { 'words': [ 'baz' ] } )
+  eq_( ( 2, 3 ), cache.Size() )
+
+  cache.Update( third_request, 0, [ 'qux' ] )
+  eq_( None, cache.GetCompletionsIfCacheValid( first_request, 0 ) )
+  eq_( ( 2, 2 ), cache.Size() )
+
+  # The most recent location is kept even if it exceeds the limit.
+  cache.Update( first_request, 0, [ 'foo', 'bar', 'baz', 'qux' ] )
+  eq_( [ 'foo', 'bar', 'baz', 'qux' ],
+       cache.GetCompletionsIfCacheValid( first_request, 0 ) )
+  eq_( ( 1, 4 ), cache.Size() )
+
+
+def CompletionsCache_InvalidateLocation_test():
+  cache = CompletionsCache( max_entries = 10, max_candidates = 0 )
+  cache.Update( _CacheRequest( line_num = 1 ), 0, [ 'foo' ] )
+  cache.Update( _CacheRequest( line_num = 1 ), 1, [ 'bar' ] )
+  cache.Update( _CacheRequest( line_num = 2 ), 0, [ 'baz' ] )
+
+  cache.InvalidateLocation( _CacheRequest( line_num = 1 ) )
+  eq_( None, cache.GetCompletionsIfCacheValid( _CacheRequest( line_num = 1 ),
+                                               0 ) )
+  eq_( None, cache.GetCompletionsIfCacheValid( _CacheRequest( line_num = 1 ),
+                                               1 ) )
+  eq_( [ 'baz' ],
+       cache.GetCompletionsIfCacheValid( _CacheRequest( line_num = 2 ), 0 ) )
+
+
+@patch( 'ycmd.tests.test_utils.DummyCompleter.CandidatesList',
+        return_value = [ 'foo', 'fooBar', 'fooBarBaz', 'bar' ] )
+def ComputeCandidates_NarrowsCachedCandidates_test( *args ):
+  completer = DummyCompleter( DefaultOptions() )
+
+  def ComputeCandidates( query ):
+    request_data = RequestWrap( BuildRequest( contents = query,
+                                              column_num = len( query ) + 1,
+                                              force_semantic = True ) )
+    return [ candidate[ 'insertion_text' ] for candidate in
+             completer.ComputeCandidates( request_data ) ]
+
+  eq_( [ 'fooBar', 'fooBarBaz' ], ComputeCandidates( 'fooB' ) )
+  eq_( [ 'fooBarBaz' ], ComputeCandidates( 'fooBarB' ) )
+  eq_( [ 'fooBarBaz' ], ComputeCandidates( 'fooBarBaz' ) )
+  eq_( [ 'foo', 'fooBar', 'fooBarBaz' ], ComputeCandidates( 'foo' ) )
+  eq_( ( 2, 2 ), completer._completions_cache.QueryNarrowingStatistics() )
+  assert_that( completer.CompletionsCacheDebugInfo(),
+               contains_string( 'Query narrowing hits: 2' ) )
@@ -0,0 +1,104 @@
+# Copyright (C) 2016 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+from builtins import *  # noqa
+
+from hamcrest import assert_that, calling, raises
+from nose.tools import eq_, ok_
+import gzip
+import io
+
+from ycmd.compression_utils import ( Compress, Decompress,
+                                     DecompressedDataTooLarge,
+                                     NegotiateEncoding, UnsupportedEncoding )
+import zlib
+
+
+def CompressDecompress_RoundTrip_test():
+  data = 'int foo = bar;\n'.encode( 'utf8' ) * 1000
+
+  def Test( encoding ):
+    compressed = Compress( data, encoding )
+    if encoding != 'identity':
+      ok_( len( compressed ) < len( data ) )
+    eq_( data, Decompress( compressed, encoding ) )
+
+  for encoding in [ 'identity', 'deflate', 'gzip' ]:
+    yield Test, encoding
+
+
+def Decompress_GzipFile_test():
+  data = 'foo'.encode( 'utf8' )
+  compressed = io.BytesIO()
+  with gzip.GzipFile( fileobj = compressed, mode = 'wb' ) as gzip_file:
+    gzip_file.write( data )
+  eq_( data, Decompress( compressed.getvalue(), 'gzip' ) )
+
+
+def Decompress_MaxSize_test():
+  data = b'\0' * 10000
+
+  def Test( encoding ):
+    compressed = Compress( data, encoding )
+    eq_( data, Decompress( compressed, encoding, max_size = len( data ) ) )
+    assert_that(
+      calling( Decompress ).with_args( compressed, encoding,
+                                       max_size = len( data ) - 1 ),
+      raises( DecompressedDataTooLarge, '.*9999 bytes' ) )
+
+  for encoding in [ 'deflate', 'gzip' ]:
+    yield Test, encoding
+
+
+def Decompress_CorruptData_test():
+  compressed = Compress( b'foo' * 1000, 'deflate' )
+  assert_that( calling( Decompress ).with_args( b'foo', 'deflate' ),
+               raises( zlib.error ) )
+  assert_that( calling( Decompress ).with_args( compressed[ : -10 ],
+                                                'deflate' ),
+               raises( zlib.error ) )
+
+
+def CompressDecompress_UnsupportedEncoding_test():
+  assert_that( calling( Compress ).with_args( b'foo', 'br' ),
+               raises( UnsupportedEncoding, '.*br' ) )
+  assert_that( calling( Decompress ).with_args( b'foo', 'br' ),
+               raises( UnsupportedEncoding, '.*br' ) )
+
+
+def NegotiateEncoding_test():
+  tests = [
+    ( '', None ),
+    ( 'identity', None ),
+    ( 'br', None ),
+    ( 'gzip', 'gzip' ),
+    ( 'gzip, deflate', 'deflate' ),
+    ( 'GZIP;q=0.5, deflate;q=0', 'gzip' ),
+    ( 'deflate;q=foo', None ),
+    ( '*', 'deflate' ),
+    ( 'deflate;q=0, *', 'gzip' ),
+    ( '*, deflate;q=0, gzip;q=0', None ),
+  ]
+
+  for test in tests:
+    yield lambda test: eq_( test[ 1 ], NegotiateEncoding( test[ 0 ] ) ), test
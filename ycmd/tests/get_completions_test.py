@@ -31,10 +31,12 @@ from hamcrest import ( assert_that, equal_to, has_items,
 from mock import patch
 from nose.tools import eq_
 
+from ycmd.responses import InvalidBufferEdit, UnknownBufferVersion
 from ycmd.tests import SharedYcmd, PathToTestFile
 from ycmd.tests.test_utils import ( BuildRequest, CompletionEntryMatcher,
-                                    DummyCompleter, PatchCompleter,
-                                    UserOption, ExpectedFailure )
+                                    DummyCompleter, ErrorMatcher,
+                                    PatchCompleter, UserOption, ExpectedFailure,
+                                    WaitForIdentifierIngestion )
 
 
 @SharedYcmd
@@ -88,6 +90,57 @@ def GetCompletions_IdentifierCompleter_FilterShortCandidates_test( app ):
                                       CompletionEntryMatcher( 'gooo' ) ) )
 
 
+@SharedYcmd
+def GetCompletions_IdentifierCompleter_BufferVersionsAndEdits_test( app ):
+  event_data = BuildRequest( filepath = '/versioned',
+                             contents = 'foo foogoo ba',
+                             event_name = 'FileReadyToParse' )
+  event_data[ 'file_data' ][ '/versioned' ][ 'version' ] = 1
+  app.post_json( '/event_notification', event_data )
+  WaitForIdentifierIngestion()
+
+  # The buffer is now 'oo foo foogoo ba' and only the edit is sent.
+  completion_data = BuildRequest( filepath = '/versioned', column_num = 3 )
+  completion_data[ 'file_data' ][ '/versioned' ] = {
+    'filetypes': [ 'foo' ],
+    'version': 2,
+    'base_version': 1,
+    'edits': [ { 'start': { 'line_num': 1, 'column_num': 1 },
+                 'end': { 'line_num': 1, 'column_num': 1 },
+                 'text': 'oo ' } ]
+  }
+  response_data = app.post_json( '/completions', completion_data ).json
+
+  eq_( 1, response_data[ 'completion_start_column' ] )
+  assert_that(
+    response_data[ 'completions' ],
+    has_items( CompletionEntryMatcher( 'foo', '[ID]' ),
+               CompletionEntryMatcher( 'foogoo', '[ID]' ) )
+  )
+
+  completion_data[ 'file_data' ][ '/versioned' ] = {
+    'filetypes': [ 'foo' ],
+    'version': 3
+  }
+  response = app.post_json( '/completions',
+                            completion_data,
+                            expect_errors = True ).json
+  assert_that( response, ErrorMatcher( UnknownBufferVersion ) )
+
+  completion_data[ 'file_data' ][ '/versioned' ] = {
+    'filetypes': [ 'foo' ],
+    'version': 3,
+    'base_version': 2,
+    'edits': [ { 'start': { 'line_num': 0, 'column_num': 1 },
+                 'end': { 'line_num': 0, 'column_num': 1 },
+                 'text': 'X' } ]
+  }
+  response = app.post_json( '/completions',
+                            completion_data,
+                            expect_errors = True ).json
+  assert_that( response, ErrorMatcher( InvalidBufferEdit ) )
+
+
 @SharedYcmd
 def GetCompletions_IdentifierCompleter_StartColumn_AfterWord_test( app ):
   completion_data = BuildRequest( contents = 'oo foo foogoo ba',
@@ -199,6 +252,7 @@ def GetCompletions_IdentifierCompleter_SyntaxKeywordsAdded_test( app ):
                              syntax_keywords = ['foo', 'bar', 'zoo'] )
 
   app.post_json( '/event_notification', event_data )
+  WaitForIdentifierIngestion()
 
   completion_data = BuildRequest( contents = 'oo ',
                                   column_num = 3 )
@@ -215,10 +269,12 @@ def GetCompletions_IdentifierCompleter_TagsAdded_test( app ):
   event_data = BuildRequest( event_name = 'FileReadyToParse',
                              tag_files = [ PathToTestFile( 'basic.tags' ) ] )
   app.post_json( '/event_notification', event_data )
+  WaitForIdentifierIngestion()
 
   completion_data = BuildRequest( contents = 'oo',
                                   column_num = 3,
                                   filetype = 'cpp' )
+
   results = app.post_json( '/completions',
                            completion_data ).json[ 'completions' ]
   assert_that( results,
@@ -264,6 +320,7 @@ def GetCompletions_UltiSnipsCompleter_Works_test( app ):
     ] )
 
   app.post_json( '/event_notification', event_data )
+  WaitForIdentifierIngestion()
 
   completion_data = BuildRequest( contents = 'oo ',
                                   column_num = 3 )
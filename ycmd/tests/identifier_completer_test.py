@@ -24,13 +24,19 @@ standard_library.install_aliases()
 from builtins import *  # noqa
 
 import os
-from nose.tools import eq_
+import shutil
+import tempfile
+import threading
+from collections import defaultdict
+from nose.tools import eq_, ok_
+from ycmd import identifier_utils
 from ycmd.user_options_store import DefaultOptions
 from ycmd.completers.all import identifier_completer as ic
 from ycmd.completers.all.identifier_completer import IdentifierCompleter
 from ycmd.request_wrap import RequestWrap
 from ycmd.tests import PathToTestFile
 from ycmd.tests.test_utils import BuildRequest
+from ycmd.utils import SplitLines, ToCppStringCompatible
 
 
 def BuildRequestWrap( contents, column_num, line_num = 1 ):
@@ -180,3 +186,203 @@ def FilterUnchangedTagFiles_SkipUnchangesFiles_test():
       tag_file )
 
   eq_( [], list( ident_completer._FilterUnchangedTagFiles( [ tag_file ] ) ) )
+
+
+def BufferIdentifiers_Update_test():
+  buffer_identifiers = ic._BufferIdentifiers( 'foo' )
+
+  added, removed, occurrences = buffer_identifiers.Update( [ 'foo bar',
+                                                             'foo' ] )
+  eq_( [ 'bar', 'foo' ], sorted( added ) )
+  eq_( [], removed )
+  eq_( { 'foo': 2, 'bar': 1 }, occurrences )
+
+  added, removed, occurrences = buffer_identifiers.Update( [ 'foo bar',
+                                                             'qux' ] )
+  eq_( [ 'qux' ], added )
+  eq_( [], removed )
+  eq_( { 'foo': 1, 'qux': 1 }, occurrences )
+
+  added, removed, occurrences = buffer_identifiers.Update( [ 'qux' ] )
+  eq_( [], added )
+  eq_( [ 'bar', 'foo' ], sorted( removed ) )
+  eq_( { 'foo': 0, 'bar': 0 }, occurrences )
+
+
+def BufferIdentifiers_Update_FiletypeIdentifiers_test():
+  buffer_identifiers = ic._BufferIdentifiers( 'javascript' )
+  added, _, _ = buffer_identifiers.Update( [ '$foo = a$1;' ] )
+  eq_( [ '$foo', 'a$1' ], sorted( added ) )
+
+
+def BufferIdentifiers_Update_RemovesExtraIdentifiers_test():
+  buffer_identifiers = ic._BufferIdentifiers( 'foo' )
+  buffer_identifiers.Update( [ 'foo' ] )
+
+  buffer_identifiers.AddExtraIdentifier( 'foo' )
+  buffer_identifiers.AddExtraIdentifier( 'bar' )
+  eq_( ( [], [ 'bar' ], {} ), buffer_identifiers.Update( [ 'foo' ] ) )
+
+
+def _NativeIdentifierCounts( text, filetype ):
+  identifier_counts = defaultdict( int )
+  ic._BufferIdentifiers( filetype )._AddIdentifierDeltas( identifier_counts,
+                                                          text,
+                                                          1 )
+  return identifier_counts
+
+
+def _RegexIdentifierCounts( text, filetype ):
+  identifier_counts = defaultdict( int )
+  # finditer rather than findall since the javascript regex has a group.
+  for match in identifier_utils.IdentifierRegexForFiletype(
+      filetype ).finditer( text ):
+    identifier_counts[ match.group() ] += 1
+  return identifier_counts
+
+
+def BufferIdentifiers_NativeExtractionMatchesRegex_test():
+  # Each filetype family extracts different identifiers from this text, so a
+  # filetype missing from the native table or mapped to the wrong family makes
+  # the test fail.
+  text = ( "$foo a$1 1b -zoo {font-size: 12px;} <goo-foo z=''/> b@g fo.ba "
+           "a.b .1a _a ..1 (a/b/c *foo?) foo' x 'y \\ref{fig:foo-bar} some8 "
+           "baz- qu'x" )
+  filetypes = list( identifier_utils.FILETYPE_TO_IDENTIFIER_REGEX )
+  filetypes.extend( [ 'cpp', 'unknown' ] )
+
+  for filetype in filetypes:
+    eq_( _RegexIdentifierCounts( text, filetype ),
+         _NativeIdentifierCounts( text, filetype ) )
+
+
+def BufferIdentifiers_NativeExtractionMatchesRegex_NonAscii_test():
+  # Combining marks, non-ASCII punctuation and modifier symbols aren't word
+  # characters, and digits of other scripts can't start an identifier.
+  texts = [ 'cafe\u0301x',
+            'a\u037eb',
+            'a\u060cb',
+            'a\u0964b',
+            'a\u02c2b \u02dbc',
+            '\u0661ab .\u0661a',
+            '\u00e7a\u00a0b\u3000c\u2003d',
+            'uni\u00e7ode \u03b1\u03b2 \u0444\u0443 \u4e2d\u6587' ]
+  filetypes = list( identifier_utils.FILETYPE_TO_IDENTIFIER_REGEX )
+  filetypes.append( 'cpp' )
+
+  for text in texts:
+    for filetype in filetypes:
+      eq_( _RegexIdentifierCounts( text, filetype ),
+           _NativeIdentifierCounts( text, filetype ) )
+
+
+def IdentifierLinesFromBuffer_NativeRemovalMatchesRegex_test():
+  text = ( '\u00e7a // \u00e7b\n'
+           '"\u00e7c" \u0661d /* \u00e7e\n'
+           '\u00e7f */ \'\u00e7g\' \u00e7h # \u00e7i\n' )
+  eq_( SplitLines( identifier_utils.RemoveIdentifierFreeText( text ) ),
+       ic._IdentifierLinesFromBuffer( text, False ) )
+
+
+def AddBufferIdentifiers_OnlyChangedIdentifiersAreUpdated_test():
+  ident_completer = IdentifierCompleter( DefaultOptions() )
+
+  def Candidates( query ):
+    return sorted( ident_completer._completer.CandidatesForQueryAndType(
+      ToCppStringCompatible( query ), ToCppStringCompatible( 'foo' ), 0 ) )
+
+  ident_completer._AddBufferIdentifiers( BuildRequestWrap(
+    'foo_bar foo_baz\nfoo_qux', 1 ) )
+  eq_( [ 'foo_bar', 'foo_baz', 'foo_qux' ], Candidates( 'foo' ) )
+
+  ident_completer._AddBufferIdentifiers( BuildRequestWrap(
+    'foo_bar foo_baz\nfoo_zoo', 1 ) )
+  eq_( [ 'foo_bar', 'foo_baz', 'foo_zoo' ], Candidates( 'foo' ) )
+
+  ident_completer._AddIdentifier( 'foo_extra', BuildRequestWrap( '', 1 ) )
+  eq_( [ 'foo_bar', 'foo_baz', 'foo_extra', 'foo_zoo' ], Candidates( 'foo' ) )
+
+  ident_completer._AddBufferIdentifiers( BuildRequestWrap( 'foo_bar', 1 ) )
+  eq_( [ 'foo_bar' ], Candidates( 'foo' ) )
+
+
+def ComputeCandidates_RanksIdentifiersNearCurrentFile_test():
+  ident_completer = IdentifierCompleter( DefaultOptions() )
+
+  def Request( filepath, contents ):
+    return RequestWrap( BuildRequest( filepath = filepath,
+                                      filetype = 'foo',
+                                      contents = contents,
+                                      column_num = len( contents ) + 1 ) )
+
+  def Candidates( request_data ):
+    return [ candidate[ 'insertion_text' ] for candidate in
+             ident_completer.ComputeCandidates( request_data ) ]
+
+  ident_completer._AddBufferIdentifiers( Request( '/a', 'foo_a' ) )
+  ident_completer._AddBufferIdentifiers( Request( '/b', 'foo_b foo_c foo_c' ) )
+  ident_completer._AddBufferIdentifiers( Request( '/c', 'foo_d' ) )
+
+  eq_( [ 'foo_d', 'foo_c', 'foo_b', 'foo_a' ],
+       Candidates( Request( '/c', 'foo' ) ) )
+  eq_( [ 'foo_a', 'foo_d', 'foo_c', 'foo_b' ],
+       Candidates( Request( '/a', 'foo' ) ) )
+
+
+def Snapshot_IdentifiersSurviveRestart_test():
+  snapshot_file = os.path.join( tempfile.mkdtemp(), 'snapshot' )
+  user_options = DefaultOptions()
+  user_options[ 'identifier_snapshot_file' ] = snapshot_file
+
+  ident_completer = IdentifierCompleter( user_options )
+  ident_completer._AddBufferIdentifiers( BuildRequestWrap( 'foo_bar', 1 ) )
+  ident_completer.Shutdown()
+  ok_( os.path.exists( snapshot_file ) )
+
+  ident_completer = IdentifierCompleter( user_options )
+  candidates = ident_completer._completer.CandidatesForQueryAndType(
+    ToCppStringCompatible( 'foo' ), ToCppStringCompatible( 'foo' ), 0 )
+  eq_( [ 'foo_bar' ], list( candidates ) )
+  ident_completer.Shutdown()
+  shutil.rmtree( os.path.dirname( snapshot_file ) )
+
+
+def IngestionQueue_RunsTasksInOrder_test():
+  ingestion_queue = ic._IngestionQueue( 10 )
+  done = []
+  ingestion_queue.Add( 'foo', done.append, 'foo' )
+  ingestion_queue.Add( 'bar', done.append, 'bar' )
+  ingestion_queue.Join()
+
+  eq_( [ 'foo', 'bar' ], done )
+  eq_( 'Identifier ingestion:\n'
+       '  Queued tasks: 0\n'
+       '  Done tasks: 2\n'
+       '  Current task: none', ingestion_queue.DebugInfo() )
+
+
+def IngestionQueue_DeduplicatesAndDropsTasks_test():
+  ingestion_queue = ic._IngestionQueue( 2 )
+  started = threading.Event()
+  release = threading.Event()
+  done = []
+
+  def Block():
+    started.set()
+    release.wait()
+
+  ingestion_queue.Add( 'block', Block )
+  started.wait()
+
+  ingestion_queue.Add( 'foo', done.append, 'old foo' )
+  ingestion_queue.Add( 'bar', done.append, 'bar' )
+  ingestion_queue.Add( 'foo', done.append, 'new foo' )
+  ingestion_queue.Add( 'qux', done.append, 'qux' )
+  eq_( 'Identifier ingestion:\n'
+       '  Queued tasks: 2\n'
+       '  Done tasks: 0\n'
+       '  Current task: block', ingestion_queue.DebugInfo() )
+
+  release.set()
+  ingestion_queue.Join()
+  eq_( [ 'new foo', 'bar' ], done )
@@ -336,6 +336,31 @@ def StartOfLongestIdentifierEndingAtIndex_PunctuationWithUnicode_test():
   eq_( 2, iu.StartOfLongestIdentifierEndingAtIndex( u'  fäö', 5 ) )
 
 
+def StartOfLongestIdentifierEndingAtIndex_Css_test():
+  eq_( 0, iu.StartOfLongestIdentifierEndingAtIndex( '-foo', 4, 'css' ) )
+  eq_( 1, iu.StartOfLongestIdentifierEndingAtIndex( '--foo', 5, 'css' ) )
+  eq_( 0, iu.StartOfLongestIdentifierEndingAtIndex( 'foo-b', 4, 'css' ) )
+  eq_( 2, iu.StartOfLongestIdentifierEndingAtIndex( '-f', 2, 'css' ) )
+
+
+def StartOfLongestIdentifierEndingAtIndex_R_test():
+  eq_( 0, iu.StartOfLongestIdentifierEndingAtIndex( '.foo', 4, 'r' ) )
+  eq_( 2, iu.StartOfLongestIdentifierEndingAtIndex( '.1foo', 5, 'r' ) )
+  eq_( 1, iu.StartOfLongestIdentifierEndingAtIndex( '_foo', 4, 'r' ) )
+
+
+def StartOfLongestIdentifierEndingAtIndex_Clojure_test():
+  eq_( 0, iu.StartOfLongestIdentifierEndingAtIndex( 'foo/bar', 7, 'clojure' ) )
+  eq_( 4, iu.StartOfLongestIdentifierEndingAtIndex( 'foo/bar/baz', 11,
+                                                    'clojure' ) )
+
+
+def StartOfLongestIdentifierEndingAtIndex_Perl6_test():
+  eq_( 0, iu.StartOfLongestIdentifierEndingAtIndex( "foo-bar's", 9, 'perl6' ) )
+  eq_( 5, iu.StartOfLongestIdentifierEndingAtIndex( 'foo-1bar', 8, 'perl6' ) )
+  eq_( 4, iu.StartOfLongestIdentifierEndingAtIndex( 'foo-', 4, 'perl6' ) )
+
+
 # Not a test, but a test helper function
 def LoopExpectLongestIdentifier( ident, expected, end_index ):
   eq_( expected, iu.StartOfLongestIdentifierEndingAtIndex( ident, end_index ) )
@@ -0,0 +1,64 @@
+# Copyright (C) 2016 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+from builtins import *  # noqa
+
+from hamcrest import assert_that, calling, raises
+from mock import patch
+from nose.tools import eq_
+
+from ycmd import json_utils
+from ycmd.responses import BuildExceptionResponse, UnknownExtraConf
+
+
+class Unserializable( object ):
+  pass
+
+
+def RoundTrip_test():
+  data = { 'filepath': '/foo/bar', 'contents': 'fö"o\n', 'line_num': 1,
+           'filetypes': [ 'cpp' ], 'done': True, 'error': None }
+  eq_( data, json_utils.Loads( json_utils.Dumps( data ) ) )
+  eq_( data, json_utils.Loads( json_utils.Dumps( data ).encode( 'utf8' ) ) )
+
+
+@patch( 'ycmd.json_utils.ujson', None )
+def RoundTrip_WithoutUjson_test():
+  data = { 'filepath': '/foo/bar', 'contents': 'fö"o\n' }
+  eq_( data, json_utils.Loads( json_utils.Dumps( data ) ) )
+
+
+def Dumps_Default_test():
+  eq_( '{"foo": "bar"}',
+       json_utils.Dumps( { 'foo': Unserializable() },
+                         default = lambda obj: 'bar' ) )
+  assert_that( calling( json_utils.Dumps ).with_args( Unserializable() ),
+               raises( TypeError ) )
+
+
+def Dumps_ExceptionResponse_test():
+  response = json_utils.Loads( json_utils.Dumps(
+    BuildExceptionResponse( UnknownExtraConf( '/foo' ), 'traceback' ) ) )
+  eq_( { 'TYPE': 'UnknownExtraConf', 'extra_conf_file': '/foo' },
+       response[ 'exception' ] )
+  eq_( 'traceback', response[ 'traceback' ] )
@@ -24,9 +24,14 @@ from future import standard_library
 standard_library.install_aliases()
 from builtins import *  # noqa
 
-from hamcrest import assert_that, contains, empty, equal_to, has_entries
+from hamcrest import ( assert_that, contains, contains_string, empty, equal_to,
+                       has_entries, matches_regexp )
+from mock import ANY, patch
+import json
 import requests
 
+from ycmd.compression_utils import Compress
+
 from ycmd.tests import PathToTestFile, SharedYcmd
 from ycmd.tests.test_utils import BuildRequest, DummyCompleter, PatchCompleter
 
@@ -67,6 +72,65 @@ def MiscHandlers_EventNotification_ReturnJsonOnBigFileError_test( app ):
                               'exception': None } ) )
 
 
+@SharedYcmd
+def MiscHandlers_CompressedRequestBody_test( app ):
+  data = {
+    'candidates': [ { 'prop1': 'aoo' }, { 'prop1': 'bfo' } ],
+    'sort_property': 'prop1',
+    'query': 'fo'
+  }
+  body = json.dumps( data ).encode( 'utf8' )
+
+  for encoding in [ 'gzip', 'deflate' ]:
+    response = app.post( '/filter_and_sort_candidates',
+                         Compress( body, encoding ),
+                         headers = { 'Content-Encoding': encoding },
+                         content_type = 'application/json' )
+    assert_that( response.json, contains( { 'prop1': 'bfo' } ) )
+
+  response = app.post( '/filter_and_sort_candidates',
+                       body,
+                       headers = { 'Content-Encoding': 'br' },
+                       content_type = 'application/json',
+                       expect_errors = True )
+  assert_that( response.status_code,
+               equal_to( requests.codes.unsupported_media_type ) )
+
+  # A body within the request size limit must not decompress to more than it.
+  compressed = Compress( body, 'gzip' )
+  with patch( 'bottle.Request.MEMFILE_MAX', len( compressed ) ):
+    response = app.post( '/filter_and_sort_candidates',
+                         compressed,
+                         headers = { 'Content-Encoding': 'gzip' },
+                         content_type = 'application/json',
+                         expect_errors = True )
+  assert_that( response.status_code,
+               equal_to( requests.codes.request_entity_too_large ) )
+
+
+@SharedYcmd
+def MiscHandlers_CompressedResponse_test( app ):
+  candidates = [ { 'prop1': 'foo{0}'.format( i ) } for i in range( 5000 ) ]
+  data = {
+    'candidates': candidates,
+    'sort_property': 'prop1',
+    'query': 'fo'
+  }
+
+  # WebTest decompresses responses itself, so we check that the response went
+  # through Compress.
+  with patch( 'ycmd.compression_utils.Compress',
+              wraps = Compress ) as compress:
+    response = app.post_json( '/filter_and_sort_candidates', data )
+    assert_that( compress.called, equal_to( False ) )
+
+    response = app.post_json( '/filter_and_sort_candidates',
+                              data,
+                              headers = { 'x-ycm-accept-encoding': 'deflate' } )
+    compress.assert_called_once_with( ANY, 'deflate' )
+    assert_that( response.json, equal_to( candidates ) )
+
+
 @SharedYcmd
 def MiscHandlers_FilterAndSortCandidates_Basic_test( app ):
   candidate1 = { 'prop1': 'aoo', 'prop2': 'bar' }
@@ -84,6 +148,24 @@ def MiscHandlers_FilterAndSortCandidates_Basic_test( app ):
   assert_that( response_data, contains( candidate2, candidate3 ) )
 
 
+@SharedYcmd
+def MiscHandlers_FilterAndSortCandidates_MaxResults_test( app ):
+  candidate1 = { 'prop1': 'aoo', 'prop2': 'bar' }
+  candidate2 = { 'prop1': 'bfo', 'prop2': 'zoo' }
+  candidate3 = { 'prop1': 'cfo', 'prop2': 'moo' }
+
+  data = {
+    'candidates': [ candidate3, candidate1, candidate2 ],
+    'sort_property': 'prop1',
+    'query': 'fo',
+    'max_results': 1
+  }
+
+  response_data = app.post_json( '/filter_and_sort_candidates', data ).json
+
+  assert_that( response_data, contains( candidate2 ) )
+
+
 @SharedYcmd
 def MiscHandlers_LoadExtraConfFile_AlwaysJsonResponse_test( app ):
   filepath = PathToTestFile( 'extra_conf', 'project', '.ycm_extra_conf.py' )
@@ -100,3 +182,34 @@ def MiscHandlers_IgnoreExtraConfFile_AlwaysJsonResponse_test( app ):
 
   assert_that( app.post_json( '/ignore_extra_conf_file', extra_conf_data ).json,
                equal_to( True ) )
+
+
+@SharedYcmd
+def MiscHandlers_DebugInfo_CandidateRepository_test( app ):
+  request_data = BuildRequest( filetype = 'dummy_filetype' )
+  assert_that( app.post_json( '/debug_info', request_data ).json,
+               matches_regexp( 'Candidate repository:\n'
+                               '  Stored candidates: \\d+\n'
+                               '  Estimated size: \\d+ bytes' ) )
+
+
+@SharedYcmd
+def MiscHandlers_DebugInfo_IdentifierIngestion_test( app ):
+  request_data = BuildRequest( filetype = 'dummy_filetype' )
+  assert_that( app.post_json( '/debug_info', request_data ).json,
+               matches_regexp( 'Identifier ingestion:\n'
+                               '  Queued tasks: \\d+\n'
+                               '  Done tasks: \\d+\n'
+                               '  Current task: .+' ) )
+
+
+@SharedYcmd
+def MiscHandlers_DebugInfo_CompletionsCache_test( app ):
+  with PatchCompleter( DummyCompleter, filetype = 'dummy_filetype' ):
+    request_data = BuildRequest( filetype = 'dummy_filetype' )
+    assert_that( app.post_json( '/debug_info', request_data ).json,
+                 contains_string( 'Completions cache:\n'
+                                  '  Cached locations: 0\n'
+                                  '  Cached candidates: 0\n'
+                                  '  Query narrowing hits: 0\n'
+                                  '  Query narrowing misses: 0' ) )
@@ -25,7 +25,7 @@ standard_library.install_aliases()
 
 import os
 
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 from future.utils import native
 
 import ycm_core
@@ -62,6 +62,24 @@ def GetUtf8String_Unicode_test():
   eq_( 'foo', str( ycm_core.GetUtf8String( u'foo' ) ) )
 
 
+def GetUtf8String_UnicodeNonAscii_test():
+  eq_( ToBytes( u'\xf8' ), ToBytes( ycm_core.GetUtf8String( u'\xf8' ) ) )
+
+
+def FilterAndSortCandidates_ReturnsOriginalObjects_test():
+  candidates = [ { 'insertion_text': u'foobar', 'menu_text': u'\xf8' },
+                 { 'insertion_text': u'fbar' },
+                 { 'insertion_text': u'baz' } ]
+
+  sort_property = native( ToBytes( 'insertion_text' ) )
+  query = native( ToBytes( 'fb' ) )
+  results = ycm_core.FilterAndSortCandidates( candidates, sort_property, query )
+
+  eq_( 2, len( results ) )
+  ok_( results[ 0 ] is candidates[ 1 ] )
+  ok_( results[ 1 ] is candidates[ 0 ] )
+
+
 @ClangOnly
 @Py2Only
 def CompilationDatabase_Py2Str_test():
@@ -82,6 +82,13 @@ def EnsureRequestValid_MissingFileDataContents_test():
                raises( ServerError, ".*contents.*" ) )
 
 
+def EnsureRequestValid_FileDataVersionInsteadOfContents_test():
+  data = BasicData()
+  del data[ 'file_data' ][ '/foo' ][ 'contents' ]
+  data[ 'file_data' ][ '/foo' ][ 'version' ] = 1
+  ok_( EnsureRequestValid( data ) )
+
+
 def EnsureRequestValid_MissingFileDataFiletypes_test():
   data = BasicData()
   del data[ 'file_data' ][ '/foo' ][ 'filetypes' ]
@@ -25,9 +25,10 @@ from future import standard_library
 standard_library.install_aliases()
 from builtins import *  # noqa
 
+from ycmd.buffer_store import BufferStore
 from ycmd.utils import ToBytes
 
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 from ..request_wrap import RequestWrap
 
 
@@ -229,3 +230,59 @@ def Query_UnicodeSinglecharExclusive_test():
   eq_( '',
        RequestWrap( PrepareJson( column_num = 5,
                                  contents = 'abc.ø' ) )[ 'query' ] )
+
+
+def BufferFingerprint_IgnoresCurrentLine_test():
+  def BufferFingerprint( contents, line_num ):
+    return RequestWrap( PrepareJson( line_num = line_num,
+                                     contents = contents ) )[
+                                       'buffer_fingerprint' ]
+
+  eq_( BufferFingerprint( 'goo\nbar\nzoo', 2 ),
+       BufferFingerprint( 'goo\nbarfoo\nzoo', 2 ) )
+  ok_( BufferFingerprint( 'goo\nbar\nzoo', 2 ) !=
+       BufferFingerprint( 'goo\nbar\nzo', 2 ) )
+  ok_( BufferFingerprint( 'goo\nbar\nzoo', 2 ) !=
+       BufferFingerprint( 'goo\nbar\nzoo', 3 ) )
+
+
+def BufferFingerprint_FromBufferStoreGenerations_test():
+  store = BufferStore()
+
+  def BufferFingerprint( line_num, file_data ):
+    request = PrepareJson( line_num = line_num )
+    request[ 'file_data' ][ '/foo' ] = dict( file_data, filetypes = [ '' ] )
+    return RequestWrap( request, buffer_store = store )[ 'buffer_fingerprint' ]
+
+  def Edit( line_num, column_num, text ):
+    position = { 'line_num': line_num, 'column_num': column_num }
+    return { 'start': position, 'end': position, 'text': text }
+
+  def EditVersion( version, *edits ):
+    return { 'version': version,
+             'base_version': version - 1,
+             'edits': list( edits ) }
+
+  first = BufferFingerprint( 2, { 'version': 1, 'contents': 'goo\nbar\nzoo' } )
+
+  # Typing on the current line keeps the fingerprint.
+  eq_( first, BufferFingerprint( 2, EditVersion( 2, Edit( 2, 4, 'f' ) ) ) )
+  eq_( first, BufferFingerprint( 2, EditVersion( 3, Edit( 2, 5, 'o' ) ) ) )
+
+  # But not on the other lines, where the current line is part of the rest of
+  # the buffer.
+  other_line = BufferFingerprint( 3, { 'version': 3 } )
+  ok_( first != other_line )
+
+  # Typing on another line changes the fingerprint of the first one, but the
+  # new line keeps the one it had before.
+  eq_( other_line,
+       BufferFingerprint( 3, EditVersion( 4, Edit( 3, 1, 'z' ) ) ) )
+  ok_( first != BufferFingerprint( 2, { 'version': 4 } ) )
+
+  # Edits breaking lines or sending the full contents change the fingerprint.
+  for file_data in [ EditVersion( 5, Edit( 3, 1, 'a\n' ) ),
+                     { 'version': 6, 'contents': 'goo\nbarfo\nzzoo' } ]:
+    fingerprint = BufferFingerprint( 3, file_data )
+    ok_( fingerprint != other_line )
+    other_line = fingerprint
@@ -0,0 +1,185 @@
+# Copyright (C) 2016 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+from builtins import *  # noqa
+
+from nose.tools import eq_
+import io
+import json
+import os
+import threading
+
+from ycmd.json_utils import REQUEST_JSON_ENVIRON_KEY
+from ycmd.stdio_server import ReadMessage, StdioServer, WriteMessage
+from ycmd.utils import ToBytes, ToUnicode
+
+
+def WriteMessage_ReadMessage_test():
+  stream = io.BytesIO()
+  WriteMessage( stream, b'{"foo": "b\xc3\xa4r"}' )
+  WriteMessage( stream, b'[]' )
+  eq_( b'Content-Length: 15\r\n\r\n', stream.getvalue()[ : 22 ] )
+  stream.seek( 0 )
+  eq_( b'{"foo": "b\xc3\xa4r"}', ReadMessage( stream ) )
+  eq_( b'[]', ReadMessage( stream ) )
+  eq_( None, ReadMessage( stream ) )
+
+
+def ReadMessage_ExtraHeadersAndBlankLines_test():
+  stream = io.BytesIO( b'\r\ncontent-length: 2\r\nFoo: bar\r\n\r\n{}' )
+  eq_( b'{}', ReadMessage( stream ) )
+
+
+def ReadMessage_TruncatedMessage_test():
+  stream = io.BytesIO( b'Content-Length: 10\r\n\r\n{}' )
+  eq_( None, ReadMessage( stream ) )
+
+
+def StdioServer_OutOfOrderResponses_test():
+  slow_request_received = threading.Event()
+  fast_request_answered = threading.Event()
+
+  def Application( environ, start_response ):
+    if environ[ 'PATH_INFO' ] == '/slow':
+      slow_request_received.set()
+      fast_request_answered.wait( 5 )
+    else:
+      slow_request_received.wait( 5 )
+    start_response( str( '200 OK' ),
+                    [ ( str( 'Content-Type' ), str( 'application/json' ) ) ] )
+    return [ ToBytes( json.dumps( {
+      'path': environ[ 'PATH_INFO' ],
+      'query': environ[ 'QUERY_STRING' ],
+      'body': environ.get( REQUEST_JSON_ENVIRON_KEY ) } ) ) ]
+
+  read_fd, write_fd = os.pipe()
+  input_stream = os.fdopen( read_fd, 'rb' )
+  output_stream = os.fdopen( write_fd, 'wb' )
+
+  class OutputStream( object ):
+    def __init__( self ):
+      self.messages = []
+
+    def write( self, data ):
+      self.messages.append( data )
+      if b'fast' in data:
+        fast_request_answered.set()
+
+    def flush( self ):
+      pass
+
+  output = OutputStream()
+  server = StdioServer( Application, input_stream, output, threads = 2 )
+  runner = threading.Thread( target = server.Run )
+  runner.start()
+
+  WriteMessage( output_stream, ToBytes( json.dumps( {
+    'id': 1, 'path': 'slow', 'body': { 'foo': 'bar' } } ) ) )
+  WriteMessage( output_stream, ToBytes( json.dumps( {
+    'id': 2, 'method': 'GET', 'path': '/fast', 'params': { 'a': 'b' } } ) ) )
+  output_stream.close()
+  runner.join( 10 )
+  server.Shutdown()
+
+  responses = [ json.loads( ToUnicode( ReadMessage( io.BytesIO( message ) ) ) )
+                for message in output.messages ]
+  eq_( [ { 'id': 2,
+           'status': 200,
+           'body': { 'path': '/fast', 'query': 'a=b', 'body': None } },
+         { 'id': 1,
+           'status': 200,
+           'body': { 'path': '/slow',
+                     'query': '',
+                     'body': { 'foo': 'bar' } } } ],
+       responses )
+
+
+def Serve( application, messages ):
+  """Serves the |messages| and returns the responses, once the end of the
+  input stream shuts the server down."""
+  input_stream = io.BytesIO()
+  for message in messages:
+    WriteMessage( input_stream, ToBytes( message ) )
+  input_stream.seek( 0 )
+  output_stream = io.BytesIO()
+
+  server = StdioServer( application, input_stream, output_stream, threads = 1 )
+  server.Run()
+  server.Shutdown()
+
+  output_stream.seek( 0 )
+  responses = []
+  while True:
+    message = ReadMessage( output_stream )
+    if message is None:
+      return responses
+    responses.append( json.loads( ToUnicode( message ) ) )
+
+
+def EchoApplication( environ, start_response ):
+  start_response( str( '200 OK' ),
+                  [ ( str( 'Content-Type' ), str( 'application/json' ) ) ] )
+  return [ ToBytes( json.dumps( environ[ 'PATH_INFO' ] ) ) ]
+
+
+def StdioServer_InvalidRequests_test():
+  responses = Serve( EchoApplication, [
+    'not json',
+    '[ 1 ]',
+    '{ "path": "/foo" }',
+    '{ "id": true, "path": "/foo" }',
+    '{ "id": { "foo": 1 }, "path": "/foo" }',
+    '{ "id": 1, "path": 5 }',
+    '{ "id": 2, "path": "/foo", "method": null }',
+    '{ "id": 3, "path": "/foo", "params": [ 1 ] }',
+    '{ "id": 4 }',
+    '{ "id": "five", "path": "/foo" }',
+  ] )
+
+  eq_( [ ( None, 400 ) ] * 5 +
+       [ ( 1, 400 ), ( 2, 400 ), ( 3, 400 ), ( 4, 400 ), ( 'five', 200 ) ],
+       [ ( response[ 'id' ], response[ 'status' ] )
+         for response in responses ] )
+  eq_( 'Invalid request message: path must be a string',
+       responses[ 5 ][ 'body' ] )
+  eq_( 'Invalid request message: method must be a string',
+       responses[ 6 ][ 'body' ] )
+  eq_( 'Invalid request message: params must be an object',
+       responses[ 7 ][ 'body' ] )
+  eq_( '/foo', responses[ 9 ][ 'body' ] )
+
+
+def StdioServer_ApplicationError_test():
+  def Application( environ, start_response ):
+    if environ[ 'PATH_INFO' ] == '/fail':
+      raise RuntimeError( 'boom' )
+    return EchoApplication( environ, start_response )
+
+  responses = Serve( Application, [ '{ "id": 1, "path": "/fail" }',
+                                    '{ "id": 2, "path": "/foo" }' ] )
+
+  eq_( [ { 'id': 1,
+           'status': 500,
+           'body': 'Error while handling the request: boom' },
+         { 'id': 2, 'status': 200, 'body': '/foo' } ],
+       responses )
@@ -239,6 +239,14 @@ def ClearCompletionsCache():
     completer._completions_cache.Invalidate()
 
 
+def WaitForIdentifierIngestion():
+  """Blocks until the tag files and syntax keywords sent to the server are added
+  to the identifier database."""
+  identifier_completer = (
+    handlers._server_state.GetGeneralCompleter().GetIdentifierCompleter() )
+  identifier_completer._ingestion_queue.Join()
+
+
 class DummyCompleter( Completer ):
   def __init__( self, user_options ):
     super( DummyCompleter, self ).__init__( user_options )
@@ -0,0 +1,193 @@
+# Copyright (C) 2016 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+from builtins import *  # noqa
+
+from base64 import b64decode
+from hamcrest import assert_that, contains, equal_to
+from tempfile import NamedTemporaryFile
+import json
+import os
+import psutil
+import requests
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+
+from ycmd.compression_utils import Compress, Decompress
+from ycmd.hmac_utils import CreateHmac, SecureBytesEqual
+from ycmd.stdio_server import ReadMessage, WriteMessage
+from ycmd.tests.client_test import Client_test, HMAC_HEADER, PATH_TO_YCMD
+from ycmd.tests.test_utils import UnixOnly
+from ycmd.utils import SafePopen, ToBytes, ToUnicode
+
+
+def FilterAndSortData( num_candidates ):
+  return {
+    'candidates': [ { 'prop1': 'foo{0}'.format( i ) }
+                    for i in range( num_candidates ) ],
+    'sort_property': 'prop1',
+    'query': 'fo'
+  }
+
+
+class Transport_test( Client_test ):
+
+  def _StartStdio( self ):
+    # The temp options file is deleted by ycmd during startup
+    with NamedTemporaryFile( mode = 'w+', delete = False ) as options_file:
+      json.dump( self._options_dict, options_file )
+      options_file.flush()
+      self._popen_handle = SafePopen( [ sys.executable,
+                                        PATH_TO_YCMD,
+                                        '--stdio',
+                                        '--options_file={0}'.format(
+                                          options_file.name ) ],
+                                      stdin = subprocess.PIPE,
+                                      stdout = subprocess.PIPE,
+                                      stderr = subprocess.PIPE )
+      self._servers.append( psutil.Process( self._popen_handle.pid ) )
+
+
+  def _StdioRequest( self, request ):
+    WriteMessage( self._popen_handle.stdin,
+                  ToBytes( json.dumps( request ) ) )
+
+
+  def _StdioResponse( self ):
+    return json.loads( ToUnicode( ReadMessage( self._popen_handle.stdout ) ) )
+
+
+  def _CompressedPost( self, handler, data, headers ):
+    request_uri = self._BuildUri( handler )
+    body = Compress( ToBytes( json.dumps( data ) ), 'gzip' )
+    # The HMAC is computed over the compressed body.
+    all_headers = self._ExtraHeaders( 'POST', request_uri, body )
+    all_headers[ 'content-encoding' ] = 'gzip'
+    all_headers.update( headers )
+    return requests.post( request_uri,
+                          headers = all_headers,
+                          data = body,
+                          stream = True )
+
+
+  @Client_test.CaptureLogfiles
+  def CompressedRequest_test( self ):
+    self.Start()
+
+    response = self._CompressedPost( 'filter_and_sort_candidates',
+                                     FilterAndSortData( 1 ),
+                                     {} )
+    self.AssertResponse( response )
+    assert_that( response.json(), contains( { 'prop1': 'foo0' } ) )
+
+
+  @Client_test.CaptureLogfiles
+  def CompressedResponse_test( self ):
+    self.Start()
+
+    data = FilterAndSortData( 5000 )
+    response = self._CompressedPost( 'filter_and_sort_candidates',
+                                     data,
+                                     { 'x-ycm-accept-encoding': 'deflate' } )
+    assert_that( response.status_code, equal_to( requests.codes.ok ) )
+    assert_that( response.headers[ 'content-encoding' ], equal_to( 'deflate' ) )
+
+    # The HMAC is computed over the compressed body, which requests would
+    # otherwise decompress for us.
+    body = response.raw.read( decode_content = False )
+    their_hmac = ToBytes( b64decode( response.headers[ HMAC_HEADER ] ) )
+    assert_that(
+      SecureBytesEqual( CreateHmac( body, self._hmac_secret ), their_hmac ),
+      equal_to( True ) )
+    assert_that( json.loads( Decompress( body, 'deflate' ).decode( 'utf8' ) ),
+                 equal_to( data[ 'candidates' ] ) )
+
+
+  @UnixOnly
+  @Client_test.CaptureLogfiles
+  def UnixSocket_test( self ):
+    socket_dir = tempfile.mkdtemp()
+    try:
+      unix_socket = os.path.join( socket_dir, 'ycmd.sock' )
+      self.Start( unix_socket = unix_socket )
+      assert_that( stat.S_IMODE( os.stat( unix_socket ).st_mode ),
+                   equal_to( 0o600 ) )
+
+      # The Host header isn't checked as there is no DNS rebinding for unix
+      # domain sockets.
+      response = self._Request( 'POST',
+                                'filter_and_sort_candidates',
+                                FilterAndSortData( 1 ),
+                                headers = { 'host': 'example.com' } )
+      self.AssertResponse( response )
+      assert_that( response.json(), contains( { 'prop1': 'foo0' } ) )
+
+      self.AssertResponse( self.PostRequest( 'shutdown' ) )
+      self.AssertServersShutDown( timeout = 5 )
+      assert_that( os.path.exists( unix_socket ), equal_to( False ) )
+    finally:
+      shutil.rmtree( socket_dir, ignore_errors = True )
+
+
+  def Stdio_test( self ):
+    self._StartStdio()
+
+    self._StdioRequest( { 'id': 1, 'method': 'GET', 'path': '/ready' } )
+    self._StdioRequest( { 'id': 'two',
+                          'path': 'filter_and_sort_candidates',
+                          'body': FilterAndSortData( 2 ) } )
+    self._StdioRequest( { 'id': 3, 'path': '/no_such_handler', 'body': {} } )
+    self._StdioRequest( { 'path': '/ready' } )
+
+    # Responses may come in any order.
+    responses = dict( ( response[ 'id' ], response ) for response in
+                      [ self._StdioResponse() for _ in range( 4 ) ] )
+    assert_that( responses[ 1 ],
+                 equal_to( { 'id': 1,
+                             'status': requests.codes.ok,
+                             'body': True } ) )
+    assert_that( responses[ 'two' ],
+                 equal_to( { 'id': 'two',
+                             'status': requests.codes.ok,
+                             'body': [ { 'prop1': 'foo0' },
+                                       { 'prop1': 'foo1' } ] } ) )
+    assert_that( responses[ 3 ][ 'status' ],
+                 equal_to( requests.codes.not_found ) )
+    assert_that( responses[ None ][ 'status' ],
+                 equal_to( requests.codes.bad_request ) )
+
+    self._StdioRequest( { 'id': 4, 'path': '/shutdown' } )
+    assert_that( self._StdioResponse(),
+                 equal_to( { 'id': 4,
+                             'status': requests.codes.ok,
+                             'body': True } ) )
+    self.AssertServersShutDown( timeout = 5 )
+
+
+  def Stdio_ShutdownOnEndOfInput_test( self ):
+    self._StartStdio()
+    self._popen_handle.stdin.close()
+    self.AssertServersShutDown( timeout = 5 )
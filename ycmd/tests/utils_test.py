@@ -508,6 +508,35 @@ def SplitLines_test():
     yield lambda: eq_( utils.SplitLines( test[ 0 ] ), test[ 1 ] )
 
 
+def LineIndex_SameLinesAsSplitLines_test():
+  tests = [ '', ' ', '\n', ' \n', ' \n ', 'test\n', '\r', '\r ', 'test\r',
+            '\n\r', '\r\n', '\r\n\n', 'test\ntesting', '\ntesting',
+            'test\x0btesting\x85', 'test\u2028\r\n' ]
+
+  def Test( contents ):
+    lines = utils.LineIndex( contents )
+    expected = utils.SplitLines( contents )
+    eq_( len( lines ), len( expected ) )
+    eq_( [ lines[ i ] for i in range( len( lines ) ) ], expected )
+    eq_( lines[ -1 ], expected[ -1 ] )
+
+  for test in tests:
+    yield Test, test
+
+
+def LineIndex_LineIndexForOffset_test():
+  lines = utils.LineIndex( 'foo\r\nbar\n\nzoo' )
+  eq_( 0, lines.LineIndexForOffset( 0 ) )
+  eq_( 0, lines.LineIndexForOffset( 4 ) )
+  eq_( 1, lines.LineIndexForOffset( 5 ) )
+  eq_( 2, lines.LineIndexForOffset( 9 ) )
+  eq_( 3, lines.LineIndexForOffset( 10 ) )
+  eq_( 3, lines.LineIndexForOffset( 13 ) )
+  eq_( 5, lines.LineStartOffset( 1 ) )
+  eq_( 8, lines.LineEndOffset( 1 ) )
+  eq_( 13, lines.LineEndOffset( 3 ) )
+
+
 def FindExecutable_AbsolutePath_test():
   with TemporaryExecutable() as executable:
     eq_( executable, utils.FindExecutable( executable ) )
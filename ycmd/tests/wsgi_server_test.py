@@ -0,0 +1,51 @@
+# Copyright (C) 2016 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from future import standard_library
+standard_library.install_aliases()
+from builtins import *  # noqa
+
+from hamcrest import assert_that, equal_to
+from mock import patch
+import importlib
+import socket
+import sys
+
+
+@patch.dict( sys.modules )
+def WsgiServer_ImportWithoutUnixSockets_test():
+  # Import the modules again as if unix domain sockets weren't supported, like
+  # on Windows.
+  for module in [ 'waitress.server', 'ycmd.wsgi_server' ]:
+    sys.modules.pop( module, None )
+
+  af_unix = getattr( socket, 'AF_UNIX', None )
+  if af_unix is not None:
+    del socket.AF_UNIX
+  try:
+    wsgi_server = importlib.import_module( 'ycmd.wsgi_server' )
+  finally:
+    if af_unix is not None:
+      socket.AF_UNIX = af_unix
+
+  assert_that( hasattr( wsgi_server, 'StoppableWSGIServer' ), equal_to( True ) )
+  assert_that( hasattr( wsgi_server, 'StoppableUnixWSGIServer' ),
+               equal_to( False ) )
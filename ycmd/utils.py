@@ -26,7 +26,9 @@ standard_library.install_aliases()
 from builtins import *  # noqa
 from future.utils import PY2, native
 
+import bisect
 import os
+import re
 import socket
 import subprocess
 import sys
@@ -435,6 +437,76 @@ def SplitLines( contents ):
   return lines
 
 
+# The line boundaries recognised by str.splitlines, and therefore SplitLines.
+LINE_BREAK_REGEX = re.compile(
+  '\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]' )
+
+
+class LineIndex( object ):
+  """Indexable view of the lines in the unicode string |contents|, equivalent
+  to SplitLines( contents ) but without building the whole list of lines. The
+  offsets at which lines start are computed on first use and each line is only
+  sliced out of |contents| when it is asked for."""
+
+  def __init__( self, contents ):
+    self.contents = contents
+    self._line_starts = None
+    self._last_line_end = len( contents )
+
+
+  def _LineStarts( self ):
+    if self._line_starts is None:
+      line_starts = [ 0 ] + [
+        match.end() for match in LINE_BREAK_REGEX.finditer( self.contents ) ]
+      # Like SplitLines, only a trailing '\r' or '\n' starts an extra empty
+      # line.
+      if ( len( line_starts ) > 1 and
+           line_starts[ -1 ] == len( self.contents ) and
+           not self.contents.endswith( ( '\r', '\n' ) ) ):
+        line_starts.pop()
+        self._last_line_end -= 1
+      self._line_starts = line_starts
+    return self._line_starts
+
+
+  def __len__( self ):
+    return len( self._LineStarts() )
+
+
+  def __getitem__( self, line_index ):
+    """Returns the line at the 0-based |line_index| without its line break.
+    Negative indices and IndexError behave as for a list."""
+    line_starts = self._LineStarts()
+    start = line_starts[ line_index ]
+    if line_index < 0:
+      line_index += len( line_starts )
+    return self.contents[ start : self.LineEndOffset( line_index ) ]
+
+
+  def LineStartOffset( self, line_index ):
+    """Returns the codepoint offset of the start of the line at the 0-based
+    |line_index|."""
+    return self._LineStarts()[ line_index ]
+
+
+  def LineEndOffset( self, line_index ):
+    """Returns the codepoint offset of the line break ending the line at the
+    0-based |line_index|, or the end of the contents for the last line."""
+    line_starts = self._LineStarts()
+    if line_index + 1 >= len( line_starts ):
+      return self._last_line_end
+    end = line_starts[ line_index + 1 ] - 1
+    if self.contents[ end - 1 : end + 1 ] == '\r\n':
+      end -= 1
+    return end
+
+
+  def LineIndexForOffset( self, offset ):
+    """Returns the 0-based index of the line containing the codepoint |offset|
+    into the contents."""
+    return bisect.bisect_right( self._LineStarts(), offset ) - 1
+
+
 def GetCurrentDirectory():
   """Returns the current directory as an unicode object. If the current
   directory does not exist anymore, returns the temporary folder instead."""
@@ -26,24 +26,23 @@ from builtins import *  # noqa
 from future.utils import listvalues
 from waitress.server import TcpWSGIServer
 import select
+import socket
 
 
-class StoppableWSGIServer( TcpWSGIServer ):
-  """StoppableWSGIServer is a subclass of the TcpWSGIServer Waitress server
-  with a shutdown method. It is based on StopableWSGIServer class from webtest:
+class _StoppableServerMixin( object ):
+  """Adds a shutdown method to a Waitress server. It is based on
+  StopableWSGIServer class from webtest:
   https://github.com/Pylons/webtest/blob/master/webtest/http.py"""
 
   shutdown_requested = False
 
   def Run( self ):
-    """Wrapper of TcpWSGIServer run method. It prevents a traceback from
+    """Wrapper of the Waitress server run method. It prevents a traceback from
     asyncore."""
 
     # Message for compatibility with clients who expect the output from
     # waitress.serve here
-    print( 'serving on http://{0}:{1}'.format(
-      self.effective_host,
-      self.effective_port ) )
+    print( self.ServingMessage() )
 
     try:
       self.run()
@@ -61,7 +60,30 @@ class StoppableWSGIServer( TcpWSGIServer ):
     # We don't use itervalues here because _map is modified while looping
     # through it.
     # NOTE: _map is an attribute from the asyncore.dispatcher class, which is a
-    # base class of TcpWSGIServer. This may change in future versions of
+    # base class of the Waitress servers. This may change in future versions of
     # waitress so extra care should be taken when updating waitress.
     for channel in listvalues( self._map ):
       channel.close()
+
+
+class StoppableWSGIServer( _StoppableServerMixin, TcpWSGIServer ):
+  """StoppableWSGIServer is a subclass of the TcpWSGIServer Waitress server
+  with a shutdown method."""
+
+  def ServingMessage( self ):
+    return 'serving on http://{0}:{1}'.format( self.effective_host,
+                                               self.effective_port )
+
+
+# Waitress only defines its unix domain socket server on platforms that support
+# them, i.e. not on Windows.
+if hasattr( socket, 'AF_UNIX' ):
+  from waitress.server import UnixWSGIServer
+
+
+  class StoppableUnixWSGIServer( _StoppableServerMixin, UnixWSGIServer ):
+    """StoppableUnixWSGIServer is a subclass of the UnixWSGIServer Waitress
+    server, which listens on a unix domain socket, with a shutdown method."""
+
+    def ServingMessage( self ):
+      return 'serving on unix:{0}'.format( self.adj.unix_socket )